@@ -22,6 +22,14 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
     WKHTMLTOPDF_PATH: str | None = None
+    ADMIN_API_TOKEN: str | None = Field(
+        default=None,
+        description="Token for admin endpoints (X-Admin-Token); unset disables them.",
+    )
+    MONGO_RETRY_SECONDS: float = Field(
+        default=30.0,
+        description="Seconds before MongoDB is pinged again after a failed warmup.",
+    )
 
 # Create a single instance of the settings to use in our app
 settings = Settings()
@@ -1,5 +1,8 @@
 # backend/database.py
 
+import threading
+import time
+
 import pymongo
 
 from config import settings
@@ -8,48 +11,107 @@ from models.user import User
 
 
 class Database:
+    """
+    MongoDB handles. Creating the client does no network I/O; the ping, index
+    creation and system template seeding run in ``warmup()`` (from the startup
+    warmup task, or the first ``get_db()`` call), so importing this module
+    stays fast. A failed warmup is retried after ``MONGO_RETRY_SECONDS``.
+    """
+
     def __init__(self, db_url):
+        self.db_url = db_url
+        self.ready = False
+        self.error = None
+        self.retry_seconds = settings.MONGO_RETRY_SECONDS
+        self._warmed = False
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
         try:
             self.client = pymongo.MongoClient(db_url)
-            self.client.admin.command("ping")
-            default_db = self.client.get_default_database()
-            self.db = default_db if default_db is not None else self.client.legaltech_db
-
-            self.users = self.db.users
-            self.users.create_index("email", unique=True)
-            self.users.create_index("google_id", unique=True)
-
-            self.documents = self.db.documents
-            self.documents.create_index("user_id")
-            self.chat_history = self.db.chat_history
-            self.chat_history.create_index(
-                [("user_id", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)]
-            )
-            self.document_templates = self.db.document_templates
-            self.document_templates.create_index("name", unique=True)
-            self.pii_mappings = self.db.pii_mappings
-            self.pii_mappings.create_index("user_id")
-            self.pii_mappings.create_index("expires_at", expireAfterSeconds=0)
-
-            print("Database connection successful.")
-
+            self._bind()
         except pymongo.errors.PyMongoError as e:
+            # A URL the client rejects will not work on retry either.
             print(f"Could not connect to MongoDB: {e}")
             self.client = None
-            self.db = None
-            self.users = None
-            self.documents = None
-            self.chat_history = None
-            self.document_templates = None
-            self.pii_mappings = None
+            self._mark_unavailable(e)
+            self._warmed = True
+
+    def _bind(self) -> None:
+        default_db = self.client.get_default_database()
+        self.db = default_db if default_db is not None else self.client.legaltech_db
+
+        self.users = self.db.users
+        self.documents = self.db.documents
+        self.chat_history = self.db.chat_history
+        self.document_templates = self.db.document_templates
+        self.pii_mappings = self.db.pii_mappings
+        self.document_chunk_indexes = self.db.document_chunk_indexes
+
+    def _mark_unavailable(self, error: Exception) -> None:
+        # The client is kept so a later warmup can retry the connection.
+        self.error = str(error)
+        self.ready = False
+        self.db = None
+        self.users = None
+        self.documents = None
+        self.chat_history = None
+        self.document_templates = None
+        self.pii_mappings = None
+        self.document_chunk_indexes = None
+
+    def _seed_templates(self) -> None:
+        # Imported here: the template service imports this module.
+        from services.template_service import TemplateService
+
+        TemplateService(self.document_templates).ensure_system_templates()
+
+    def warmup(self) -> bool:
+        """
+        Ping the server, ensure indexes and seed the system templates, once.
+        Returns whether Mongo is usable; after a failure the next call past
+        the retry interval tries again.
+        """
+        with self._lock:
+            if self._warmed:
+                return self.ready
+            if self.client is None or time.monotonic() < self._retry_at:
+                return False
+            try:
+                self.client.admin.command("ping")
+                if self.db is None:
+                    self._bind()
+
+                self.users.create_index("email", unique=True)
+                self.users.create_index("google_id", unique=True)
+                self.documents.create_index("user_id")
+                self.chat_history.create_index(
+                    [("user_id", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)]
+                )
+                self.document_templates.create_index("name", unique=True)
+                self.pii_mappings.create_index("user_id")
+                self.pii_mappings.create_index("expires_at", expireAfterSeconds=0)
+                self.document_chunk_indexes.create_index("user_id")
+                self._seed_templates()
+
+                self.ready = True
+                self.error = None
+                self._warmed = True
+                print("Database connection successful.")
+            except pymongo.errors.PyMongoError as e:
+                print(f"Could not connect to MongoDB: {e}; retrying in {self.retry_seconds:g}s.")
+                self._mark_unavailable(e)
+                self._retry_at = time.monotonic() + self.retry_seconds
+            return self.ready
 
 
 db_client = Database(settings.DATABASE_URL)
 
 
 def get_db():
+    db_client.warmup()
     return db_client.db
 
 
 def get_db_client():
+    db_client.warmup()
     return db_client
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import hmac
+
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 from pymongo.errors import PyMongoError
 
+from config import settings
 from database import db_client
 from models.auth import AuthenticatedUser
 from services.auth_service import auth_service
 
 bearer_scheme = HTTPBearer(auto_error=False)
+admin_token_scheme = APIKeyHeader(name="X-Admin-Token", auto_error=False)
 
 
 def get_current_user(
@@ -39,3 +43,13 @@ def get_current_user(
             detail="Authenticated user was not found.",
         )
     return AuthenticatedUser(**user)
+
+
+def require_admin_token(token: str | None = Depends(admin_token_scheme)) -> None:
+    """Admin endpoints are disabled unless ADMIN_API_TOKEN is configured."""
+    expected = settings.ADMIN_API_TOKEN
+    if not expected or token is None or not hmac.compare_digest(token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required.",
+        )
@@ -1,4 +1,5 @@
 import logging
+import os
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
@@ -7,7 +8,7 @@ from fastapi.responses import JSONResponse
 from config import settings 
 from routers import auth, chatbot, document_pdf, documents, summarizer, generator,search
 from database import db_client
-from services.template_service import TemplateService
+from services.warmup_service import warmup_service
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +16,13 @@ app = FastAPI()
 
 @app.on_event("startup")
 def startup_db_client():
-    if db_client.client:
-        print("Backend is starting up...")
-        TemplateService().ensure_system_templates()
+    print("Backend is starting up...")
+    # Mongo, the embedding model, the vector index and the LLM client warm up
+    # in the background; /api/ready reports when they are done. Workers that
+    # only serve auth/templates/documents can set WARMUP_COMPONENTS=mongo so
+    # the ML stack loads only if a retrieval/LLM route is ever called.
+    if os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes"):
+        warmup_service.start()
 
 @app.on_event("shutdown")
 def shutdown_db_client():
@@ -80,3 +85,13 @@ def health_check():
     If you can access this, the server is running.
     """
     return {"status": "ok", "message": "LegalTech AI Backend is running!"}
+
+
+@app.get("/api/ready")
+def readiness_check():
+    """
+    Readiness probe: 200 once every required component (READY_REQUIRED_COMPONENTS)
+    has warmed up, 503 before that. Includes per-component warmup timings.
+    """
+    report = warmup_service.readiness()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+if TYPE_CHECKING:
+    from utils.facet_utils import SearchFilters
+
+
+class LegalSearchFilters(BaseModel):
+    act: Optional[str] = Field(
+        default=None,
+        max_length=200,
+        description='Act name, e.g. "Indian Penal Code", "IPC" or "Constitution".',
+    )
+    type: Optional[str] = Field(default=None, max_length=200, description='e.g. "criminal".')
+    part: Optional[str] = Field(default=None, max_length=50, description='e.g. "Part III".')
+    section_from: Optional[int] = Field(default=None, ge=0, description="Lowest section/article number.")
+    section_to: Optional[int] = Field(default=None, ge=0, description="Highest section/article number.")
+
+    @model_validator(mode="after")
+    def check_section_range(self) -> "LegalSearchFilters":
+        if (
+            self.section_from is not None
+            and self.section_to is not None
+            and self.section_from > self.section_to
+        ):
+            raise ValueError("section_from must not be greater than section_to.")
+        return self
+
+    def to_filters(self) -> SearchFilters:
+        # facet_utils pulls in numpy; only search requests need it.
+        from utils.facet_utils import SearchFilters
+
+        return SearchFilters(
+            act=self.act or None,
+            type=self.type or None,
+            part=self.part or None,
+            section_from=self.section_from,
+            section_to=self.section_to,
+        )
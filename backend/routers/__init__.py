@@ -1,3 +1,3 @@
-from . import auth, chatbot, documents, generator, search, summarizer
-
-__all__ = ["auth", "chatbot", "documents", "summarizer", "generator", "search"]
+# Routers are imported individually by main.py; importing them all here would
+# drag the ML routes' dependencies into every import of the package.
+__all__ = ["auth", "chatbot", "document_pdf", "documents", "summarizer", "generator", "search"]
@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from uuid import UUID
 
 from dependencies.auth import get_current_user
 from models.auth import AuthenticatedUser
 from models.document import ChatHistoryResponse
-from services import chatbot_service
-from services.vector_service import vector_service
+from models.search import LegalSearchFilters
 
 router = APIRouter()
 
+# How often a stream waiting on the model checks that the client is still there.
+DISCONNECT_POLL_SECONDS = 1.0
+KEEPALIVE_SECONDS = 15.0
+
 
 class ChatQueryRequest(BaseModel):
     query: str
     document_id: str | None = None
+    filters: LegalSearchFilters | None = None
 
 
 class ChatQueryResponse(BaseModel):
@@ -21,18 +32,46 @@ class ChatQueryResponse(BaseModel):
     vector_index_ready: bool
 
 
+def _process_query(**kwargs) -> dict:
+    # The chatbot pulls in the LLM client and the vector index; import it on
+    # first use rather than in every worker at startup. index_ready may load
+    # the index, so it is read here too, in the threadpool.
+    from services import chatbot_service
+    from services.vector_service import vector_service
+
+    answer = chatbot_service.process_query(**kwargs)
+    return {"answer": answer, "vector_index_ready": vector_service.index_ready}
+
+
+def _prepare_query(**kwargs) -> tuple[str, str, bool]:
+    from services import chatbot_service
+    from services.vector_service import vector_service
+
+    query, prompt = chatbot_service.prepare_query(**kwargs)
+    return query, prompt, vector_service.index_ready
+
+
+def _chat_history(user_id: UUID) -> list[ChatHistoryResponse]:
+    from services import chatbot_service
+
+    return chatbot_service.get_chat_history(user_id)
+
+
 @router.post("/api/chatbot/query", response_model=ChatQueryResponse)
 async def handle_chatbot_query(
     request: ChatQueryRequest,
     current_user: AuthenticatedUser = Depends(get_current_user),
 ):
     try:
-        answer = chatbot_service.process_query(
+        # Retrieval, the Gemini call and the Mongo writes all block; run them
+        # in the threadpool so one slow answer does not stall the event loop.
+        return await run_in_threadpool(
+            _process_query,
             user_id=UUID(current_user.id),
             query=request.query,
             document_id=request.document_id,
+            filters=request.filters.to_filters() if request.filters else None,
         )
-        return {"answer": answer, "vector_index_ready": bool(vector_service.db)}
 
     except HTTPException:
         raise
@@ -40,12 +79,106 @@ async def handle_chatbot_query(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_answer(
+    http_request: Request,
+    tokens: AsyncIterator[str],
+    vector_index_ready: bool,
+) -> AsyncIterator[str]:
+    """
+    Relay answer tokens as SSE ``token`` events, ending with ``done`` or
+    ``error``. The model call runs in its own task so a client that goes away
+    while the model is still thinking is noticed and the call is cancelled.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for token in tokens:
+                await queue.put(("token", token))
+            await queue.put(("done", None))
+        except HTTPException as exc:
+            await queue.put(("error", exc.detail))
+        except Exception as e:
+            print(f"Chatbot stream failed: {e}")
+            await queue.put(("error", "Chatbot stream failed."))
+
+    producer = asyncio.create_task(pump())
+    try:
+        yield _sse("meta", {"vector_index_ready": vector_index_ready})
+        last_sent = time.monotonic()
+        while True:
+            try:
+                kind, data = await asyncio.wait_for(queue.get(), timeout=DISCONNECT_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                if await http_request.is_disconnected():
+                    print("Chatbot stream client disconnected; cancelling the model call.")
+                    return
+                if time.monotonic() - last_sent >= KEEPALIVE_SECONDS:
+                    last_sent = time.monotonic()
+                    yield ": keep-alive\n\n"
+                continue
+
+            last_sent = time.monotonic()
+            if kind == "token":
+                yield _sse("token", {"text": data})
+            elif kind == "error":
+                yield _sse("error", {"detail": data})
+                return
+            else:
+                yield _sse("done", {})
+                return
+    finally:
+        # Also runs when the server closes the response on a failed send.
+        producer.cancel()
+
+
+@router.post("/api/chatbot/stream")
+async def stream_chatbot_query(
+    request: ChatQueryRequest,
+    http_request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_user),
+):
+    """
+    The chatbot answer as Server-Sent Events: one ``meta`` event, ``token``
+    events as Gemini generates text, then ``done`` (or ``error``).
+    """
+    user_id = UUID(current_user.id)
+    try:
+        # Validation, document lookup and retrieval happen before the stream
+        # opens, so their errors keep their HTTP status codes.
+        query, prompt, index_ready = await run_in_threadpool(
+            _prepare_query,
+            user_id=user_id,
+            query=request.query,
+            document_id=request.document_id,
+            filters=request.filters.to_filters() if request.filters else None,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Already imported by _prepare_query.
+    from services import chatbot_service
+
+    tokens = chatbot_service.stream_answer(user_id, query, prompt, request.document_id)
+    return StreamingResponse(
+        _sse_answer(http_request, tokens, index_ready),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/api/chat/history", response_model=list[ChatHistoryResponse])
 async def get_chat_history(
     current_user: AuthenticatedUser = Depends(get_current_user),
 ):
     try:
-        return chatbot_service.get_chat_history(UUID(current_user.id))
+        return await run_in_threadpool(_chat_history, UUID(current_user.id))
     except HTTPException:
         raise
     except Exception as e:
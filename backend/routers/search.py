@@ -1,18 +1,36 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import base64
+import binascii
+import json
+from typing import Any, Dict, Iterator, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from services.vector_service import vector_service
+from dependencies.auth import require_admin_token
+from models.search import LegalSearchFilters
 
 router = APIRouter()
 
 
+def _vector_service():
+    # Imported on first use so workers that never search do not load the
+    # embedding/index stack at startup.
+    from services.vector_service import vector_service
+
+    return vector_service
+
+
 class LegalSearchRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=4000)
     top_k: int = Field(default=10, ge=1, le=50)
+    filters: Optional[LegalSearchFilters] = None
+    expand_citations: bool = Field(
+        default=False,
+        description="For a plain citation (\"section 302\"), also fill the remaining slots with vector hits.",
+    )
 
 
 class LegalSearchHit(BaseModel):
@@ -30,25 +48,293 @@ class LegalSearchResponse(BaseModel):
     index_ready: bool
 
 
+class LegalSearchPageRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=4000)
+    page_size: int = Field(default=20, ge=1, le=100)
+    filters: Optional[LegalSearchFilters] = None
+    expand_citations: bool = Field(
+        default=False,
+        description="For a plain citation (\"section 302\"), also fill the remaining slots with vector hits.",
+    )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor of the previous page; send the same query and filters.",
+    )
+
+
+class LegalSearchPageResponse(BaseModel):
+    query: str
+    results: List[LegalSearchHit]
+    offset: int
+    total: int = Field(
+        ...,
+        description="Ranked candidates available for this query (a plain citation's exact matches until paged past).",
+    )
+    next_cursor: Optional[str] = None
+    index_ready: bool
+
+
+class LegalSearchStreamRequest(BaseModel):
+    query: str = Field(..., min_length=1, max_length=4000)
+    limit: int = Field(default=200, ge=1, le=5000)
+    filters: Optional[LegalSearchFilters] = None
+    expand_citations: bool = Field(
+        default=False,
+        description="For a plain citation (\"section 302\"), also fill the remaining slots with vector hits.",
+    )
+    cursor: Optional[str] = None
+
+
+class LegalBatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=100)
+    top_k: int = Field(default=10, ge=1, le=50)
+    filters: Optional[LegalSearchFilters] = None
+    expand_citations: bool = Field(
+        default=False,
+        description="For a plain citation (\"section 302\"), also fill the remaining slots with vector hits.",
+    )
+
+
+class LegalBatchSearchResult(BaseModel):
+    query: str
+    results: List[LegalSearchHit]
+
+
+class LegalBatchSearchResponse(BaseModel):
+    results: List[LegalBatchSearchResult]
+    index_ready: bool
+
+
+class LegalFacetsResponse(BaseModel):
+    facets: Dict[str, Dict[str, int]]
+    index_ready: bool
+
+
+class IndexSnapshotStatus(BaseModel):
+    snapshot: Optional[str] = Field(
+        default=None,
+        description="Snapshot being served; null when serving the unversioned index paths.",
+    )
+    published: Optional[str] = Field(default=None, description="Snapshot CURRENT points to.")
+    reloading: bool = False
+    last_reload: Optional[Dict[str, Any]] = None
+
+
+class SearchMetricsResponse(BaseModel):
+    index_ready: bool
+    index_version: Optional[str] = None
+    snapshot: Optional[IndexSnapshotStatus] = None
+    result_cache: Dict[str, Any] = Field(default_factory=dict)
+    embedding_cache: Dict[str, Any] = Field(default_factory=dict)
+
+
+def _encode_cursor(page, offset: int) -> str:
+    payload = {"o": offset, "v": page.version, "q": page.fingerprint}
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[dict]:
+    if not cursor:
+        return None
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if not isinstance(payload.get("o"), int) or payload["o"] < 0:
+            raise ValueError
+        return payload
+    except (binascii.Error, UnicodeDecodeError, ValueError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def _search_page(query: str, filters, cursor: Optional[str], limit: int, expand_citations: bool = False):
+    """The requested page, after checking the cursor belongs to this search and index build."""
+    vector_service = _vector_service()
+    state = _decode_cursor(cursor)
+    offset = state["o"] if state else 0
+    if state and state.get("q") != vector_service.query_fingerprint(query, filters):
+        raise HTTPException(status_code=400, detail="Cursor belongs to a different query or filters.")
+
+    page = vector_service.search_page(
+        query,
+        offset=offset,
+        limit=limit,
+        filters=filters,
+        expand_citations=expand_citations,
+    )
+    if state and state.get("v") != page.version:
+        # The ranking a cursor points into is gone once a new index is served.
+        raise HTTPException(status_code=409, detail="The search index was updated; restart the search.")
+    next_cursor = _encode_cursor(page, offset + len(page)) if page.has_more else None
+    return page, next_cursor
+
+
+def _to_hit(doc, dist) -> LegalSearchHit:
+    return LegalSearchHit(
+        content=doc.page_content,
+        metadata=dict(doc.metadata) if doc.metadata else {},
+        distance=float(dist),
+    )
+
+
+def _to_hits(pairs) -> List[LegalSearchHit]:
+    return [_to_hit(doc, dist) for doc, dist in pairs]
+
+
 @router.post("/api/search/legal", response_model=LegalSearchResponse)
 def legal_semantic_search(body: LegalSearchRequest) -> LegalSearchResponse:
+    vector_service = _vector_service()
     q = body.query.strip()
     if not q:
         raise HTTPException(status_code=400, detail="Query must not be empty.")
 
-    if not vector_service.db:
+    if not vector_service.index_ready:
         return LegalSearchResponse(query=q, results=[], index_ready=False)
 
-    pairs = vector_service.search_legal_docs_with_scores(q, k=body.top_k)
-    hits: List[LegalSearchHit] = []
-    for doc, dist in pairs:
-        meta = dict(doc.metadata) if doc.metadata else {}
-        hits.append(
-            LegalSearchHit(
-                content=doc.page_content,
-                metadata=meta,
-                distance=float(dist),
-            )
+    filters = body.filters.to_filters() if body.filters else None
+    pairs = vector_service.search_legal_docs_with_scores(
+        q,
+        k=body.top_k,
+        filters=filters,
+        expand_citations=body.expand_citations,
+    )
+    return LegalSearchResponse(query=q, results=_to_hits(pairs), index_ready=True)
+
+
+@router.post("/api/search/legal/page", response_model=LegalSearchPageResponse)
+def legal_semantic_search_page(body: LegalSearchPageRequest) -> LegalSearchPageResponse:
+    """
+    Cursor-paginated search ("load more"). Pages after the first are slices
+    of the ranking cached by the first request, not new vector searches.
+    """
+    vector_service = _vector_service()
+    q = body.query.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Query must not be empty.")
+
+    if not vector_service.index_ready:
+        return LegalSearchPageResponse(query=q, results=[], offset=0, total=0, index_ready=False)
+
+    filters = body.filters.to_filters() if body.filters else None
+    page, next_cursor = _search_page(q, filters, body.cursor, body.page_size, body.expand_citations)
+    return LegalSearchPageResponse(
+        query=q,
+        results=_to_hits(page.pairs),
+        offset=page.offset,
+        total=page.total,
+        next_cursor=next_cursor,
+        index_ready=True,
+    )
+
+
+@router.post("/api/search/legal/stream")
+def legal_semantic_search_stream(body: LegalSearchStreamRequest) -> StreamingResponse:
+    """
+    NDJSON export of up to ``limit`` ranked hits: a "meta" line, one "hit"
+    line per result, then an "end" line with the cursor to continue from.
+
+    Only the output is streamed. The query is ranked in full (one vector
+    search, or a cached ranking) before the first line is sent, because the
+    meta line's total and a global order need every candidate. After that,
+    each hit's Document is built and serialized as the client reads it.
+    """
+    vector_service = _vector_service()
+    q = body.query.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Query must not be empty.")
+
+    if not vector_service.index_ready:
+        page, next_cursor = None, None
+    else:
+        filters = body.filters.to_filters() if body.filters else None
+        page, next_cursor = _search_page(q, filters, body.cursor, body.limit, body.expand_citations)
+
+    def lines() -> Iterator[str]:
+        meta = {
+            "type": "meta",
+            "query": q,
+            "offset": page.offset if page else 0,
+            "total": page.total if page else 0,
+            "index_ready": page is not None,
+        }
+        yield json.dumps(meta) + "\n"
+        returned = 0
+        # Iterating the page builds each hit's Document just before it is sent.
+        for rank, (doc, dist) in enumerate(page or (), start=meta["offset"] + 1):
+            hit = _to_hit(doc, dist).model_dump()
+            yield json.dumps({"type": "hit", "rank": rank, **hit}, ensure_ascii=False) + "\n"
+            returned += 1
+        yield json.dumps({"type": "end", "returned": returned, "next_cursor": next_cursor}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.post("/api/search/legal/batch", response_model=LegalBatchSearchResponse)
+def legal_semantic_search_batch(body: LegalBatchSearchRequest) -> LegalBatchSearchResponse:
+    vector_service = _vector_service()
+    queries = [q.strip() for q in body.queries]
+    if any(not q or len(q) > 4000 for q in queries):
+        raise HTTPException(
+            status_code=400,
+            detail="Each query must be between 1 and 4000 characters.",
+        )
+
+    if not vector_service.index_ready:
+        return LegalBatchSearchResponse(
+            results=[LegalBatchSearchResult(query=q, results=[]) for q in queries],
+            index_ready=False,
         )
 
-    return LegalSearchResponse(query=q, results=hits, index_ready=True)
\ No newline at end of file
+    filters = body.filters.to_filters() if body.filters else None
+    batches = vector_service.search_legal_docs_batch_with_scores(
+        queries,
+        k=body.top_k,
+        filters=filters,
+        expand_citations=body.expand_citations,
+    )
+    return LegalBatchSearchResponse(
+        results=[
+            LegalBatchSearchResult(query=q, results=_to_hits(pairs))
+            for q, pairs in zip(queries, batches)
+        ],
+        index_ready=True,
+    )
+
+
+@router.get("/api/search/legal/facets", response_model=LegalFacetsResponse)
+def legal_search_facets() -> LegalFacetsResponse:
+    """Filterable values (normalized) with their chunk counts."""
+    vector_service = _vector_service()
+    return LegalFacetsResponse(
+        facets=vector_service.facet_counts(),
+        index_ready=vector_service.index_ready,
+    )
+
+
+@router.get("/api/search/metrics", response_model=SearchMetricsResponse)
+def search_metrics() -> SearchMetricsResponse:
+    """Hit ratios and saved latency of the retrieval caches."""
+    vector_service = _vector_service()
+    return SearchMetricsResponse(
+        index_ready=vector_service.index_ready,
+        index_version=vector_service.current_version(),
+        snapshot=IndexSnapshotStatus(**vector_service.snapshot_status()),
+        result_cache=vector_service.result_cache_stats(),
+        embedding_cache=vector_service.embedding_cache_stats(),
+    )
+
+
+@router.post(
+    "/api/search/admin/reload",
+    response_model=IndexSnapshotStatus,
+    dependencies=[Depends(require_admin_token)],
+)
+def reload_search_index(
+    wait: bool = Query(default=False, description="Block until the new snapshot is swapped in."),
+) -> IndexSnapshotStatus:
+    """
+    Load the snapshot published by embed_laws.py --snapshot in the background
+    and swap it in; queries already running finish on the old snapshot.
+    """
+    vector_service = _vector_service()
+    return IndexSnapshotStatus(**vector_service.reload_index(wait=wait))
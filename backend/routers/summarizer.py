@@ -2,14 +2,13 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pymongo.database import Database
 
 from database import get_db
 from dependencies.auth import get_current_user
 from models.auth import AuthenticatedUser
 from models.document import DocumentSummaryResponse
-from services.summarizer_service import summarizer_service
-from services.vector_service import vector_service
 from utils.ocr_utils import SUPPORTED_OCR_EXTENSIONS, extract_text_from_image
 from utils.pdf_utils import extract_text_from_pdf
 
@@ -20,6 +19,17 @@ def _normalize_filename(filename: str | None) -> str:
     return (filename or "").strip().lower()
 
 
+def _summarize(**kwargs):
+    # The summarizer pulls in the LLM client and the vector index; import it
+    # on first use rather than in every worker at startup.
+    # index_ready may load the index, so it is read here, off the event loop.
+    from services.summarizer_service import summarizer_service
+    from services.vector_service import vector_service
+
+    result = summarizer_service.process_summarization(**kwargs)
+    return result, vector_service.index_ready
+
+
 @router.post("/api/summarizer/upload/pdf", response_model=DocumentSummaryResponse)
 async def summarize_pdf(
     file: UploadFile = File(...),
@@ -32,12 +42,15 @@ async def summarize_pdf(
 
     try:
         file_content = await file.read()
-        extracted_text = extract_text_from_pdf(file_content)
+        extracted_text = await run_in_threadpool(extract_text_from_pdf, file_content)
 
         if not extracted_text:
             raise HTTPException(status_code=400, detail="The PDF is empty or could not be read.")
 
-        result = summarizer_service.process_summarization(
+        # Retrieval, the LLM call and the Mongo insert block; keep them (and
+        # the text extraction above) off the event loop.
+        result, index_ready = await run_in_threadpool(
+            _summarize,
             db=db,
             user_id=UUID(current_user.id),
             text=extracted_text,
@@ -50,7 +63,7 @@ async def summarize_pdf(
             "summary": result.summary,
             "filename": file.filename,
             "source_type": "pdf",
-            "vector_index_ready": bool(vector_service.db),
+            "vector_index_ready": index_ready,
         }
     except HTTPException:
         raise
@@ -76,12 +89,13 @@ async def summarize_ocr(
 
     try:
         file_content = await file.read()
-        extracted_text = extract_text_from_image(file_content)
+        extracted_text = await run_in_threadpool(extract_text_from_image, file_content)
 
         if not extracted_text:
             raise HTTPException(status_code=400, detail="No text could be extracted from the image.")
 
-        result = summarizer_service.process_summarization(
+        result, index_ready = await run_in_threadpool(
+            _summarize,
             db=db,
             user_id=UUID(current_user.id),
             text=extracted_text,
@@ -94,7 +108,7 @@ async def summarize_ocr(
             "summary": result.summary,
             "filename": file.filename,
             "source_type": "ocr",
-            "vector_index_ready": bool(vector_service.db),
+            "vector_index_ready": index_ready,
         }
     except HTTPException:
         raise
@@ -0,0 +1,199 @@
+"""
+Latency benchmark for the vector search backends.
+
+Embeds a fixed query set once, then times the pure search step against the
+persisted Chroma store and the NumPy exact-search index:
+
+    python scripts/bench_retrieval.py --repeat 50 --k 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from langchain_community.vectorstores import Chroma  # noqa: E402
+
+from utils.embedding_utils import build_embeddings  # noqa: E402
+from utils.vector_index_utils import (  # noqa: E402
+    FAISS_FILE,
+    PRECISIONS,
+    QUANTIZED_FILES,
+    FaissIndex,
+    NumpyIndex,
+    quantize_embeddings,
+)
+
+CHROMA_PATH = BASE_DIR / "vector_db"
+NUMPY_INDEX_PATH = BASE_DIR / "vector_index"
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+DEFAULT_QUERIES = [
+    "what is section 302",
+    "punishment for murder",
+    "article 21 right to life",
+    "cheating and dishonestly inducing delivery of property",
+    "equality before law",
+    "right to freedom of speech and expression",
+    "punishment for theft",
+    "criminal breach of trust by public servant",
+    "dowry death",
+    "abolition of untouchability",
+]
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(name: str, samples: list[float]) -> None:
+    ms = [s * 1000 for s in samples]
+    print(
+        f"{name:<40} n={len(ms):<5} "
+        f"mean={statistics.fmean(ms):8.3f}ms "
+        f"p50={_percentile(ms, 50):8.3f}ms "
+        f"p95={_percentile(ms, 95):8.3f}ms "
+        f"p99={_percentile(ms, 99):8.3f}ms"
+    )
+
+
+def _time(fn, vectors, k: int, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        for vector in vectors:
+            start = time.perf_counter()
+            fn(vector, k)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _recall(found: list[list[str]], expected: list[list[str]]) -> float:
+    scores = [
+        len(set(got) & set(want)) / len(want)
+        for got, want in zip(found, expected)
+        if want
+    ]
+    return statistics.fmean(scores) if scores else 0.0
+
+
+def _index_ids(index, vectors, k: int) -> list[list[str]]:
+    rows, _ = index.search(vectors, k)
+    return [[index.ids[row] for row in query_rows if row >= 0] for query_rows in rows]
+
+
+def quantization_report(vectors, collection, k: int, repeat: int) -> None:
+    exact = NumpyIndex(NUMPY_INDEX_PATH, mmap=False)
+    exact_ids = _index_ids(exact, vectors, k)
+    chroma_ids = None
+    if collection is not None:
+        chroma_ids = collection.query(query_embeddings=vectors, n_results=k, include=[])["ids"]
+
+    print(f"\nQuantization report over {len(vectors)} queries (recall@{k}):")
+    baseline_bytes = exact.memory_bytes
+
+    def row(label: str, index) -> None:
+        ids = _index_ids(index, vectors, k)
+        samples = _time(lambda v, kk: index.search([v], kk), vectors, k, repeat)
+        vs_chroma = f"{_recall(ids, chroma_ids):.4f}" if chroma_ids is not None else "n/a"
+        print(
+            f"  {label:<28} bytes={index.memory_bytes:>12,} "
+            f"({index.memory_bytes / baseline_bytes:6.1%}) "
+            f"recall_vs_chroma={vs_chroma} recall_vs_exact={_recall(ids, exact_ids):.4f} "
+            f"p50={_percentile(samples, 50) * 1000:.3f}ms"
+        )
+
+    for precision in PRECISIONS:
+        if precision != "float32" and not (NUMPY_INDEX_PATH / QUANTIZED_FILES[precision]).exists():
+            print(f"  writing {precision} copy of {NUMPY_INDEX_PATH}...")
+            quantize_embeddings(NUMPY_INDEX_PATH, precision)
+        row(f"numpy-{precision}", NumpyIndex(NUMPY_INDEX_PATH, mmap=False, precision=precision))
+
+    if (NUMPY_INDEX_PATH / FAISS_FILE).exists():
+        index = FaissIndex(NUMPY_INDEX_PATH)
+        row(f"faiss-{index.index_type}-{index.precision}", index)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--quantization", action="store_true", help="Report memory and recall per precision.")
+    parser.add_argument(
+        "--sample-queries",
+        type=int,
+        default=0,
+        help="Add this many chunk excerpts from the NumPy index to the query set.",
+    )
+    args = parser.parse_args()
+
+    queries = list(DEFAULT_QUERIES)
+    if args.sample_queries and NUMPY_INDEX_PATH.exists():
+        texts = NumpyIndex(NUMPY_INDEX_PATH).texts
+        step = max(1, len(texts) // args.sample_queries)
+        queries += [text[:300] for text in texts[::step][: args.sample_queries]]
+
+    embeddings = build_embeddings(MODEL_NAME)
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(queries)
+    print(f"Embedded {len(vectors)} queries in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    collection = None
+    if CHROMA_PATH.exists():
+        collection = Chroma(persist_directory=str(CHROMA_PATH), embedding_function=embeddings)._collection
+        print(f"Chroma store: {collection.count()} vectors")
+        _report(
+            "chroma",
+            _time(
+                lambda v, k: collection.query(
+                    query_embeddings=[v],
+                    n_results=k,
+                    include=["documents", "metadatas", "distances"],
+                ),
+                vectors,
+                args.k,
+                args.repeat,
+            ),
+        )
+    else:
+        print(f"Skipping chroma: no store at {CHROMA_PATH}")
+
+    if NUMPY_INDEX_PATH.exists():
+        for mmap in (True, False):
+            index = NumpyIndex(NUMPY_INDEX_PATH, mmap=mmap)
+            label = "numpy-mmap" if mmap else "numpy-ram"
+            print(f"NumPy index ({label}): {len(index)} vectors")
+            _report(label, _time(lambda v, k: index.search([v], k), vectors, args.k, args.repeat))
+    else:
+        print(f"Skipping numpy: no index at {NUMPY_INDEX_PATH} (run embed_laws.py --export-numpy)")
+
+    if (NUMPY_INDEX_PATH / FAISS_FILE).exists():
+        for nprobe, ef_search in ((1, 16), (16, 64), (64, 256)):
+            index = FaissIndex(NUMPY_INDEX_PATH, nprobe=nprobe, ef_search=ef_search)
+            label = f"faiss-{index.index_type}"
+            if index.index_type != "flat":
+                label += f" (nprobe={nprobe}, efSearch={ef_search})"
+            print(f"FAISS index: {len(index)} vectors")
+            _report(label, _time(lambda v, k: index.search([v], k), vectors, args.k, args.repeat))
+            if index.index_type == "flat":
+                break
+    else:
+        print(f"Skipping faiss: no index at {NUMPY_INDEX_PATH} (run embed_laws.py --export-faiss)")
+
+    if args.quantization:
+        if NUMPY_INDEX_PATH.exists():
+            quantization_report(vectors, collection, args.k, max(1, args.repeat // 4))
+        else:
+            print(f"Skipping quantization report: no index at {NUMPY_INDEX_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Import-time budget for the non-ML startup path.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter and
+fails if importing the app pulls in any of the ML stacks (they must load on
+first use of a retrieval/LLM route) or takes longer than the budget:
+
+    python scripts/check_import_budget.py --budget-ms 1500 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_MODULES = ["main"]
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+# Top-level packages that only retrieval/LLM routes may import.
+FORBIDDEN_PACKAGES = (
+    "chromadb",
+    "faiss",
+    "google.genai",
+    "google.generativeai",
+    "langchain",
+    "langchain_community",
+    "langchain_core",
+    "langchain_google_genai",
+    "langchain_huggingface",
+    "numpy",
+    "onnxruntime",
+    "sentence_transformers",
+    "tokenizers",
+    "torch",
+    "transformers",
+)
+
+# Settings that config.py requires; placeholders are enough to import the app.
+PLACEHOLDER_ENV = {
+    "DATABASE_URL": "mongodb://localhost:27017/legaltech",
+    "CLIENT_ORIGIN": "http://localhost:3000",
+}
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def _is_forbidden(module: str) -> bool:
+    return any(module == name or module.startswith(name + ".") for name in FORBIDDEN_PACKAGES)
+
+
+def measure(modules: list[str]) -> tuple[float, list[tuple[str, float]]]:
+    """Total import time in ms and every (module, cumulative ms) imported."""
+    env = {**PLACEHOLDER_ENV, **os.environ, "WARMUP_ON_STARTUP": "false"}
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n{result.stderr[-2000:]}")
+
+    imported: list[tuple[str, float]] = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        imported.append((name, cumulative_us / 1000))
+        # Top-level imports are indented by a single space.
+        if len(indent) == 1:
+            total_us += cumulative_us
+    return total_us / 1000, imported
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to import (repeatable). Default: main",
+    )
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs; the fastest one is checked.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to print.")
+    args = parser.parse_args()
+    modules = args.modules or DEFAULT_MODULES
+
+    runs = [measure(modules) for _ in range(max(args.repeat, 1))]
+    total_ms, imported = min(runs, key=lambda run: run[0])
+
+    print(f"Imported {', '.join(modules)} in {total_ms:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    print(f"Slowest of {len(imported)} modules (cumulative):")
+    for name, ms in sorted(imported, key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"  {ms:8.1f}ms  {name}")
+
+    failed = False
+    forbidden = sorted({name for name, _ in imported if _is_forbidden(name)})
+    if forbidden:
+        roots = sorted({name.split(".")[0] for name in forbidden})
+        print(f"FAIL: ML modules imported at startup: {', '.join(roots)}")
+        code = "; ".join(f"import {module}" for module in modules)
+        print(f'  Run `python -X importtime -c "{code}"` to find the importer.')
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.0f}ms exceeds the {args.budget_ms:.0f}ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
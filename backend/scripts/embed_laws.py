@@ -1,138 +1,927 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
+from typing import Iterable, Iterator
 
 import pandas as pd
-from langchain_community.document_loaders import CSVLoader, DirectoryLoader, PyPDFLoader, TextLoader
+import xxhash
 from langchain_community.vectorstores import Chroma
 from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from pypdf import PdfReader
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 DATA_PATH = BASE_DIR / "Data"
 CHROMA_PATH = BASE_DIR / "vector_db"
+BM25_PATH = CHROMA_PATH / "bm25.json"
+CITATION_PATH = CHROMA_PATH / "citations.json"
+DEDUP_REPORT_PATH = CHROMA_PATH / "dedup_report.json"
+INDEX_VERSION_PATH = CHROMA_PATH / "index_version.json"
+MANIFEST_PATH = CHROMA_PATH / "ingest_manifest.json"
+NUMPY_INDEX_PATH = BASE_DIR / "vector_index"
+SHARDS_PATH = BASE_DIR / "vector_shards"
+SNAPSHOTS_PATH = BASE_DIR / "index_snapshots"
+ARTIFACTS_PATH = BASE_DIR / "artifacts"
+MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_DEDUP_THRESHOLD = 0.85
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.artifact_utils import pack_artifact, write_artifact_manifest  # noqa: E402
+from utils.bm25_utils import BM25IndexWriter  # noqa: E402
+from utils.chunking_utils import DEFAULT_MAX_CHARS, Chunker, RecursiveChunker, StatuteChunker  # noqa: E402
+from utils.citation_utils import CitationIndexWriter, metadata_citation  # noqa: E402
+from utils.dedup_utils import NearDuplicateIndex  # noqa: E402
+from utils.embedding_utils import build_embeddings  # noqa: E402
+from utils.facet_utils import normalize_facet  # noqa: E402
+from utils.vector_index_utils import (  # noqa: E402
+    FAISS_INDEX_TYPES,
+    PRECISIONS,
+    UNASSIGNED_SHARD,
+    NumpyIndexWriter,
+    build_faiss_index,
+    create_snapshot,
+    prune_snapshots,
+    publish_index_version,
+    publish_snapshot,
+    quantize_embeddings,
+    read_index_version,
+    read_shard_manifest,
+    replace_directory,
+    shard_dir_name,
+    write_shard_manifest,
+)
+
+
+# ipc_sections.csv rows open with "Description of IPC Section 498A ...".
+_ROW_SECTION = re.compile(r"\bSection\s+(\d+[A-Z]{1,3})\b")
+
+
+def _data_relative(path: Path | str) -> str:
+    """
+    ``path`` relative to ``DATA_PATH``, in POSIX form, so stored metadata and
+    chunk IDs are the same in every checkout, container and host. Paths
+    outside ``DATA_PATH`` are kept whole.
+    """
+    posix = str(path).replace("\\", "/")
+    try:
+        return Path(posix).relative_to(DATA_PATH).as_posix()
+    except ValueError:
+        return posix
 
 
 def _row_metadata(row: pd.Series, path: Path, index: int) -> dict:
     meta: dict = {
-        "file": str(path).replace("\\", "/"),
+        "file": _data_relative(path),
         "row": index,
     }
-    for key in ("source", "act", "section", "type", "keywords"):
+    for key in ("source", "act", "section", "article", "part", "type", "keywords"):
         if key in row.index and pd.notna(row[key]):
-            meta[key] = str(row[key]).strip()
+            value = row[key]
+            # pandas reads numeric section columns as floats ("140.0").
+            if isinstance(value, float) and value.is_integer():
+                value = int(value)
+            meta[key] = str(value).strip()
+    # A float section column also drops letter suffixes (153A and 153AA are
+    # both read as 153); the row text still names the exact section.
+    if "section" in meta and "content" in row.index:
+        match = _ROW_SECTION.search(str(row["content"])[:80])
+        if match and match.group(1).rstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ") == meta["section"]:
+            meta["section"] = match.group(1)
     return meta
 
 
-def documents_from_csv(path: Path) -> list[Document]:
-    df = pd.read_csv(path, encoding="utf-8")
-    docs: list[Document] = []
-
-    if "content" not in df.columns:
-        loader = CSVLoader(str(path), encoding="utf-8")
-        return [
-            doc
-            for doc in loader.load()
-            if doc.page_content and doc.page_content.strip()
-        ]
-
-    for i, row in df.iterrows():
+def csv_frame_documents(frame: pd.DataFrame, path: Path) -> list[Document]:
+    """Documents of one block of CSV rows; runs inside the ingestion process pool."""
+    docs = []
+    for i, row in frame.iterrows():
         text = row.get("content")
         if pd.isna(text) or not str(text).strip():
             continue
-        docs.append(
-            Document(
-                page_content=str(text).strip(),
-                metadata=_row_metadata(row, path, int(i)),
-            )
-        )
+        docs.append(Document(page_content=str(text).strip(), metadata=_row_metadata(row, path, int(i))))
     return docs
 
 
-def load_all_csvs(data_dir: Path) -> list[Document]:
-    out: list[Document] = []
-    for csv_path in sorted(data_dir.glob("*.csv")):
-        try:
-            print(f"Loading CSV: {csv_path.name}")
-            out.extend(documents_from_csv(csv_path))
-        except Exception as exc:
-            print(f"Skipping CSV {csv_path.name}: {exc}")
-    return out
+def csv_record_documents(frame: pd.DataFrame, path: Path) -> list[Document]:
+    """
+    CSVLoader-style Documents ("column: value" lines) for a block of rows of
+    a CSV without a content column; runs inside the ingestion process pool.
+    """
+    docs = []
+    for i, row in frame.iterrows():
+        text = "\n".join(f"{str(key).strip()}: {str(value).strip()}" for key, value in row.items())
+        if text.strip():
+            docs.append(Document(page_content=text, metadata={"source": _data_relative(path), "row": int(i)}))
+    return docs
 
 
-def load_pdf_files(data_dir: Path) -> list[Document]:
-    out: list[Document] = []
-    for pdf_path in sorted(data_dir.glob("*.pdf")):
-        try:
-            print(f"Loading PDF: {pdf_path.name}")
-            docs = PyPDFLoader(str(pdf_path)).load()
-            out.extend(
-                doc
-                for doc in docs
-                if doc.page_content and doc.page_content.strip()
-            )
-        except Exception as exc:
-            print(f"Skipping PDF {pdf_path.name}: {exc}")
-    return out
+def csv_tasks(path: Path, rows_per_task: int = 2000) -> Iterator[tuple]:
+    """
+    Pool tasks for one CSV: the file is read ``rows_per_task`` rows at a time
+    and each block is turned into Documents by a worker. Row numbers stay
+    global across blocks.
+    """
+    print(f"Loading CSV: {path.name}")
+    try:
+        columns = pd.read_csv(path, encoding="utf-8", nrows=0).columns
+        if "content" in columns:
+            reader = pd.read_csv(path, encoding="utf-8", chunksize=rows_per_task)
+            convert = csv_frame_documents
+        else:
+            reader = pd.read_csv(path, encoding="utf-8", chunksize=rows_per_task, dtype=str, keep_default_na=False)
+            convert = csv_record_documents
+        for frame in reader:
+            yield convert, (frame, path)
+    except Exception as exc:
+        print(f"Skipping rest of CSV {path.name}: {exc}")
+
+
+def documents_from_csv(path: Path) -> list[Document]:
+    return [doc for load, args in csv_tasks(path) for doc in load(*args)]
+
+
+def pdf_page_count(pdf_path: Path) -> int:
+    return len(PdfReader(str(pdf_path)).pages)
+
+
+def load_pdf_pages(pdf_path: Path, start: int, stop: int) -> list[Document]:
+    """Parse pages [start, stop) of one PDF; runs inside the ingestion process pool."""
+    try:
+        reader = PdfReader(str(pdf_path))
+        docs = []
+        for page_number in range(start, min(stop, len(reader.pages))):
+            text = reader.pages[page_number].extract_text() or ""
+            if text.strip():
+                docs.append(
+                    Document(
+                        page_content=text,
+                        metadata={"source": _data_relative(pdf_path), "page": page_number},
+                    )
+                )
+        return docs
+    except Exception as exc:
+        print(f"Skipping PDF {pdf_path.name} pages {start}-{stop}: {exc}")
+        return []
+
+
+def pdf_tasks(pdf_path: Path, pages_per_task: int = 16) -> Iterator[tuple]:
+    """Pool tasks for one PDF, one per range of ``pages_per_task`` pages."""
+    try:
+        pages = pdf_page_count(pdf_path)
+    except Exception as exc:
+        print(f"Skipping PDF {pdf_path.name}: {exc}")
+        return
+    print(f"Loading PDF: {pdf_path.name} ({pages} pages)")
+    for start in range(0, pages, pages_per_task):
+        yield load_pdf_pages, (pdf_path, start, start + pages_per_task)
 
 
-def load_txt_files(data_dir: Path) -> list[Document]:
-    out: list[Document] = []
+def load_txt_file(txt_path: Path) -> list[Document]:
+    """Read one TXT file as a single Document; runs inside the ingestion process pool."""
+    try:
+        text = txt_path.read_text(encoding="utf-8")
+    except Exception as exc:
+        print(f"Skipping TXT {txt_path.name}: {exc}")
+        return []
+    if not text.strip():
+        print(f"Skipping empty TXT: {txt_path.name}")
+        return []
+    return [Document(page_content=text, metadata={"source": _data_relative(txt_path)})]
+
+
+def corpus_tasks(data_dir: Path, include_pdfs: bool = False) -> Iterator[tuple]:
+    """(function, args) pairs that load the corpus, in corpus order."""
+    # CSVs first: their rows carry act/section metadata and should win
+    # whenever identical text also appears in a free-text source.
+    for csv_path in sorted(data_dir.glob("*.csv")):
+        yield from csv_tasks(csv_path)
     for txt_path in sorted(data_dir.glob("*.txt")):
+        print(f"Loading TXT: {txt_path.name}")
+        yield load_txt_file, (txt_path,)
+    if include_pdfs:
+        for pdf_path in sorted(data_dir.glob("*.pdf")):
+            yield from pdf_tasks(pdf_path)
+
+
+class StageStats:
+    """Wall-clock time and item count for one ingestion stage."""
+
+    def __init__(self, name: str, unit: str = "chunks") -> None:
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.seconds = 0.0
+
+    @contextmanager
+    def track(self, items: int = 0):
+        start = time.perf_counter()
         try:
-            if not txt_path.read_text(encoding="utf-8").strip():
-                print(f"Skipping empty TXT: {txt_path.name}")
-                continue
+            yield
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.items += items
 
-            print(f"Loading TXT: {txt_path.name}")
-            docs = TextLoader(str(txt_path), encoding="utf-8").load()
-            out.extend(
-                doc
-                for doc in docs
-                if doc.page_content and doc.page_content.strip()
+    def report(self) -> str:
+        rate = self.items / self.seconds if self.seconds else 0.0
+        return f"{self.name:<8} {self.items:>8} {self.unit:<6} {self.seconds:8.2f}s {rate:10.1f} {self.unit}/s"
+
+
+def timed(documents: Iterable[Document], stats: StageStats) -> Iterator[Document]:
+    """Attribute the time spent producing each item of a stream to ``stats``."""
+    iterator = iter(documents)
+    while True:
+        with stats.track():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        stats.items += 1
+        yield item
+
+
+def load_corpus(data_dir: Path, workers: int = 1, include_pdfs: bool = False) -> Iterator[Document]:
+    """
+    Stream the corpus as Documents. CSV row blocks, TXT files and PDF page
+    ranges are loaded on a process pool. At most ``2 * workers`` tasks are in
+    flight and their results are yielded in task order, so memory stays
+    bounded by the window and CSV rows still come first.
+    """
+    tasks = corpus_tasks(data_dir, include_pdfs)
+    if workers <= 1:
+        for load, args in tasks:
+            yield from load(*args)
+        return
+
+    window: deque = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for load, args in tasks:
+            window.append(pool.submit(load, *args))
+            if len(window) >= 2 * workers:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+def split_stream(
+    documents: Iterable[Document],
+    chunker: Chunker,
+    stats: StageStats,
+) -> Iterator[Document]:
+    for doc in documents:
+        with stats.track():
+            chunks = chunker.feed(doc)
+        stats.items += len(chunks)
+        yield from chunks
+    with stats.track():
+        chunks = chunker.flush()
+    stats.items += len(chunks)
+    yield from chunks
+
+
+def build_chunker(strategy: str = "statute", max_chars: int = DEFAULT_MAX_CHARS) -> Chunker:
+    """
+    "statute" emits one chunk per section/article (split only past
+    ``max_chars``); "recursive" is the old 1000-character window with
+    200 characters of overlap.
+    """
+    if strategy == "recursive":
+        return RecursiveChunker(
+            RecursiveCharacterTextSplitter(
+                chunk_size=1000,
+                chunk_overlap=200,
+                separators=["\n\n", "\n", " ", ""],
             )
-        except Exception as exc:
-            print(f"Skipping TXT {txt_path.name}: {exc}")
-    return out
+        )
+    return StatuteChunker(max_chars=max_chars)
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _chunk_source(doc: Document) -> str:
+    """Source file of a chunk, relative to ``DATA_PATH``."""
+    return _data_relative(doc.metadata.get("file") or doc.metadata.get("source") or "")
+
+
+def chunk_id(doc: Document) -> str:
+    """
+    Content-addressed chunk ID: identical text from the same source file always
+    maps to the same ID, so reruns can tell new chunks from indexed ones.
+    """
+    return xxhash.xxh3_128_hexdigest(f"{_chunk_source(doc)}\x1f{doc.page_content}".encode("utf-8"))
+
+
+def metadata_hash(doc: Document) -> str:
+    """
+    Hash of a chunk's metadata. The chunk ID covers only source and text, so
+    this is what tells a rerun that an act, section or keyword was edited.
+    """
+    payload = json.dumps(doc.metadata, sort_keys=True, ensure_ascii=False, default=str)
+    return xxhash.xxh3_64_hexdigest(payload.encode("utf-8"))
+
+
+def load_manifest() -> dict:
+    if not MANIFEST_PATH.exists():
+        return {}
+    return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+
+
+def indexed_metadata_hash(entry) -> str | None:
+    """Metadata hash of a manifest entry; None for entries written without one."""
+    return entry[1] if isinstance(entry, list) else None
+
+
+def save_manifest(chunks: dict[str, list[str]]) -> None:
+    """Write ``chunks`` (chunk ID -> [source, metadata hash]) as the ingest manifest."""
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_name(MANIFEST_PATH.name + ".tmp")
+    payload = {
+        "model_name": MODEL_NAME,
+        "chunks": chunks,
+    }
+    tmp_path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def dedup_label(doc: Document) -> str | None:
+    """The provision a chunk belongs to; chunks of different provisions are never merged."""
+    citation = metadata_citation(doc.metadata or {})
+    if citation is None:
+        return None
+    return f"{citation.act}|{citation.kind}|{citation.number}"
+
+
+def save_dedup_report(removed: list[dict], threshold: float, checked: int) -> None:
+    """Write the near-duplicate chunks dropped by this run, grouped by source pair."""
+    by_source: dict[str, int] = {}
+    for entry in removed:
+        pair = f"{entry['source']} -> {entry['kept_source']}"
+        by_source[pair] = by_source.get(pair, 0) + 1
+    payload = {
+        "threshold": threshold,
+        "checked": checked,
+        "removed_count": len(removed),
+        "by_source": dict(sorted(by_source.items(), key=lambda item: item[1], reverse=True)),
+        "removed": removed,
+    }
+    DEDUP_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = DEDUP_REPORT_PATH.with_name(DEDUP_REPORT_PATH.name + ".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, DEDUP_REPORT_PATH)
+
 
+def index_version(chunks: dict[str, list[str]]) -> str:
+    """
+    Content version of the indexed corpus. Unchanged chunks, metadata and
+    model give the same version, so caches survive no-op reruns.
+    """
+    digest = xxhash.xxh3_64(MODEL_NAME.encode("utf-8"))
+    for cid in sorted(chunks):
+        digest.update(f"{cid}\x1f{chunks[cid][1]}".encode("ascii"))
+    return digest.hexdigest()
 
-def run_ingestion() -> None:
-    pdf_docs = load_pdf_files(DATA_PATH)
-    csv_docs = load_all_csvs(DATA_PATH)
-    txt_docs = load_txt_files(DATA_PATH)
 
-    all_docs = csv_docs + txt_docs
-    print(f"Loaded {len(pdf_docs)} PDF documents/pages.")
-    print(f"Loaded {len(csv_docs)} CSV rows/documents.")
-    print(f"Loaded {len(txt_docs)} TXT documents.")
-    print(f"Loaded {len(all_docs)} total document pages/rows.")
+def load_embeddings(batch_size: int = 32, threads: int | None = None) -> Embeddings:
+    # EMBEDDING_BACKEND=onnx embeds with the exported ONNX model instead of torch.
+    return build_embeddings(MODEL_NAME, batch_size=batch_size, threads=threads)
 
-    print("Splitting text into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        separators=["\n\n", "\n", " ", ""],
+
+def export_numpy_index(
+    db: Chroma,
+    out_dir: Path = NUMPY_INDEX_PATH,
+    page_size: int = 5000,
+    precision: str = "float32",
+) -> None:
+    """
+    Copy the vectors already stored in Chroma into the NumPy exact-search
+    index used by VECTOR_BACKEND=numpy. Nothing is re-embedded. With a
+    float16/int8 ``precision`` a quantized copy is written alongside.
+    """
+    collection = db._collection
+    total = collection.count()
+    staging_dir = out_dir.with_name(out_dir.name + ".staging")
+    writer = NumpyIndexWriter(staging_dir, model_name=MODEL_NAME)
+
+    for offset in range(0, total, page_size):
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=page_size,
+            offset=offset,
+        )
+        writer.add(page["ids"], page["documents"], page["metadatas"], page["embeddings"])
+
+    writer.close()
+    if precision != "float32":
+        quantize_embeddings(staging_dir, precision)
+    replace_directory(staging_dir, out_dir)
+    print(f"Exported {writer.count} vectors to NumPy index at {out_dir}.")
+
+
+def export_artifact(
+    db: Chroma,
+    out_root: Path = ARTIFACTS_PATH,
+    precision: str = "float32",
+    archive: bool = False,
+) -> Path:
+    """
+    Package the indexed corpus as a portable artifact: the NumPy index files
+    (embeddings.npy, chunks.jsonl, index_meta.json), the BM25 and citation
+    indexes, and artifact.json with the model name, content version and a
+    SHA-256 per file. Hosts serve it with VECTOR_ARTIFACT_PATH, memory-mapping
+    the vectors instead of re-embedding the corpus.
+    """
+    content_version = read_index_version(INDEX_VERSION_PATH) or "unversioned"
+    name = f"legal-corpus-{content_version}"
+    staging_dir = out_root / f".{name}.staging"
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+
+    export_numpy_index(db, out_dir=staging_dir, precision=precision)
+    for path in (BM25_PATH, CITATION_PATH):
+        if path.exists():
+            shutil.copy2(path, staging_dir / path.name)
+        else:
+            print(f"WARNING: {path} not found; the artifact will not include it.")
+
+    meta = json.loads((staging_dir / "index_meta.json").read_text(encoding="utf-8"))
+    manifest = write_artifact_manifest(
+        staging_dir,
+        name=name,
+        model_name=MODEL_NAME,
+        dim=meta["dim"],
+        count=meta["count"],
+        content_version=content_version,
+        precision=precision,
     )
-    chunks = text_splitter.split_documents(all_docs)
-    print(f"Created {len(chunks)} total chunks.")
+    artifact_dir = out_root / name
+    replace_directory(staging_dir, artifact_dir)
+    size = sum(entry["bytes"] for entry in manifest["files"].values())
+    print(
+        f"Wrote artifact {artifact_dir} ({meta['count']} chunks, {size / 1e6:.1f} MB, "
+        f"checksum {manifest['checksum'][:12]})."
+    )
+    if archive:
+        print(f"Packed {pack_artifact(artifact_dir)}.")
+    return artifact_dir
+
+
+def export_act_shards(
+    db: Chroma,
+    out_dir: Path = SHARDS_PATH,
+    acts: list[str] | None = None,
+    page_size: int = 5000,
+    precision: str = "float32",
+    faiss_type: str | None = None,
+    nlist: int = 256,
+    hnsw_m: int = 32,
+) -> None:
+    """
+    Split the vectors stored in Chroma into one NumPy index per act (plus one
+    for chunks without an act) under ``out_dir``, for VECTOR_SHARDED=true.
+    Nothing is re-embedded. With ``faiss_type`` each shard also gets a FAISS
+    index of that type.
+
+    ``acts`` rebuilds only those shards and leaves the others untouched; a
+    requested act that no longer has chunks loses its shard. Without ``acts``
+    every shard is rebuilt and shards of vanished acts are removed.
+    """
+    wanted = None
+    if acts is not None:
+        # "unassigned" names the shard of chunks without an act.
+        wanted = {normalize_facet("act", act) for act in acts}
+        wanted = {None if act == UNASSIGNED_SHARD else act for act in wanted}
+    shards = read_shard_manifest(out_dir)
+    writers: dict[str | None, NumpyIndexWriter] = {}
+    collection = db._collection
+    total = collection.count()
+
+    for offset in range(0, total, page_size):
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=page_size,
+            offset=offset,
+        )
+        groups: dict[str | None, list[int]] = {}
+        for i, metadata in enumerate(page["metadatas"]):
+            act = (metadata or {}).get("act")
+            key = normalize_facet("act", act) if act not in (None, "") else None
+            if wanted is None or key in wanted:
+                groups.setdefault(key, []).append(i)
+        for key, positions in groups.items():
+            writer = writers.get(key)
+            if writer is None:
+                staging_dir = out_dir / f"{shard_dir_name(key)}.staging"
+                if staging_dir.exists():
+                    shutil.rmtree(staging_dir)
+                writer = writers[key] = NumpyIndexWriter(staging_dir, model_name=MODEL_NAME)
+            writer.add(
+                [page["ids"][i] for i in positions],
+                [page["documents"][i] for i in positions],
+                [page["metadatas"][i] for i in positions],
+                [page["embeddings"][i] for i in positions],
+            )
+
+    for key, writer in writers.items():
+        staging_dir = writer.close()
+        if precision != "float32":
+            quantize_embeddings(staging_dir, precision)
+        if faiss_type:
+            build_faiss_index(staging_dir, index_type=faiss_type, nlist=nlist, hnsw_m=hnsw_m, precision=precision)
+        replace_directory(staging_dir, out_dir / shard_dir_name(key))
+        shards[key] = {"dir": shard_dir_name(key), "count": writer.count}
+        print(f"  shard {key or UNASSIGNED_SHARD}: {writer.count} vectors")
+
+    stale = [key for key in shards if key not in writers and (wanted is None or key in wanted)]
+    for key in stale:
+        shutil.rmtree(out_dir / shards.pop(key)["dir"], ignore_errors=True)
+        print(f"  shard {key or UNASSIGNED_SHARD}: removed (no chunks left)")
+    write_shard_manifest(out_dir, shards, MODEL_NAME)
+    print(f"Exported {len(writers)} act shards to {out_dir} ({len(shards)} total).")
+
+
+def publish_index_snapshot(include_local_index: bool, include_shards: bool, keep: int = 3) -> str:
+    """
+    Copy the finished stores into a new snapshot under SNAPSHOTS_PATH and
+    point CURRENT at it; running API workers load it in the background and
+    swap it in. The NumPy/FAISS index is included only when it was exported
+    in the same run, so a snapshot never pairs vectors from different builds;
+    the same goes for the act shards.
+    """
+    sources = {"vector_db": CHROMA_PATH}
+    if include_local_index and NUMPY_INDEX_PATH.exists():
+        sources["vector_index"] = NUMPY_INDEX_PATH
+    if include_shards and SHARDS_PATH.exists():
+        sources["vector_shards"] = SHARDS_PATH
+    content_version = read_index_version(INDEX_VERSION_PATH) or "unversioned"
+    name = create_snapshot(SNAPSHOTS_PATH, sources, content_version)
+    publish_snapshot(SNAPSHOTS_PATH, name)
+    print(f"Published index snapshot {name} ({', '.join(sources)}).")
+    for removed in prune_snapshots(SNAPSHOTS_PATH, keep=keep):
+        print(f"Removed old snapshot {removed}.")
+    return name
+
+
+def run_ingestion(
+    workers: int = 4,
+    batch_size: int = 64,
+    threads: int | None = None,
+    write_batch: int = 1000,
+    include_pdfs: bool = False,
+    dedup_threshold: float | None = None,
+    chunking: str = "statute",
+    chunk_max_chars: int = DEFAULT_MAX_CHARS,
+) -> None:
+    """
+    Stream file -> rows/pages -> chunks -> embedding batches -> vector store.
+
+    Chunks whose MinHash similarity to an earlier chunk of the same
+    provision reaches ``dedup_threshold`` are dropped (0 keeps every distinct
+    chunk) and listed in the dedup report. The PDFs repeat provisions the CSV
+    and TXT sources already hold, so by default (None) dedup runs at 0.85
+    when PDFs are ingested; the CSV and TXT sources alone hold no
+    near-duplicate text and are not checked.
+
+    Only one write batch of chunks is held at a time. The BM25 and citation
+    indexes are spooled to disk and written afterwards. What still grows with
+    the corpus is per-chunk bookkeeping: the manifest's chunk IDs, the MinHash
+    signatures for dedup and the citation entries (row numbers).
+    """
+    load_stats = StageStats("load", unit="docs")
+    split_stats = StageStats("split")
+    dedup_stats = StageStats("dedup")
+    embed_stats = StageStats("embed")
+    write_stats = StageStats("write")
+    started = time.perf_counter()
+
+    chunker = build_chunker(chunking, chunk_max_chars)
+
+    manifest = load_manifest()
+    indexed: dict = manifest.get("chunks", {})
+    if manifest.get("model_name") != MODEL_NAME and CHROMA_PATH.exists():
+        # Stores written before the manifest existed hold random IDs and
+        # duplicate vectors, and a model change invalidates every vector.
+        print("No compatible ingest manifest found; rebuilding the vector store from scratch.")
+        Chroma(persist_directory=str(CHROMA_PATH)).delete_collection()
+        indexed = {}
+
+    collection = Chroma(persist_directory=str(CHROMA_PATH))._collection
+    embeddings = None
+    bm25 = BM25IndexWriter(BM25_PATH)
+    citations = CitationIndexWriter(CITATION_PATH)
+    current: dict[str, list[str]] = {}
+    if dedup_threshold is None:
+        dedup_threshold = DEFAULT_DEDUP_THRESHOLD if include_pdfs else 0.0
+    near_duplicates = NearDuplicateIndex(threshold=dedup_threshold) if dedup_threshold > 0 else None
+    removed_duplicates: list[dict] = []
+
+    def changed_chunks() -> Iterator[tuple[str, Document]]:
+        documents = timed(load_corpus(DATA_PATH, workers=workers, include_pdfs=include_pdfs), load_stats)
+        for chunk in split_stream(documents, chunker, split_stats):
+            cid = chunk_id(chunk)
+            # Identical chunks collapse onto one ID; keep the first occurrence.
+            if cid in current:
+                continue
+            if near_duplicates is not None:
+                with dedup_stats.track(1):
+                    match = near_duplicates.find_or_add(cid, chunk.page_content, dedup_label(chunk))
+                if match is not None:
+                    kept_id, similarity = match
+                    removed_duplicates.append(
+                        {
+                            "id": cid,
+                            "source": _chunk_source(chunk),
+                            "kept_id": kept_id,
+                            "kept_source": current[kept_id][0],
+                            "similarity": round(similarity, 3),
+                            "preview": chunk.page_content[:160],
+                        }
+                    )
+                    continue
+            current[cid] = [_chunk_source(chunk), metadata_hash(chunk)]
+            bm25.add(chunk)
+            citations.add(chunk)
+            # New chunks are embedded; indexed ones whose metadata changed
+            # only get their metadata rewritten.
+            if cid not in indexed or indexed_metadata_hash(indexed[cid]) != current[cid][1]:
+                yield cid, chunk
+
+    print(f"Streaming corpus from {DATA_PATH} into {CHROMA_PATH}...")
+    updated = 0
+    for batch in batched(changed_chunks(), write_batch):
+        stale = [(cid, doc) for cid, doc in batch if cid in indexed]
+        if stale:
+            with write_stats.track(len(stale)):
+                stale_ids = [cid for cid, _ in stale]
+                # Chroma merges updated metadata into the stored one; keys the
+                # new metadata no longer has are deleted by setting them to None.
+                stored = collection.get(ids=stale_ids, include=["metadatas"])
+                dropped = {cid: (metadata or {}).keys() for cid, metadata in zip(stored["ids"], stored["metadatas"])}
+                collection.update(
+                    ids=stale_ids,
+                    metadatas=[
+                        {**dict.fromkeys(dropped.get(cid, ())), **doc.metadata} for cid, doc in stale
+                    ],
+                )
+            updated += len(stale)
+        batch = [(cid, doc) for cid, doc in batch if cid not in indexed]
+        if not batch:
+            if stale:
+                indexed.update((cid, current[cid]) for cid, _ in stale)
+                save_manifest(indexed)
+            continue
+
+        if embeddings is None:
+            embeddings = load_embeddings(batch_size=batch_size, threads=threads)
+        ids = [cid for cid, _ in batch]
+        texts = [doc.page_content for _, doc in batch]
+        with embed_stats.track(len(batch)):
+            vectors = embeddings.embed_documents(texts)
+        with write_stats.track(len(batch)):
+            # Upsert: chunks written by an interrupted run that missed the
+            # manifest checkpoint are overwritten, not duplicated.
+            collection.upsert(
+                ids=ids,
+                embeddings=vectors,
+                documents=texts,
+                metadatas=[doc.metadata for _, doc in batch],
+            )
+            # Checkpoint, so an interrupted run resumes after this batch.
+            indexed.update((cid, current[cid]) for cid, _ in stale + batch)
+            save_manifest(indexed)
+        rate = embed_stats.items / embed_stats.seconds if embed_stats.seconds else 0.0
+        print(f"  {embed_stats.items} new chunks embedded ({rate:.1f} chunks/s)")
 
-    if not chunks:
+    print(f"Loaded {load_stats.items} document pages/rows.")
+    print(f"Created {split_stats.items} chunks ({len(current)} unique).")
+    if near_duplicates is not None:
+        save_dedup_report(removed_duplicates, dedup_threshold, dedup_stats.items)
+        print(
+            f"Dropped {len(removed_duplicates)} near-duplicate chunks "
+            f"(similarity >= {dedup_threshold}); report at {DEDUP_REPORT_PATH}."
+        )
+    else:
+        # A report from an earlier run would describe chunks this run kept.
+        DEDUP_REPORT_PATH.unlink(missing_ok=True)
+    if not current:
+        bm25.discard()
+        citations.discard()
         print("No chunks to ingest. Vector store was not changed.")
         return
 
-    embeddings = HuggingFaceEmbeddings(
-        model_name="all-MiniLM-L6-v2",
-        model_kwargs={"local_files_only": True},
+    removed_ids = [cid for cid in indexed if cid not in current]
+    for batch in batched(removed_ids, write_batch):
+        with write_stats.track():
+            collection.delete(ids=batch)
+    print(
+        f"{len(current) - embed_stats.items} chunks already indexed, "
+        f"{embed_stats.items} embedded, {len(removed_ids)} removed, "
+        f"{updated} metadata updated."
     )
+    save_manifest(current)
+
+    print(f"Building BM25 index at {BM25_PATH}...")
+    bm25.close()
+    citations.close()
+    print(f"Citation index at {CITATION_PATH}: {len(citations)} sections/articles.")
+
+    # Running services drop cached search results when this version changes.
+    version = index_version(current)
+    publish_index_version(INDEX_VERSION_PATH, version)
+    print(f"Published index version {version}.")
+
+    print("Ingestion complete. Stage throughput:")
+    for stats in (load_stats, split_stats, dedup_stats, embed_stats, write_stats):
+        print(f"  {stats.report()}")
+    print(f"  total    {time.perf_counter() - started:.2f}s")
 
-    print(f"Adding chunks to vector store at {CHROMA_PATH}...")
-    db = Chroma(
-        persist_directory=str(CHROMA_PATH),
-        embedding_function=embeddings,
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embed the legal corpus into the vector store.")
+    parser.add_argument(
+        "--export-numpy",
+        action="store_true",
+        help=f"Also export the stored vectors to the NumPy index at {NUMPY_INDEX_PATH}.",
+    )
+    parser.add_argument(
+        "--export-faiss",
+        nargs="?",
+        const=os.getenv("FAISS_INDEX_TYPE", "flat"),
+        choices=FAISS_INDEX_TYPES,
+        help="Export the NumPy index and build a FAISS index of the given type on top of it.",
+    )
+    parser.add_argument(
+        "--precision",
+        choices=PRECISIONS,
+        default=os.getenv("VECTOR_INDEX_PRECISION", "float32"),
+        help="Storage precision of the exported NumPy/FAISS vectors (re-scored in float32).",
+    )
+    parser.add_argument(
+        "--export-artifact",
+        action="store_true",
+        help=f"Package vectors, chunks and BM25/citation indexes as a portable artifact under {ARTIFACTS_PATH}.",
+    )
+    parser.add_argument(
+        "--artifact-archive",
+        action="store_true",
+        help="Also bundle the artifact into a single .tar for shipping.",
+    )
+    parser.add_argument(
+        "--export-shards",
+        nargs="*",
+        metavar="ACT",
+        help=f"Export one index per act to {SHARDS_PATH}; name acts to rebuild only their shards.",
+    )
+    parser.add_argument(
+        "--shard-index",
+        choices=("numpy",) + FAISS_INDEX_TYPES,
+        default=os.getenv("SHARD_INDEX_TYPE", "numpy"),
+        help="Search structure of each act shard: exact NumPy or a FAISS index type.",
+    )
+    parser.add_argument("--faiss-nlist", type=int, default=int(os.getenv("FAISS_NLIST", "256")))
+    parser.add_argument("--faiss-hnsw-m", type=int, default=int(os.getenv("FAISS_HNSW_M", "32")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1)))),
+        help="Processes used to parse PDF page ranges.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64")),
+        help="Texts per embedding model forward pass.",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=int(os.getenv("INGEST_EMBED_THREADS", "0")) or None,
+        help="CPU threads for the embedding model (defaults to the torch/onnxruntime default).",
+    )
+    parser.add_argument(
+        "--write-batch",
+        type=int,
+        default=int(os.getenv("INGEST_WRITE_BATCH", "1000")),
+        help="Chunks embedded and written to the vector store per bulk write.",
+    )
+    parser.add_argument(
+        "--include-pdfs",
+        action="store_true",
+        help="Also parse and index the PDFs in Data/ (skipped by default).",
     )
-    db.add_documents(chunks)
-    db.persist()
-    print("Ingestion complete.")
+    parser.add_argument(
+        "--chunking",
+        choices=("statute", "recursive"),
+        default=os.getenv("INGEST_CHUNKING", "statute"),
+        help="statute: one chunk per section/article; recursive: fixed 1000-char windows.",
+    )
+    parser.add_argument(
+        "--chunk-max-chars",
+        type=int,
+        default=int(os.getenv("INGEST_CHUNK_MAX_CHARS", str(DEFAULT_MAX_CHARS))),
+        help="Legal units longer than this are split at clause boundaries.",
+    )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=float(os.environ["INGEST_DEDUP_THRESHOLD"]) if os.getenv("INGEST_DEDUP_THRESHOLD") else None,
+        help=(
+            "MinHash similarity at which a chunk counts as a near-duplicate (0 disables). "
+            f"Defaults to {DEFAULT_DEDUP_THRESHOLD} with --include-pdfs, off otherwise."
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help=f"Publish the result as a new snapshot under {SNAPSHOTS_PATH} for hot-swap.",
+    )
+    parser.add_argument(
+        "--keep-snapshots",
+        type=int,
+        default=int(os.getenv("INDEX_SNAPSHOTS_KEEP", "3")),
+        help="Snapshots kept after publishing (the current one is never removed).",
+    )
+    parser.add_argument(
+        "--skip-ingest",
+        action="store_true",
+        help="Do not re-embed the corpus; only run the requested exports.",
+    )
+    args = parser.parse_args()
+
+    if not args.skip_ingest:
+        run_ingestion(
+            workers=args.workers,
+            batch_size=args.batch_size,
+            threads=args.threads,
+            write_batch=args.write_batch,
+            include_pdfs=args.include_pdfs,
+            dedup_threshold=args.dedup_threshold,
+            chunking=args.chunking,
+            chunk_max_chars=args.chunk_max_chars,
+        )
+
+    if args.export_numpy or args.export_faiss:
+        if not CHROMA_PATH.exists():
+            print(f"No Chroma store at {CHROMA_PATH}; run ingestion first.")
+            return
+        # Exports copy stored vectors, so the embedding model is not needed here.
+        db = Chroma(persist_directory=str(CHROMA_PATH))
+        export_numpy_index(db, precision=args.precision)
+
+    if args.export_faiss:
+        path = build_faiss_index(
+            NUMPY_INDEX_PATH,
+            index_type=args.export_faiss,
+            nlist=args.faiss_nlist,
+            hnsw_m=args.faiss_hnsw_m,
+            precision=args.precision,
+        )
+        print(f"Built {args.export_faiss} FAISS index at {path}.")
+
+    if args.export_artifact:
+        if not CHROMA_PATH.exists():
+            print(f"No Chroma store at {CHROMA_PATH}; run ingestion first.")
+            return
+        db = Chroma(persist_directory=str(CHROMA_PATH))
+        export_artifact(db, precision=args.precision, archive=args.artifact_archive)
+
+    if args.export_shards is not None:
+        if not CHROMA_PATH.exists():
+            print(f"No Chroma store at {CHROMA_PATH}; run ingestion first.")
+            return
+        db = Chroma(persist_directory=str(CHROMA_PATH))
+        export_act_shards(
+            db,
+            acts=args.export_shards or None,
+            precision=args.precision,
+            faiss_type=None if args.shard_index == "numpy" else args.shard_index,
+            nlist=args.faiss_nlist,
+            hnsw_m=args.faiss_hnsw_m,
+        )
+
+    if args.snapshot:
+        if not CHROMA_PATH.exists():
+            print(f"No Chroma store at {CHROMA_PATH}; run ingestion first.")
+            return
+        publish_index_snapshot(
+            include_local_index=bool(args.export_numpy or args.export_faiss),
+            include_shards=args.export_shards is not None,
+            keep=args.keep_snapshots,
+        )
 
 
 if __name__ == "__main__":
-    run_ingestion()
+    main()
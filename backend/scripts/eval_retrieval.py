@@ -0,0 +1,369 @@
+"""
+Retrieval quality and latency benchmark for VectorService.
+
+Runs the labeled query set (citations, natural-language questions and long
+document excerpts like the summarizer's 500-char query) through
+search_legal_docs_with_scores and search_for_chatbot once per configuration
+and reports recall@k, MRR, p50/p95/p99 latency and throughput. Results are
+written as JSON; pass an earlier file as --baseline to flag regressions:
+
+    python scripts/eval_retrieval.py --config chroma --config numpy --output base.json
+    python scripts/eval_retrieval.py --config numpy --baseline base.json
+
+A configuration is a preset name or "name:KEY=VALUE,KEY=VALUE" with the
+VectorService environment settings to use, e.g.
+"ivf-nprobe4:VECTOR_BACKEND=faiss,FAISS_NPROBE=4".
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from utils.citation_utils import metadata_citation  # noqa: E402
+
+QUERIES_PATH = Path(__file__).resolve().parent / "retrieval_queries.jsonl"
+RESULTS_PATH = BASE_DIR / "bench_results"
+
+PRESETS: dict[str, dict[str, str]] = {
+    "chroma": {"VECTOR_BACKEND": "chroma"},
+    "numpy": {"VECTOR_BACKEND": "numpy"},
+    "numpy-int8": {"VECTOR_BACKEND": "numpy", "VECTOR_INDEX_PRECISION": "int8"},
+    "numpy-sharded": {"VECTOR_BACKEND": "numpy", "VECTOR_SHARDED": "true"},
+    "faiss": {"VECTOR_BACKEND": "faiss"},
+}
+
+# Timed runs measure retrieval itself, not the result/embedding caches, and
+# must not swap index snapshots halfway through.
+COLD_CACHE_ENV = {"RESULT_CACHE_SIZE": "0", "EMBEDDING_CACHE_SIZE": "0"}
+FIXED_ENV = {"INDEX_AUTO_RELOAD": "false"}
+
+
+def _search(service, query: str, k: int):
+    return [doc for doc, _ in service.search_legal_docs_with_scores(query, k=k)]
+
+
+def _chatbot(service, query: str, k: int):
+    return service.search_for_chatbot(query, k=k)
+
+
+METHODS = {
+    "search_legal_docs_with_scores": _search,
+    "search_for_chatbot": _chatbot,
+}
+
+
+def load_queries(path: Path) -> list[dict]:
+    queries = []
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if not entry.get("query") or not entry.get("relevant"):
+                raise ValueError(f"{path}:{number}: every query needs 'query' and 'relevant'.")
+            entry.setdefault("id", f"q{number}")
+            entry.setdefault("kind", "natural")
+            queries.append(entry)
+    return queries
+
+
+def parse_config(spec: str) -> tuple[str, dict[str, str]]:
+    if ":" not in spec:
+        if spec not in PRESETS:
+            raise SystemExit(f"Unknown config '{spec}'; presets: {', '.join(PRESETS)}.")
+        return spec, dict(PRESETS[spec])
+    name, _, assignments = spec.partition(":")
+    env = {}
+    for assignment in filter(None, assignments.split(",")):
+        key, sep, value = assignment.partition("=")
+        if not sep:
+            raise SystemExit(f"Config '{spec}': expected KEY=VALUE, got '{assignment}'.")
+        env[key.strip()] = value.strip()
+    return name, env
+
+
+def doc_label(doc) -> str | None:
+    citation = metadata_citation(doc.metadata or {})
+    if citation is None:
+        return None
+    return f"{citation.act}|{citation.kind}|{citation.number}"
+
+
+def judge(labels: list[str | None], relevant: list[str], ks: list[int]) -> dict:
+    """Recall at each k and the rank of the first relevant result (None if absent)."""
+    wanted = set(relevant)
+    rank = next((i for i, label in enumerate(labels, start=1) if label in wanted), None)
+    recall = {f"recall@{k}": len(wanted & set(labels[:k])) / len(wanted) for k in ks}
+    return {**recall, "rank": rank, "rr": 1.0 / rank if rank else 0.0}
+
+
+def latency_summary(samples: list[float], wall_seconds: float) -> dict:
+    ms = np.asarray(samples) * 1000
+    return {
+        "calls": len(samples),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "qps": round(len(samples) / wall_seconds, 2) if wall_seconds else None,
+    }
+
+
+def quality_summary(judgements: list[dict], ks: list[int]) -> dict:
+    if not judgements:
+        return {"queries": 0}
+    summary = {"queries": len(judgements)}
+    for k in ks:
+        summary[f"recall@{k}"] = round(float(np.mean([j[f"recall@{k}"] for j in judgements])), 4)
+    summary["mrr"] = round(float(np.mean([j["rr"] for j in judgements])), 4)
+    return summary
+
+
+@contextlib.contextmanager
+def patched_env(overrides: dict[str, str]):
+    previous = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def bench_method(service, method, queries: list[dict], ks: list[int], repeat: int, concurrency: int) -> dict:
+    k = max(ks)
+    # Quality comes from one untimed pass, which also warms the code paths.
+    per_query = []
+    for entry in queries:
+        labels = [doc_label(doc) for doc in method(service, entry["query"], k)]
+        per_query.append({"id": entry["id"], "kind": entry["kind"], **judge(labels, entry["relevant"], ks)})
+
+    def timed(query: str) -> float:
+        start = time.perf_counter()
+        method(service, query, k)
+        return time.perf_counter() - start
+
+    workload = [entry["query"] for entry in queries] * repeat
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, workload))
+    else:
+        samples = [timed(query) for query in workload]
+    wall_seconds = time.perf_counter() - start
+
+    kinds = sorted({entry["kind"] for entry in per_query})
+    return {
+        "quality": quality_summary(per_query, ks),
+        "by_kind": {kind: quality_summary([j for j in per_query if j["kind"] == kind], ks) for kind in kinds},
+        "latency": latency_summary(samples, wall_seconds),
+        "queries": [{"id": j["id"], "rank": j["rank"], f"recall@{k}": j[f"recall@{k}"]} for j in per_query],
+    }
+
+
+def bench_config(name: str, env: dict[str, str], queries: list[dict], args) -> dict:
+    overrides = {**FIXED_ENV, **({} if args.warm_caches else COLD_CACHE_ENV), **env}
+    result: dict = {"name": name, "env": env, "index_ready": False, "methods": {}}
+    with patched_env(overrides):
+        from services.vector_service import VectorService
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            service = VectorService()
+            ready = service.warmup()
+        result["load_seconds"] = round(time.perf_counter() - start, 3)
+        if not ready:
+            result["skipped"] = log.getvalue().strip().splitlines()[-2:]
+            return result
+
+        result["index_ready"] = True
+        result["index_version"] = service.current_version()
+        result["backend"] = service.backend.name
+
+        # Queries whose provisions are not in this build cannot be judged.
+        known = set(service.citations.entries) if service.citations is not None else None
+        judged = [q for q in queries if known is None or known.intersection(q["relevant"])]
+        result["unjudged_queries"] = [q["id"] for q in queries if q not in judged]
+
+        for method_name, method in METHODS.items():
+            # search_for_chatbot prints a debug block per call.
+            with contextlib.redirect_stdout(io.StringIO()):
+                result["methods"][method_name] = bench_method(
+                    service, method, judged, args.k, args.repeat, args.concurrency
+                )
+    return result
+
+
+def print_report(results: list[dict], ks: list[int]) -> None:
+    for config in results:
+        if not config["index_ready"]:
+            reason = " ".join(config.get("skipped") or ["index not available"])
+            print(f"\n[{config['name']}] skipped: {reason}")
+            continue
+        print(
+            f"\n[{config['name']}] backend={config['backend']} version={config['index_version']} "
+            f"loaded in {config['load_seconds']:.2f}s"
+        )
+        if config["unjudged_queries"]:
+            print(f"  not in this index: {', '.join(config['unjudged_queries'])}")
+        for method_name, method in config["methods"].items():
+            quality, latency = method["quality"], method["latency"]
+            recalls = " ".join(f"R@{k}={quality[f'recall@{k}']:.3f}" for k in ks)
+            print(
+                f"  {method_name:<30} {recalls} MRR={quality['mrr']:.3f} "
+                f"p50={latency['p50_ms']:.2f}ms p95={latency['p95_ms']:.2f}ms "
+                f"p99={latency['p99_ms']:.2f}ms {latency['qps']:.1f} q/s"
+            )
+            for kind, summary in method["by_kind"].items():
+                recalls = " ".join(f"R@{k}={summary[f'recall@{k}']:.3f}" for k in ks)
+                print(f"    {kind:<28} n={summary['queries']:<3} {recalls} MRR={summary['mrr']:.3f}")
+
+
+def compare(results: list[dict], baseline: dict, max_recall_drop: float, max_p95_increase: float) -> list[str]:
+    """Regressions of ``results`` against a previous run, matched by config and method."""
+    previous = {config["name"]: config for config in baseline.get("configs", [])}
+    k = max(baseline.get("k", [10]))
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('created_at')} ({baseline.get('git_commit')}):")
+    for config in results:
+        old_config = previous.get(config["name"])
+        if not config["index_ready"] or not old_config or not old_config.get("index_ready"):
+            continue
+        for method_name, method in config["methods"].items():
+            old = old_config["methods"].get(method_name)
+            if old is None:
+                continue
+            key = f"recall@{k}"
+            if key not in method["quality"]:
+                continue
+            recall_delta = method["quality"][key] - old["quality"][key]
+            mrr_delta = method["quality"]["mrr"] - old["quality"]["mrr"]
+            p95_ratio = method["latency"]["p95_ms"] / old["latency"]["p95_ms"] - 1 if old["latency"]["p95_ms"] else 0.0
+            print(
+                f"  {config['name']:<16} {method_name:<30} {key} {recall_delta:+.4f} "
+                f"MRR {mrr_delta:+.4f} p95 {p95_ratio:+.1%}"
+            )
+            if recall_delta < -max_recall_drop:
+                regressions.append(f"{config['name']}/{method_name}: {key} dropped by {-recall_delta:.4f}")
+            if p95_ratio > max_p95_increase:
+                regressions.append(f"{config['name']}/{method_name}: p95 latency up {p95_ratio:.1%}")
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--config",
+        action="append",
+        dest="configs",
+        help=f"Preset ({', '.join(PRESETS)}) or name:KEY=VALUE,... (repeatable). Default: all presets.",
+    )
+    parser.add_argument("--queries", type=Path, default=QUERIES_PATH)
+    parser.add_argument("--kind", action="append", help="Only run queries of this kind (repeatable).")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10], help="Cutoffs for recall@k.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the query set.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Threads issuing queries in timed passes.")
+    parser.add_argument("--warm-caches", action="store_true", help="Keep the result and embedding caches on.")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help=f"Results JSON (default: {RESULTS_PATH}/retrieval-<UTC time>.json).",
+    )
+    parser.add_argument("--baseline", type=Path, help="Earlier results JSON to compare against.")
+    parser.add_argument("--max-recall-drop", type=float, default=0.02)
+    parser.add_argument("--max-p95-increase", type=float, default=0.5, help="Allowed relative p95 increase.")
+    args = parser.parse_args()
+    args.k = sorted(set(args.k))
+
+    queries = load_queries(args.queries)
+    if args.kind:
+        queries = [q for q in queries if q["kind"] in args.kind]
+    configs = [parse_config(spec) for spec in (args.configs or PRESETS)]
+    kinds = {kind: sum(q["kind"] == kind for q in queries) for kind in sorted({q["kind"] for q in queries})}
+    print(f"{len(queries)} queries ({', '.join(f'{n} {kind}' for kind, n in kinds.items())}), {len(configs)} configs")
+
+    results = []
+    for name, env in configs:
+        print(f"Running {name}...")
+        results.append(bench_config(name, env, queries, args))
+
+    print_report(results, args.k)
+
+    created_at = datetime.now(timezone.utc)
+    payload = {
+        "created_at": created_at.isoformat(),
+        "git_commit": _git_commit(),
+        "k": args.k,
+        "repeat": args.repeat,
+        "concurrency": args.concurrency,
+        "warm_caches": args.warm_caches,
+        "query_set": {
+            "path": str(args.queries),
+            "sha256": hashlib.sha256(args.queries.read_bytes()).hexdigest(),
+            "kinds": kinds,
+        },
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "configs": results,
+    }
+    output = args.output or RESULTS_PATH / f"retrieval-{created_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"\nWrote results to {output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("query_set", {}).get("sha256") != payload["query_set"]["sha256"]:
+            print("WARNING: the baseline used a different query set; deltas are not comparable.")
+        for setting in ("concurrency", "warm_caches"):
+            if baseline.get(setting) != payload[setting]:
+                print(f"WARNING: baseline ran with {setting}={baseline.get(setting)}; latencies are not comparable.")
+        regressions = compare(results, baseline, args.max_recall_drop, args.max_p95_increase)
+        if regressions:
+            print("FAIL:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("OK: no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Export all-MiniLM-L6-v2 to ONNX for EMBEDDING_BACKEND=onnx.
+
+Reads the locally cached sentence-transformers model, writes the transformer
+graph, its tokenizer and an int8 dynamically quantized copy to ONNX_MODEL_DIR
+(default backend/onnx_models/all-MiniLM-L6-v2), then checks that the ONNX
+vectors match the PyTorch ones and compares single-query latency:
+
+    python scripts/export_onnx.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+
+from utils.embedding_utils import (  # noqa: E402
+    DEFAULT_MODEL_NAME,
+    ONNX_META_FILE,
+    ONNX_MODEL_FILE,
+    ONNX_QUANTIZED_MODEL_FILE,
+    OnnxEmbeddings,
+    build_embeddings,
+    default_onnx_dir,
+)
+
+CHECK_QUERIES = [
+    "what is section 302",
+    "Article 21 protection of life and personal liberty",
+    "Whoever commits murder shall be punished with death, or imprisonment for life.",
+]
+
+
+def export(out_dir: Path, model_name: str, opset: int) -> None:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_name, device="cpu", local_files_only=True)
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            str(out_dir / ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+
+    tokenizer.save_pretrained(str(out_dir))
+    meta = {
+        "model_name": model_name,
+        "max_seq_length": st_model.max_seq_length,
+        "pad_token_id": tokenizer.pad_token_id,
+        "dimension": st_model.get_sentence_embedding_dimension(),
+        "opset": opset,
+    }
+    (out_dir / ONNX_META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    print(f"Exported {model_name} to {out_dir / ONNX_MODEL_FILE}")
+
+
+def quantize(out_dir: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        str(out_dir / ONNX_MODEL_FILE),
+        str(out_dir / ONNX_QUANTIZED_MODEL_FILE),
+        weight_type=QuantType.QInt8,
+    )
+    print(f"Wrote int8 model to {out_dir / ONNX_QUANTIZED_MODEL_FILE}")
+
+
+def _latency_ms(embeddings, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        for query in CHECK_QUERIES:
+            start = time.perf_counter()
+            embeddings.embed_query(query)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def verify(out_dir: Path, model_name: str, repeat: int) -> None:
+    reference = build_embeddings(model_name, backend="huggingface", device="cpu")
+    expected = np.array(reference.embed_documents(CHECK_QUERIES))
+    print(f"huggingface        p50={_latency_ms(reference, repeat):7.2f}ms")
+
+    for quantized in (False, True):
+        if quantized and not (out_dir / ONNX_QUANTIZED_MODEL_FILE).exists():
+            continue
+        onnx = OnnxEmbeddings(out_dir, quantized=quantized)
+        got = np.array(onnx.embed_documents(CHECK_QUERIES))
+        cosine = (got * expected).sum(axis=1) / (
+            np.linalg.norm(got, axis=1) * np.linalg.norm(expected, axis=1)
+        )
+        label = "onnx-int8" if quantized else "onnx"
+        print(
+            f"{label:<18} p50={_latency_ms(onnx, repeat):7.2f}ms "
+            f"min cosine vs torch={cosine.min():.5f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model-name", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--out-dir", type=Path, default=None)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 copy.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    out_dir = args.out_dir or default_onnx_dir(args.model_name)
+    export(out_dir, args.model_name, args.opset)
+    if not args.no_quantize:
+        quantize(out_dir)
+    verify(out_dir, args.model_name, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
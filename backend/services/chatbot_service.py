@@ -1,18 +1,22 @@
+from collections.abc import AsyncIterator
 from datetime import datetime
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pymongo.errors import PyMongoError
 
 from database import db_client
 from models.document import ChatHistoryResponse, ChatMessage
+from services.document_index_service import document_index_service
 from services.llm_service import llm_service
 from services.vector_service import vector_service
+from utils.facet_utils import SearchFilters
 
 
-def _build_general_prompt(query: str) -> str:
+def _build_general_prompt(query: str, filters: SearchFilters | None = None) -> str:
     try:
-        relevant_docs = vector_service.search_for_chatbot(query, k=3)
+        relevant_docs = vector_service.search_for_chatbot(query, k=3, filters=filters)
         context_text = "\n\n".join(doc.page_content for doc in relevant_docs)
     except Exception:
         context_text = ""
@@ -47,19 +51,39 @@ def _extract_document_text(document: dict) -> str:
     return ""
 
 
-def _build_document_prompt(query: str, document_text: str) -> str:
-    retrieval_query = f"{query}\n\nRelevant document excerpt:\n{document_text[:1200]}"
+def _build_document_prompt(
+    user_id: UUID,
+    document_id: str,
+    query: str,
+    document_text: str,
+    filters: SearchFilters | None = None,
+) -> str:
+    context = document_index_service.relevant_passages(user_id, document_id, document_text, query)
+    if context.chunk_count == 1:
+        document_context = context.best.text
+    else:
+        document_context = "\n\n".join(
+            f"[Passage {passage.position + 1}/{context.chunk_count}]\n{passage.text}"
+            for passage in context.passages
+        )
+        print(
+            f"Document {document_id}: {len(context.passages)} of {context.chunk_count} "
+            f"passages in prompt (~{context.tokens} tokens)."
+        )
+
+    retrieval_query = f"{query}\n\nRelevant document excerpt:\n{context.best.text[:1200]}"
     try:
-        relevant_docs = vector_service.search_for_chatbot(retrieval_query, k=3)
+        relevant_docs = vector_service.search_for_chatbot(retrieval_query, k=3, filters=filters)
         legal_context = "\n\n".join(doc.page_content for doc in relevant_docs)
     except Exception:
         legal_context = ""
+    document_heading = "Document content" if context.complete else "Relevant passages from the document"
     return (
         "You are a legal assistant answering questions about a specific user document. "
         "Base the answer primarily on the document content below. Use the retrieved legal "
         "context if it helps interpret the document.\n\n"
         f"Retrieved legal context:\n{legal_context or 'No additional legal context retrieved.'}\n\n"
-        f"Document content:\n{document_text}\n\n"
+        f"{document_heading}:\n{document_context}\n\n"
         f"Question:\n{query}"
     )
 
@@ -114,7 +138,13 @@ def _persist_document_chat(
         return
 
 
-def process_query(user_id: UUID, query: str, document_id: str | None = None):
+def prepare_query(
+    user_id: UUID,
+    query: str,
+    document_id: str | None = None,
+    filters: SearchFilters | None = None,
+) -> tuple[str, str]:
+    """Validate the query and build its prompt. Returns ``(cleaned_query, prompt)``."""
     cleaned_query = query.strip()
     if not cleaned_query:
         raise HTTPException(
@@ -131,9 +161,17 @@ def process_query(user_id: UUID, query: str, document_id: str | None = None):
                 detail="Selected document does not contain text for chatbot analysis.",
             )
 
-        prompt = _build_document_prompt(cleaned_query, document_text)
-    else:
-        prompt = _build_general_prompt(cleaned_query)
+        return cleaned_query, _build_document_prompt(user_id, document_id, cleaned_query, document_text, filters)
+    return cleaned_query, _build_general_prompt(cleaned_query, filters)
+
+
+def process_query(
+    user_id: UUID,
+    query: str,
+    document_id: str | None = None,
+    filters: SearchFilters | None = None,
+):
+    cleaned_query, prompt = prepare_query(user_id, query, document_id, filters)
 
     ai_answer = llm_service.get_ai_response(prompt)
 
@@ -142,6 +180,26 @@ def process_query(user_id: UUID, query: str, document_id: str | None = None):
     return ai_answer
 
 
+async def stream_answer(
+    user_id: UUID,
+    query: str,
+    prompt: str,
+    document_id: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Yield the answer to a prepared prompt as it is generated. The complete
+    answer is persisted like ``process_query`` does once the model finishes;
+    a stream that is cancelled part-way stores nothing.
+    """
+    parts: list[str] = []
+    async for token in llm_service.astream_ai_response(prompt):
+        parts.append(token)
+        yield token
+
+    if document_id:
+        await run_in_threadpool(_persist_document_chat, user_id, document_id, query, "".join(parts))
+
+
 def get_chat_history(user_id: UUID) -> list[ChatHistoryResponse]:
     if db_client.chat_history is None:
         raise HTTPException(
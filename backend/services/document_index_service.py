@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+import numpy as np
+from langchain_core.documents import Document
+from pymongo.errors import PyMongoError
+
+from database import db_client
+from services.vector_service import vector_service
+from utils.bm25_utils import BM25Index, reciprocal_rank_fusion
+from utils.cache_utils import LRUTTLCache
+from utils.vector_index_utils import l2_normalize
+
+# Gemini has no local tokenizer; ~4 characters per token holds for English
+# legal prose and errs on the side of smaller prompts.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class Passage:
+    position: int
+    start: int
+    text: str
+
+
+@dataclass(frozen=True)
+class DocumentContext:
+    """Passages chosen for a prompt, in document order, and the best match."""
+
+    passages: list[Passage]
+    best: Passage
+    chunk_count: int
+
+    @property
+    def complete(self) -> bool:
+        return len(self.passages) == self.chunk_count
+
+    @property
+    def tokens(self) -> int:
+        return sum(estimate_tokens(passage.text) for passage in self.passages)
+
+
+class DocumentChunkIndex:
+    """
+    Chunks of one stored document with their embeddings and a BM25 index,
+    for answering questions from the relevant passages only. ``matrix`` is
+    None when the embedding model is unavailable; ranking is then lexical.
+    """
+
+    def __init__(self, texts: list[str], starts: list[int], matrix: np.ndarray | None) -> None:
+        self.texts = texts
+        self.starts = starts
+        self.matrix = matrix
+        self.bm25 = BM25Index.build(Document(page_content=text) for text in texts)
+        self.total_tokens = sum(estimate_tokens(text) for text in texts)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def passage(self, position: int) -> Passage:
+        return Passage(position=position, start=self.starts[position], text=self.texts[position])
+
+    def rank(self, query: str, query_vector: list[float] | None) -> list[int]:
+        """Chunk positions, most relevant first (vector and BM25 fused with RRF)."""
+        rankings = []
+        if self.matrix is not None and query_vector is not None:
+            scores = self.matrix @ l2_normalize([query_vector])[0]
+            rankings.append(np.argsort(-scores, kind="stable").tolist())
+        rankings.append([row for row, _ in self.bm25.search(query, k=len(self.texts))])
+        ranked = reciprocal_rank_fusion(rankings)
+        # Chunks neither ranking found keep document order at the end.
+        seen = set(ranked)
+        return ranked + [position for position in range(len(self.texts)) if position not in seen]
+
+    def select(self, query: str, query_vector: list[float] | None, budget_tokens: int) -> DocumentContext:
+        """
+        The most relevant chunks that fit in ``budget_tokens``, in document
+        order. A document that fits entirely is returned whole.
+        """
+        ranked = self.rank(query, query_vector)
+        if self.total_tokens <= budget_tokens:
+            selected = list(range(len(self.texts)))
+        else:
+            selected = []
+            used = 0
+            for position in ranked:
+                tokens = estimate_tokens(self.texts[position])
+                if used + tokens > budget_tokens:
+                    continue
+                selected.append(position)
+                used += tokens
+                if budget_tokens - used < CHARS_PER_TOKEN * 8:
+                    break
+            if not selected:
+                # Budget smaller than one chunk: send the best chunk, cut to fit.
+                best = self.passage(ranked[0])
+                text = best.text[: budget_tokens * CHARS_PER_TOKEN]
+                best = Passage(position=best.position, start=best.start, text=text)
+                return DocumentContext(passages=[best], best=best, chunk_count=len(self.texts))
+        return DocumentContext(
+            passages=[self.passage(position) for position in sorted(selected)],
+            best=self.passage(ranked[0]),
+            chunk_count=len(self.texts),
+        )
+
+
+class DocumentIndexService:
+    """
+    Per-user, per-document chunk indexes for document-mode chat.
+
+    A document is chunked and embedded once; the index is kept in an
+    in-process LRU cache and stored in the ``document_chunk_indexes``
+    collection so other workers and restarts reuse it. Entries are keyed by
+    a hash of the document text, so regenerated documents are re-indexed.
+    """
+
+    def __init__(self) -> None:
+        self.chunk_chars = int(os.getenv("DOCUMENT_CHUNK_CHARS", "1000"))
+        self.chunk_overlap = int(os.getenv("DOCUMENT_CHUNK_OVERLAP", "100"))
+        self.context_token_budget = int(os.getenv("DOCUMENT_CONTEXT_TOKEN_BUDGET", "2000"))
+        self.cache = LRUTTLCache(
+            max_size=int(os.getenv("DOCUMENT_INDEX_CACHE_SIZE", "64")),
+            ttl_seconds=float(os.getenv("DOCUMENT_INDEX_CACHE_TTL_SECONDS", "3600")),
+        )
+        # key -> [build lock, callers holding or waiting on it]
+        self._locks: dict[tuple, list] = {}
+        self._locks_guard = threading.Lock()
+
+    def _text_hash(self, text: str) -> str:
+        config = f"{vector_service.model_name}|{self.chunk_chars}|{self.chunk_overlap}\n"
+        return hashlib.sha256((config + text).encode("utf-8")).hexdigest()
+
+    def _split(self, text: str) -> tuple[list[str], list[int]]:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=self.chunk_chars,
+            chunk_overlap=self.chunk_overlap,
+            separators=["\n\n", "\n", ". ", " ", ""],
+            add_start_index=True,
+        )
+        chunks = splitter.create_documents([text])
+        return [chunk.page_content for chunk in chunks], [chunk.metadata["start_index"] for chunk in chunks]
+
+    def _embed(self, texts: list[str]) -> np.ndarray | None:
+        if not vector_service.load_embeddings():
+            return None
+        try:
+            vectors = vector_service.embeddings.embed_documents(texts)
+        except Exception as e:
+            print(f"Document chunk embedding failed: {e}")
+            return None
+        return l2_normalize(vectors)
+
+    def _load_stored(self, user_id: str, document_id: str, text_hash: str) -> DocumentChunkIndex | None:
+        collection = db_client.document_chunk_indexes
+        if collection is None:
+            return None
+        try:
+            record = collection.find_one({"_id": document_id, "user_id": user_id, "text_hash": text_hash})
+        except PyMongoError:
+            return None
+        if not record:
+            return None
+        matrix = None
+        if record.get("embeddings") is not None:
+            matrix = np.frombuffer(record["embeddings"], dtype=np.float16)
+            matrix = matrix.reshape(len(record["chunks"]), record["dim"]).astype(np.float32)
+        return DocumentChunkIndex(record["chunks"], record["starts"], matrix)
+
+    def _store(self, user_id: str, document_id: str, text_hash: str, index: DocumentChunkIndex) -> None:
+        collection = db_client.document_chunk_indexes
+        if collection is None or index.matrix is None:
+            # Lexical-only indexes are cheap to rebuild; store the embedded ones.
+            return
+        record = {
+            "_id": document_id,
+            "user_id": user_id,
+            "text_hash": text_hash,
+            "model_name": vector_service.model_name,
+            "chunks": index.texts,
+            "starts": index.starts,
+            "dim": int(index.matrix.shape[1]),
+            # float16 halves the record; cosine ranking is unaffected in practice.
+            "embeddings": index.matrix.astype(np.float16).tobytes(),
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            collection.replace_one({"_id": document_id}, record, upsert=True)
+        except PyMongoError as e:
+            print(f"Could not store chunk index of document {document_id}: {e}")
+
+    @contextmanager
+    def _build_lock(self, key: tuple):
+        """
+        Per-document build lock. It stays in the map while any caller holds
+        or waits on it, so every caller for a key shares the same lock.
+        """
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def get_index(self, user_id: UUID | str, document_id: str, text: str) -> DocumentChunkIndex:
+        user_id = str(user_id)
+        text_hash = self._text_hash(text)
+        key = (user_id, document_id, text_hash)
+        index = self.cache.get(key)
+        if index is not None:
+            return index
+
+        # Concurrent questions about the same new document embed it once.
+        with self._build_lock(key):
+            index = self.cache.get(key)
+            if index is None:
+                index = self._load_stored(user_id, document_id, text_hash)
+            if index is None:
+                texts, starts = self._split(text)
+                index = DocumentChunkIndex(texts, starts, self._embed(texts))
+                self._store(user_id, document_id, text_hash, index)
+                print(f"Indexed document {document_id}: {len(texts)} chunks.")
+            self.cache.set(key, index)
+        return index
+
+    def relevant_passages(
+        self,
+        user_id: UUID | str,
+        document_id: str,
+        text: str,
+        query: str,
+        budget_tokens: int | None = None,
+    ) -> DocumentContext:
+        """
+        Passages of the document relevant to ``query`` within the context
+        token budget (``DOCUMENT_CONTEXT_TOKEN_BUDGET`` by default).
+        """
+        budget = self.context_token_budget if budget_tokens is None else budget_tokens
+        if estimate_tokens(text) <= budget:
+            # Short documents go into the prompt whole; nothing to index.
+            whole = Passage(position=0, start=0, text=text)
+            return DocumentContext(passages=[whole], best=whole, chunk_count=1)
+
+        index = self.get_index(user_id, document_id, text)
+        query_vector = None
+        # An index restored from Mongo may be the first thing to need the model.
+        if index.matrix is not None and vector_service.load_embeddings():
+            try:
+                query_vector = vector_service.embeddings.embed_query(query)
+            except Exception as e:
+                print(f"Query embedding failed; ranking document passages lexically: {e}")
+        return index.select(query, query_vector, budget)
+
+
+document_index_service = DocumentIndexService()
@@ -69,6 +69,11 @@ class DocumentService:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Document not found.",
             )
+        if db_client.document_chunk_indexes is not None:
+            try:
+                db_client.document_chunk_indexes.delete_one({"_id": str(document_id)})
+            except PyMongoError:
+                pass
 
 
 document_service = DocumentService()
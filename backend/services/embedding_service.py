@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+
+from langchain_core.embeddings import Embeddings
+
+from utils.cache_utils import LRUTTLCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical cache key for a query.
+
+    all-MiniLM-L6-v2 uses an uncased WordPiece tokenizer that also splits on
+    whitespace, so case folding and whitespace collapsing do not change the
+    embedding the model produces.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model and memoizes ``embed_query`` results.
+
+    Chroma and the other vector backends call ``embed_query`` for every search,
+    so repeated questions skip the transformer forward pass entirely. Entries
+    are keyed by (model name, normalized query); the cache is cleared whenever
+    ``model_name`` changes.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_size: int = 2048,
+        ttl_seconds: float | None = 3600,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = LRUTTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._cache_model = model_name
+
+    def _check_model(self) -> None:
+        if self._cache_model != self.model_name:
+            self.cache.clear()
+            self._cache_model = self.model_name
+
+    def embed_query(self, text: str) -> list[float]:
+        self._check_model()
+        key = (self.model_name, normalize_query(text))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.set(key, tuple(vector))
+        return list(vector)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed many queries, running a single batched forward pass for the
+        cache misses. Duplicate queries in the batch are embedded once.
+        """
+        self._check_model()
+        keys = [(self.model_name, normalize_query(text)) for text in texts]
+        vectors: dict[tuple, tuple] = {}
+        pending: dict[tuple, str] = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                pending[key] = text
+
+        if pending:
+            embedded = self.embeddings.embed_documents(list(pending.values()))
+            for key, vector in zip(pending, embedded):
+                vectors[key] = tuple(vector)
+                self.cache.set(key, vectors[key])
+
+        return [list(vectors[key]) for key in keys]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def stats(self) -> dict:
+        return {"model_name": self.model_name, **self.cache.stats()}
@@ -1,25 +1,63 @@
 # backend/services/llm_service.py
 import os
+import threading
+from collections.abc import AsyncIterator
 
 from dotenv import load_dotenv
 from fastapi import HTTPException, status
-from langchain_google_genai import ChatGoogleGenerativeAI
+from fastapi.concurrency import run_in_threadpool
 
 load_dotenv()
 
 
+def _content_text(content) -> str:
+    """
+    Plain text of a message's content. Gemini may return a list of content
+    parts (strings or {"type": "text", "text": ...} blocks) instead of a string.
+    """
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content or []:
+        if isinstance(part, str):
+            parts.append(part)
+        elif isinstance(part, dict) and part.get("type") == "text":
+            parts.append(part.get("text") or "")
+    return "".join(parts)
+
+
 class LLMService:
     def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            google_api_key=os.getenv("GOOGLE_API_KEY"),
-            temperature=0.2,
-        )
+        # The Gemini client is built on first use (or by the startup warmup).
+        self._llm = None
+        self._lock = threading.Lock()
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    # langchain_google_genai takes over a second to import.
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+
+                    self._llm = ChatGoogleGenerativeAI(
+                        model="gemini-2.5-flash",
+                        google_api_key=os.getenv("GOOGLE_API_KEY"),
+                        temperature=0.2,
+                    )
+        return self._llm
+
+    @property
+    def ready(self) -> bool:
+        return self._llm is not None
+
+    def warmup(self) -> bool:
+        return self.llm is not None
 
     def get_ai_response(self, final_prompt: str):
         try:
             response = self.llm.invoke(final_prompt)
-            return response.content
+            return _content_text(response.content)
 
         except Exception as e:
             print(f"LangChain LLM Error: {e}")
@@ -28,5 +66,25 @@ class LLMService:
                 detail="AI provider request failed.",
             ) from e
 
+    async def astream_ai_response(self, final_prompt: str) -> AsyncIterator[str]:
+        """
+        Yield the answer text as Gemini streams it. Cancelling the consumer
+        cancels the pending request to the provider.
+        """
+        # Building the client imports langchain_google_genai; keep that off the event loop.
+        llm = self._llm or await run_in_threadpool(lambda: self.llm)
+        try:
+            async for chunk in llm.astream(final_prompt):
+                text = _content_text(chunk.content)
+                if text:
+                    yield text
+
+        except Exception as e:
+            print(f"LangChain LLM streaming error: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="AI provider request failed.",
+            ) from e
+
 
 llm_service = LLMService()
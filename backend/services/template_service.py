@@ -149,16 +149,22 @@ class TemplateService:
 
     TEMPLATE_HELPERS = {"now"}
 
-    def __init__(self):
-        self.collection = db_client.document_templates
+    def __init__(self, collection=None):
+        # Without a collection, the shared client's is used, warming Mongo up
+        # (indexes, system templates) on first use.
+        self._collection = collection
 
     def _require_collection(self):
-        if self.collection is None:
+        collection = self._collection
+        if collection is None:
+            db_client.warmup()
+            collection = db_client.document_templates
+        if collection is None:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="MongoDB document_templates collection is not available.",
             )
-        return self.collection
+        return collection
 
     @staticmethod
     def _serialize(template_doc: dict) -> DocumentTemplate:
@@ -259,7 +265,10 @@ class TemplateService:
                     "updated_at": now,
                 }
             )
-            collection.insert_one(template_doc)
+            try:
+                collection.insert_one(template_doc)
+            except DuplicateKeyError:
+                pass  # another worker seeded it first
 
     def update_template(
         self, template_id: UUID, payload: DocumentTemplateUpdate
@@ -75,12 +75,35 @@
 
 # vector_service = VectorService()
 
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
 
+import numpy as np
 from dotenv import load_dotenv
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_core.documents import Document
+
+from services.embedding_service import CachedEmbeddings, normalize_query
+from utils.artifact_utils import read_artifact_manifest, resolve_artifact
+from utils.bm25_utils import BM25Index, reciprocal_rank_fusion
+from utils.cache_utils import VersionedResultCache
+from utils.citation_utils import CitationIndex, metadata_citation
+from utils.embedding_utils import build_embeddings
+from utils.facet_utils import FacetIndex, SearchFilters
+from utils.vector_index_utils import (
+    SNAPSHOT_POINTER_FILE,
+    FaissIndex,
+    IndexVersionWatcher,
+    NumpyIndex,
+    read_shard_manifest,
+)
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 
@@ -88,6 +111,277 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 load_dotenv(BASE_DIR / ".env")
 
 
+def _resolve_path(path: str) -> Path:
+    candidate = Path(path)
+    full_path = candidate if candidate.is_absolute() else BASE_DIR / candidate
+    return full_path.resolve()
+
+
+def _empty_results(vectors) -> list[list]:
+    return [[] for _ in vectors]
+
+
+def _empty_rows(vectors) -> list[tuple[np.ndarray, np.ndarray]]:
+    return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in vectors]
+
+
+class ChromaBackend:
+    """Searches the persisted Chroma collection with precomputed query vectors."""
+
+    name = "chroma"
+
+    def __init__(self, db: Chroma, page_size: int = 5000):
+        self.db = db
+        # Row numbers of the facet index map to Chroma IDs; a filtered query
+        # passes the matching IDs so Chroma only scores those vectors.
+        self.ids: list[str] = []
+        self.metadatas: list[dict] = []
+        collection = db._collection
+        for offset in range(0, collection.count(), page_size):
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            self.ids.extend(page["ids"])
+            self.metadatas.extend(meta or {} for meta in page["metadatas"])
+        self.row_of = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        self.facets = FacetIndex(self.metadatas)
+
+    def _query(self, vectors: list[list[float]], k: int, rows, include: list[str]):
+        query_kwargs = {}
+        if rows is not None:
+            query_kwargs["ids"] = [self.ids[row] for row in rows]
+            k = min(k, len(rows))
+        return self.db._collection.query(
+            query_embeddings=vectors,
+            n_results=k,
+            include=include,
+            **query_kwargs,
+        )
+
+    def search_many(self, vectors: list[list[float]], k: int, rows=None):
+        if rows is not None and len(rows) == 0:
+            return _empty_results(vectors)
+        raw = self._query(vectors, k, rows, ["documents", "metadatas", "distances"])
+        batches = []
+        for texts, metadatas, distances in zip(
+            raw["documents"], raw["metadatas"], raw["distances"]
+        ):
+            batches.append(
+                [
+                    (Document(page_content=text, metadata=meta or {}), float(dist))
+                    for text, meta, dist in zip(texts, metadatas, distances)
+                ]
+            )
+        return batches
+
+    def search_rows(self, vectors: list[list[float]], k: int, rows=None):
+        """Like search_many, but (rows, distances) arrays instead of Documents."""
+        if rows is not None and len(rows) == 0:
+            return _empty_rows(vectors)
+        raw = self._query(vectors, k, rows, ["distances"])
+        return [
+            (
+                np.asarray([self.row_of[chunk_id] for chunk_id in ids], dtype=np.int64),
+                np.asarray(distances, dtype=np.float32),
+            )
+            for ids, distances in zip(raw["ids"], raw["distances"])
+        ]
+
+    def documents(self, rows) -> list[Document]:
+        if len(rows) == 0:
+            return []
+        ids = [self.ids[row] for row in rows]
+        raw = self.db._collection.get(ids=ids, include=["documents"])
+        texts = dict(zip(raw["ids"], raw["documents"]))
+        return [
+            Document(page_content=texts[chunk_id], metadata=dict(self.metadatas[row]))
+            for chunk_id, row in zip(ids, rows)
+        ]
+
+
+class NumpyBackend:
+    """In-process exact search over the exported embedding matrix."""
+
+    name = "numpy"
+
+    def __init__(self, index: NumpyIndex | FaissIndex):
+        self.index = index
+        self.metadatas = index.metadatas
+        self.facets = FacetIndex(index.metadatas)
+
+    def search_rows(self, vectors: list[list[float]], k: int, rows=None):
+        """Top-k (rows, distances) per query vector, nearest first."""
+        if rows is not None and len(rows) == 0:
+            return _empty_rows(vectors)
+        found, distances = self.index.search(vectors, k, rows=rows)
+        return [(row_ids[row_ids >= 0], dists[row_ids >= 0]) for row_ids, dists in zip(found, distances)]
+
+    def search_many(self, vectors: list[list[float]], k: int, rows=None):
+        return [
+            list(zip(self.documents(row_ids), dists.tolist()))
+            for row_ids, dists in self.search_rows(vectors, k, rows=rows)
+        ]
+
+    def documents(self, rows) -> list[Document]:
+        return [self.index.document(int(row)) for row in rows]
+
+
+class FaissBackend(NumpyBackend):
+    """FAISS flat/IVF/HNSW search over the exported chunk store."""
+
+    name = "faiss"
+
+
+class ShardedBackend:
+    """
+    Per-act NumPy/FAISS shards searched in parallel on a thread pool, with
+    the per-shard top-k merged by distance.
+
+    Facet rows are global: shard i owns rows [offsets[i], offsets[i + 1]).
+    A filtered query only visits the shards its rows fall in, so an act
+    filter touches just that act's shard.
+    """
+
+    name = "sharded"
+
+    def __init__(self, shards: dict[str | None, NumpyBackend], pool: ThreadPoolExecutor):
+        self.acts = list(shards)
+        self.shards = list(shards.values())
+        self.offsets = np.cumsum([0] + [len(shard.index) for shard in self.shards])
+        self.metadatas = [meta for shard in self.shards for meta in shard.index.metadatas]
+        self.facets = FacetIndex(self.metadatas)
+        self.pool = pool
+
+    def __len__(self) -> int:
+        return int(self.offsets[-1])
+
+    def _plan(self, rows) -> list[tuple[int, np.ndarray | None]]:
+        if rows is None:
+            return [(i, None) for i in range(len(self.shards))]
+        plan = []
+        bounds = np.searchsorted(rows, self.offsets)
+        for i, shard in enumerate(self.shards):
+            lo, hi = bounds[i], bounds[i + 1]
+            if lo == hi:
+                continue
+            local = rows[lo:hi] - self.offsets[i]
+            # A filter that keeps the whole shard needs no row restriction.
+            plan.append((i, None if len(local) == len(shard.index) else local))
+        return plan
+
+    def search_rows(self, vectors: list[list[float]], k: int, rows=None):
+        """Top-k global (rows, distances) per query vector, nearest first."""
+        if rows is not None and len(rows) == 0:
+            return _empty_rows(vectors)
+        plan = self._plan(rows)
+
+        def search_shard(step):
+            i, local = step
+            offset = self.offsets[i]
+            return [(found + offset, dists) for found, dists in self.shards[i].search_rows(vectors, k, rows=local)]
+
+        if len(plan) == 1:
+            return search_shard(plan[0])
+        # NumPy and FAISS release the GIL while scoring, so shards run concurrently.
+        per_shard = list(self.pool.map(search_shard, plan))
+        merged = []
+        for results in zip(*per_shard):
+            found = np.concatenate([row_ids for row_ids, _ in results])
+            dists = np.concatenate([dists for _, dists in results])
+            order = np.argsort(dists, kind="stable")[:k]
+            merged.append((found[order], dists[order]))
+        return merged
+
+    def search_many(self, vectors: list[list[float]], k: int, rows=None):
+        return [
+            list(zip(self.documents(row_ids), dists.tolist()))
+            for row_ids, dists in self.search_rows(vectors, k, rows=rows)
+        ]
+
+    def documents(self, rows) -> list[Document]:
+        shard_of = np.searchsorted(self.offsets, rows, side="right") - 1
+        return [
+            self.shards[i].index.document(int(row - self.offsets[i]))
+            for row, i in zip(rows, shard_of)
+        ]
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """
+    Everything one index build serves. Searches take a reference at the
+    start and use only that, so swapping in a new snapshot never mixes two
+    builds inside one query and in-flight queries finish on the old one.
+    """
+
+    backend: ChromaBackend | NumpyBackend | ShardedBackend
+    version: str | None = None
+    path: Path | None = None
+    bm25: BM25Index | None = None
+    bm25_facets: FacetIndex | None = None
+    citations: CitationIndex | None = None
+
+
+@dataclass(frozen=True)
+class RankedCandidates:
+    """
+    A query's ranking as row numbers of the snapshot's backend: exact
+    citation hits first (distance 0), then vector rows by distance. Only
+    Documents of the slice being served are ever built.
+    """
+
+    cited: tuple[Document, ...]
+    rows: np.ndarray
+    distances: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.cited) + len(self.rows)
+
+    def iter_pairs(self, backend, start: int, stop: int, block: int = 64) -> Iterator[tuple[Document, float]]:
+        """(Document, distance) pairs ``start`` to ``stop``, built ``block`` rows at a time."""
+        stop = min(stop, len(self))
+        for position in range(start, min(stop, len(self.cited))):
+            yield self.cited[position], 0.0
+        first = max(start, len(self.cited)) - len(self.cited)
+        last = stop - len(self.cited)
+        for lo in range(first, last, block):
+            hi = min(lo + block, last)
+            yield from zip(backend.documents(self.rows[lo:hi]), self.distances[lo:hi].tolist())
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    """
+    One slice of a query's cached ranking. Iterating it builds the hits'
+    Documents as they are consumed.
+    """
+
+    offset: int
+    total: int
+    version: str | None
+    fingerprint: str
+    limit: int = 0
+    ranked: RankedCandidates | None = None
+    backend: object = None
+    # A citation's exact matches are served alone; paging past them ranks
+    # the vector hits that follow.
+    more: bool = False
+
+    def __len__(self) -> int:
+        return max(0, min(self.limit, self.total - self.offset))
+
+    @property
+    def has_more(self) -> bool:
+        return self.more or self.offset + len(self) < self.total
+
+    def __iter__(self) -> Iterator[tuple[Document, float]]:
+        if self.ranked is None:
+            return iter(())
+        return self.ranked.iter_pairs(self.backend, self.offset, self.offset + self.limit)
+
+    @property
+    def pairs(self) -> list[tuple[Document, float]]:
+        return list(self)
+
+
 class VectorService:
     def __init__(self):
         # Preserve Hugging Face token
@@ -96,108 +390,712 @@ class VectorService:
             os.environ["HF_TOKEN"] = hf_token
 
         self.persist_directory = os.getenv("CHROMA_PATH", "vector_db")
+        self.index_directory = os.getenv("VECTOR_INDEX_PATH", "vector_index")
+        self.shards_directory = os.getenv("VECTOR_SHARDS_PATH", "vector_shards")
+        self.backend_name = os.getenv("VECTOR_BACKEND", "chroma").strip().lower()
+        self.bm25_path = os.getenv("BM25_INDEX_PATH", "vector_db/bm25.json")
+        self.citation_path = os.getenv("CITATION_INDEX_PATH", "vector_db/citations.json")
+        self.index_precision = os.getenv("VECTOR_INDEX_PRECISION", "float32").strip().lower()
         self.model_name = "all-MiniLM-L6-v2"
+        self.embedding_backend = os.getenv("EMBEDDING_BACKEND", "huggingface").strip().lower()
         self.embeddings = None
-        self.db = None
+        self.snapshot: IndexSnapshot | None = None
 
-        print("Initializing Vector Service...")
+        # A prebuilt artifact (embed_laws.py --export-artifact, a directory or
+        # its .tar) is memory-mapped and served with the numpy/faiss backend,
+        # so this host never runs the model over the corpus.
+        self.artifact_path = os.getenv("VECTOR_ARTIFACT_PATH", "").strip() or None
+        self.verify_artifact = os.getenv("VECTOR_ARTIFACT_VERIFY", "true").lower() in ("1", "true", "yes")
+        if self.artifact_path and self.backend_name == "chroma":
+            self.backend_name = "numpy"
 
-        try:
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=self.model_name,
-                model_kwargs={"device": "cpu", "local_files_only": True},
+        # VECTOR_SHARDED=true serves the per-act shards written by
+        # embed_laws.py --export-shards with the numpy or faiss backend.
+        self.sharded = os.getenv("VECTOR_SHARDED", "false").lower() in ("1", "true", "yes")
+        self.shard_pool = None
+        if self.sharded:
+            self.shard_pool = ThreadPoolExecutor(
+                max_workers=int(os.getenv("VECTOR_SHARD_WORKERS", str(min(8, os.cpu_count() or 1)))),
+                thread_name_prefix="shard-search",
             )
-        except Exception as e:
-            print(f"ERROR: failed to initialize embeddings: {e}")
-            return
 
-        persist_path = Path(self.persist_directory)
-        full_path = persist_path if persist_path.is_absolute() else BASE_DIR / persist_path
-        full_path = full_path.resolve()
+        # embed_laws.py --snapshot publishes complete index copies under
+        # INDEX_SNAPSHOTS_PATH and points CURRENT at the newest one. Without
+        # a CURRENT pointer the paths above are served directly.
+        check_interval = float(os.getenv("INDEX_VERSION_CHECK_SECONDS", "5"))
+        self.snapshots_root = _resolve_path(os.getenv("INDEX_SNAPSHOTS_PATH", "index_snapshots"))
+        self.snapshot_pointer = IndexVersionWatcher(
+            self.snapshots_root / SNAPSHOT_POINTER_FILE,
+            check_interval=check_interval,
+        )
+        self.auto_reload = os.getenv("INDEX_AUTO_RELOAD", "true").lower() in ("1", "true", "yes")
+        self.last_reload: dict | None = None
+        self._reload_thread: threading.Thread | None = None
+        self._reload_lock = threading.Lock()
+        self._failed_snapshot: str | None = None
+
+        # Search results are cached per published index version; embed_laws.py
+        # writes a new version after every ingest that changes the corpus.
+        self.index_version = IndexVersionWatcher(
+            _resolve_path(os.getenv("INDEX_VERSION_PATH", "vector_db/index_version.json")),
+            check_interval=check_interval,
+        )
+        # Paginated and streamed searches rank this many candidates once and
+        # serve every page as a slice of the cached list.
+        self.max_candidates = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))
+        self.result_cache = VersionedResultCache(
+            max_size=int(os.getenv("RESULT_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600")),
+        )
 
-        if full_path.exists():
+        # The model and indexes load in warmup(): from the startup warmup task,
+        # or on first use, never at import time.
+        self._lock = threading.RLock()
+        self._embeddings_loaded = False
+        self._index_loaded = False
+
+    @property
+    def backend(self):
+        snapshot = self.snapshot
+        return snapshot.backend if snapshot else None
+
+    @property
+    def bm25(self):
+        snapshot = self.snapshot
+        return snapshot.bm25 if snapshot else None
+
+    @property
+    def citations(self):
+        snapshot = self.snapshot
+        return snapshot.citations if snapshot else None
+
+    def load_embeddings(self) -> bool:
+        with self._lock:
+            if self._embeddings_loaded:
+                return self.embeddings is not None
+            print("Initializing Vector Service...")
             try:
-                self.db = Chroma(
-                    persist_directory=str(full_path),
-                    embedding_function=self.embeddings,
+                base_embeddings = build_embeddings(
+                    self.model_name,
+                    backend=self.embedding_backend,
+                    device="cpu",
                 )
-                print(f"Vector DB loaded successfully from: {full_path}")
+                # One forward pass so the first real query does not pay for
+                # lazy weight loading and buffer allocation.
+                base_embeddings.embed_documents(["warmup"])
             except Exception as e:
-                print(f"ERROR: failed to load Chroma DB: {e}")
+                print(f"ERROR: failed to initialize embeddings: {e}")
+                base_embeddings = None
+
+            if base_embeddings is not None:
+                # Repeated questions ("section 302", "article 21") skip the model entirely.
+                self.embeddings = CachedEmbeddings(
+                    base_embeddings,
+                    model_name=self.model_name,
+                    max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+                    ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "3600")),
+                )
+            self._embeddings_loaded = True
+            return self.embeddings is not None
+
+    def load_index(self) -> bool:
+        with self._lock:
+            if self._index_loaded:
+                return self.snapshot is not None
+            if self.load_embeddings():
+                name = self.snapshot_pointer.refresh()
+                self.snapshot = self._load_snapshot(name)
+                if self.snapshot is None and name is not None:
+                    self._failed_snapshot = name
+            self._index_loaded = True
+            return self.snapshot is not None
+
+    def warmup(self) -> bool:
+        return self.load_index()
+
+    def _ensure_loaded(self) -> None:
+        if not self._index_loaded:
+            self.warmup()
+        elif self.auto_reload:
+            name = self.snapshot_pointer.current()
+            if name is not None and name != self._failed_snapshot and name != self._snapshot_name():
+                self.reload_index()
+
+    def _snapshot_name(self) -> str | None:
+        snapshot = self.snapshot
+        return snapshot.path.name if snapshot and snapshot.path else None
+
+    def _load_snapshot(self, name: str | None) -> IndexSnapshot | None:
+        """Build a complete snapshot without touching the one being served."""
+        version = name
+        if name is None and self.artifact_path:
+            directory = None
+            try:
+                artifact_dir = resolve_artifact(_resolve_path(self.artifact_path))
+                manifest = read_artifact_manifest(artifact_dir, verify=self.verify_artifact)
+            except Exception as e:
+                print(f"ERROR: failed to load embedding artifact '{self.artifact_path}': {e}")
+                return None
+            print(f"Loading embedding artifact {manifest.get('name')} ({manifest.get('count')} chunks)...")
+            version = manifest.get("content_version")
+            persist_path = shards_path = None
+            index_path = artifact_dir
+            bm25_path = artifact_dir / "bm25.json"
+            citation_path = artifact_dir / "citations.json"
+        elif name is None:
+            directory = None
+            persist_path = _resolve_path(self.persist_directory)
+            index_path = _resolve_path(self.index_directory)
+            shards_path = _resolve_path(self.shards_directory)
+            bm25_path = _resolve_path(self.bm25_path)
+            citation_path = _resolve_path(self.citation_path)
+        else:
+            directory = self.snapshots_root / name
+            persist_path = directory / "vector_db"
+            index_path = directory / "vector_index"
+            shards_path = directory / "vector_shards"
+            bm25_path = persist_path / "bm25.json"
+            citation_path = persist_path / "citations.json"
+            print(f"Loading index snapshot {name}...")
+
+        if self.backend_name in ("numpy", "faiss") and self.sharded and shards_path is not None:
+            backend = self._load_sharded_backend(shards_path)
+        elif self.backend_name in ("numpy", "faiss"):
+            backend = self._load_local_backend(index_path)
         else:
-            print(f"ERROR: folder '{self.persist_directory}' not found!")
+            backend = self._load_chroma_backend(persist_path)
+        if backend is None:
+            return None
+        bm25, bm25_facets = self._load_bm25(bm25_path)
+        return IndexSnapshot(
+            backend=backend,
+            version=version,
+            path=directory,
+            bm25=bm25,
+            bm25_facets=bm25_facets,
+            citations=self._load_citations(citation_path),
+        )
+
+    def reload_index(self, wait: bool = False) -> dict:
+        """
+        Load the snapshot CURRENT points to in a background thread and swap it
+        in once it is fully loaded. Queries keep using the old snapshot
+        meanwhile; a snapshot that fails to load is never swapped in.
+        """
+        if not self._index_loaded:
+            self.warmup()
+            return self.snapshot_status()
+
+        with self._reload_lock:
+            thread = self._reload_thread
+            if thread is None or not thread.is_alive():
+                name = self.snapshot_pointer.refresh()
+                if name is not None and name != self._snapshot_name():
+                    thread = threading.Thread(
+                        target=self._reload,
+                        args=(name,),
+                        name="index-reload",
+                        daemon=True,
+                    )
+                    self._reload_thread = thread
+                    thread.start()
+                else:
+                    thread = None
+        if wait and thread is not None:
+            thread.join()
+        return self.snapshot_status()
+
+    def _reload(self, name: str) -> None:
+        started = time.perf_counter()
+        previous = self._snapshot_name()
+        try:
+            snapshot = self._load_snapshot(name)
+        except Exception as e:
+            print(f"ERROR: failed to load index snapshot {name}: {e}")
+            snapshot = None
+        seconds = round(time.perf_counter() - started, 3)
+        if snapshot is None:
+            self._failed_snapshot = name
+            self.last_reload = {"snapshot": name, "ok": False, "seconds": seconds}
+            print(f"Keeping index snapshot {previous}; {name} could not be loaded.")
+            return
+        # A single reference assignment: each query sees the old or the new
+        # snapshot, never a mix. Cached results are keyed by snapshot name.
+        self.snapshot = snapshot
+        self._failed_snapshot = None
+        self.last_reload = {"snapshot": name, "ok": True, "seconds": seconds, "previous": previous}
+        print(f"Swapped index snapshot {previous} -> {name} in {seconds:.2f}s.")
+
+    def snapshot_status(self) -> dict:
+        thread = self._reload_thread
+        return {
+            "snapshot": self._snapshot_name(),
+            "published": self.snapshot_pointer.version,
+            "reloading": thread is not None and thread.is_alive(),
+            "last_reload": self.last_reload,
+        }
+
+    def _load_chroma_backend(self, full_path: Path) -> ChromaBackend | None:
+        if self.sharded:
+            print("WARNING: VECTOR_SHARDED applies to the numpy and faiss backends; serving Chroma unsharded.")
+        if self.index_precision != "float32":
+            print(
+                f"WARNING: Chroma stores float32 vectors only; VECTOR_INDEX_PRECISION="
+                f"{self.index_precision} applies to the numpy and faiss backends."
+            )
+
+        if not full_path.exists():
+            print(f"ERROR: folder '{full_path}' not found!")
             print("Run 'python scripts/embed_laws.py' to generate it.")
+            return None
+        try:
+            db = Chroma(
+                persist_directory=str(full_path),
+                embedding_function=self.embeddings,
+            )
+            backend = ChromaBackend(db)
+            print(f"Vector DB loaded successfully from: {full_path}")
+            return backend
+        except Exception as e:
+            print(f"ERROR: failed to load Chroma DB: {e}")
+            return None
+
+    def _open_local_index(self, full_path: Path) -> NumpyIndex | FaissIndex:
+        rescore_factor = int(os.getenv("VECTOR_RESCORE_FACTOR", "4"))
+        if self.backend_name == "faiss":
+            # FAISS precision is fixed when the index is built.
+            return FaissIndex(
+                full_path,
+                nprobe=int(os.getenv("FAISS_NPROBE", "16")),
+                ef_search=int(os.getenv("FAISS_EF_SEARCH", "64")),
+                rescore_factor=rescore_factor,
+            )
+        mmap = os.getenv("VECTOR_INDEX_MMAP", "true").lower() in ("1", "true", "yes")
+        return NumpyIndex(
+            full_path,
+            mmap=mmap,
+            precision=self.index_precision,
+            rescore_factor=rescore_factor,
+        )
+
+    def _load_local_backend(self, full_path: Path) -> NumpyBackend | None:
+        try:
+            index = self._open_local_index(full_path)
+        except FileNotFoundError:
+            print(f"ERROR: {self.backend_name} index not found in '{full_path}'!")
+            print(f"Run 'python scripts/embed_laws.py --export-{self.backend_name}' to generate it.")
+            return None
+        except Exception as e:
+            print(f"ERROR: failed to load {self.backend_name} index: {e}")
+            return None
+
+        if index.model_name and index.model_name != self.model_name:
+            print(
+                f"ERROR: index at {full_path} was built with '{index.model_name}', "
+                f"but the service embeds with '{self.model_name}'."
+            )
+            return None
+
+        backend_cls = FaissBackend if self.backend_name == "faiss" else NumpyBackend
+        print(f"{self.backend_name} index loaded successfully from: {full_path} ({len(index)} chunks)")
+        return backend_cls(index)
+
+    def _load_sharded_backend(self, full_path: Path) -> ShardedBackend | None:
+        manifest = read_shard_manifest(full_path)
+        if not manifest:
+            print(f"ERROR: no act shards found in '{full_path}'!")
+            print("Run 'python scripts/embed_laws.py --export-shards' to generate them.")
+            return None
+
+        backend_cls = FaissBackend if self.backend_name == "faiss" else NumpyBackend
+        shards = {}
+        for act, entry in manifest.items():
+            shard_path = full_path / entry["dir"]
+            try:
+                index = self._open_local_index(shard_path)
+            except Exception as e:
+                print(f"ERROR: failed to load {self.backend_name} shard '{shard_path}': {e}")
+                return None
+            if index.model_name and index.model_name != self.model_name:
+                print(
+                    f"ERROR: shard at {shard_path} was built with '{index.model_name}', "
+                    f"but the service embeds with '{self.model_name}'."
+                )
+                return None
+            shards[act] = backend_cls(index)
+
+        backend = ShardedBackend(shards, self.shard_pool)
+        print(
+            f"{self.backend_name} shards loaded successfully from: {full_path} "
+            f"({len(shards)} acts, {len(backend)} chunks)"
+        )
+        return backend
+
+    def _load_bm25(self, full_path: Path) -> tuple[BM25Index | None, FacetIndex | None]:
+        if not full_path.exists():
+            print(f"BM25 index not found at {full_path}; chatbot search is vector-only.")
+            return None, None
+        try:
+            bm25 = BM25Index.load(full_path)
+            print(f"BM25 index loaded successfully from: {full_path} ({len(bm25)} chunks)")
+            return bm25, FacetIndex(bm25.metadatas)
+        except Exception as e:
+            print(f"ERROR: failed to load BM25 index: {e}")
+            return None, None
+
+    def _load_citations(self, full_path: Path) -> CitationIndex | None:
+        if not full_path.exists():
+            print(f"Citation index not found at {full_path}; citation queries use vector search.")
+            return None
+        try:
+            citations = CitationIndex.load(full_path)
+            print(f"Citation index loaded successfully from: {full_path} ({len(citations)} provisions)")
+            return citations
+        except Exception as e:
+            print(f"ERROR: failed to load citation index: {e}")
+            return None
+
+    @property
+    def index_ready(self) -> bool:
+        self._ensure_loaded()
+        return self.snapshot is not None
+
+    def embedding_cache_stats(self) -> dict:
+        if not isinstance(self.embeddings, CachedEmbeddings):
+            return {}
+        return self.embeddings.stats()
+
+    def result_cache_stats(self) -> dict:
+        return self.result_cache.stats()
+
+    def current_version(self, snapshot: IndexSnapshot | None = None) -> str | None:
+        """Version the result cache is keyed by: the snapshot name or artifact version, if any."""
+        snapshot = snapshot or self.snapshot
+        if snapshot is not None and snapshot.version is not None:
+            return snapshot.version
+        return self.index_version.current()
+
+    def _cache_key(self, kind: str, query: str, k: int, filters: SearchFilters | None, *extra):
+        return (kind, normalize_query(query), k, filters.key() if filters else None, *extra)
+
+    def facet_counts(self) -> dict:
+        self._ensure_loaded()
+        snapshot = self.snapshot
+        if not snapshot:
+            return {}
+        return snapshot.backend.facets.counts()
+
+    def _filter_rows(self, snapshot: IndexSnapshot, filters: SearchFilters | None):
+        """Candidate rows of the vector backend, or None for the whole corpus."""
+        return snapshot.backend.facets.rows(filters)
+
+    def lookup_citation(
+        self,
+        query: str,
+        filters: SearchFilters | None = None,
+        snapshot: IndexSnapshot | None = None,
+    ):
+        """
+        Chunks of the provision a plain citation query names ("section 420",
+        "Article 21A"), straight from the citation index without embedding
+        the query. None if the query is not a known citation; filtered
+        searches always take the regular path.
+        """
+        snapshot = snapshot or self.snapshot
+        if snapshot is None or snapshot.citations is None:
+            return None
+        if filters is not None and not filters.is_empty():
+            return None
+        return snapshot.citations.search(query)
 
     # -----------------------------
     # BASIC SEARCH (unchanged)
     # -----------------------------
-    def search_legal_docs(self, query: str, k: int = 10):
-        if not self.db:
-            return []
-        return self.db.similarity_search(query, k=k)
+    def search_legal_docs(self, query: str, k: int = 10, filters: SearchFilters | None = None):
+        return [doc for doc, _ in self.search_legal_docs_with_scores(query, k=k, filters=filters)]
 
     # -----------------------------
     # SEARCH WITH SCORES (for UI)
     # -----------------------------
-    def search_legal_docs_with_scores(self, query: str, k: int = 10):
-        if not self.db:
+    def search_legal_docs_with_scores(
+        self,
+        query: str,
+        k: int = 10,
+        filters: SearchFilters | None = None,
+        expand_citations: bool = False,
+    ):
+        """
+        (Document, distance) pairs for the query. A plain citation returns
+        the provision's chunks without embedding the query; with
+        ``expand_citations`` the rest of the ``k`` slots are vector hits.
+        """
+        self._ensure_loaded()
+        snapshot = self.snapshot
+        if not snapshot:
             return []
-        try:
-            return self.db.similarity_search_with_score(query, k=k)
-        except Exception as exc:
-            print(f"similarity_search_with_score failed ({exc}); falling back.")
-            docs = self.db.similarity_search(query, k=k)
-            return [(doc, 0.0) for doc in docs]
+        results = self.result_cache.get_or_compute(
+            self._cache_key("scores", query, k, filters, expand_citations),
+            self.current_version(snapshot),
+            lambda: self._search_with_scores(snapshot, query, k, filters, expand_citations),
+        )
+        return list(results)
+
+    def _cited(self, snapshot: IndexSnapshot, query: str, k: int, filters: SearchFilters | None) -> tuple:
+        cited = self.lookup_citation(query, filters, snapshot)
+        return tuple(cited[:k]) if cited else ()
+
+    def _with_cited(
+        self,
+        snapshot: IndexSnapshot,
+        cited: tuple,
+        found: np.ndarray,
+        distances: np.ndarray,
+        k: int,
+    ) -> RankedCandidates:
+        """
+        Exact provision matches first, then the vector hits that are not one
+        of those chunks, up to ``k`` in total.
+        """
+        if cited:
+            # The citation index holds every chunk of the cited provisions, so
+            # a vector row is a duplicate exactly when it names one of them.
+            provisions = {metadata_citation(doc.metadata) for doc in cited}
+            metadatas = snapshot.backend.metadatas
+            keep = np.fromiter(
+                (metadata_citation(metadatas[row]) not in provisions for row in found.tolist()),
+                dtype=bool,
+                count=len(found),
+            )
+            found, distances = found[keep], distances[keep]
+        remaining = max(k - len(cited), 0)
+        return RankedCandidates(cited=cited, rows=found[:remaining], distances=distances[:remaining])
+
+    def _rank(
+        self,
+        snapshot: IndexSnapshot,
+        query: str,
+        k: int,
+        filters: SearchFilters | None,
+        expand_citations: bool = False,
+    ) -> RankedCandidates:
+        empty = np.empty(0, dtype=np.int64)
+        cited = self._cited(snapshot, query, k, filters)
+        rows = self._filter_rows(snapshot, filters)
+        if (cited and not expand_citations) or len(cited) >= k or (rows is not None and len(rows) == 0):
+            # Exact provision matches are answered without the model.
+            return RankedCandidates(cited=cited, rows=empty, distances=empty.astype(np.float32))
+        vector = self.embeddings.embed_query(query)
+        # At most len(cited) vector hits are duplicates, so k rows always fill the rest.
+        found, distances = snapshot.backend.search_rows([vector], k, rows=rows)[0]
+        return self._with_cited(snapshot, cited, found, distances, k)
+
+    def _search_with_scores(
+        self,
+        snapshot: IndexSnapshot,
+        query: str,
+        k: int,
+        filters: SearchFilters | None,
+        expand_citations: bool = False,
+    ):
+        ranked = self._rank(snapshot, query, k, filters, expand_citations)
+        return list(ranked.iter_pairs(snapshot.backend, 0, k))
+
+    # -----------------------------
+    # PAGINATED SEARCH (load more / export)
+    # -----------------------------
+    def query_fingerprint(self, query: str, filters: SearchFilters | None = None) -> str:
+        """Stable ID of a query and its filters, for tying cursors to the search."""
+        key = [normalize_query(query), list(filters.key()) if filters else None]
+        return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()[:16]
+
+    def search_page(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = 20,
+        filters: SearchFilters | None = None,
+        expand_citations: bool = False,
+    ) -> SearchPage:
+        """
+        Hits ``offset`` to ``offset + limit`` of the query's ranking. The first
+        page ranks up to ``max_candidates`` chunks; while that list is cached,
+        deeper pages are slices of it and skip the embedding and ANN query.
+
+        Pages within a plain citation's exact matches are served from the
+        citation index alone. The query is embedded only once the caller
+        pages past them, or asks for it with ``expand_citations``.
+        """
+        self._ensure_loaded()
+        fingerprint = self.query_fingerprint(query, filters)
+        snapshot = self.snapshot
+        if not snapshot:
+            return SearchPage(offset=offset, total=0, version=None, fingerprint=fingerprint)
+        version = self.current_version(snapshot)
+        cited = self._cited(snapshot, query, self.max_candidates, filters)
+        if offset < len(cited) and not expand_citations:
+            empty = np.empty(0, dtype=np.int64)
+            return SearchPage(
+                offset=offset,
+                total=len(cited),
+                version=version,
+                fingerprint=fingerprint,
+                limit=limit,
+                ranked=RankedCandidates(cited=cited, rows=empty, distances=empty.astype(np.float32)),
+                backend=snapshot.backend,
+                more=len(cited) < self.max_candidates,
+            )
+        # Cached as row/distance arrays; Documents are built per served page.
+        ranked = self.result_cache.get_or_compute(
+            self._cache_key("ranked", query, self.max_candidates, filters),
+            version,
+            lambda: self._rank(snapshot, query, self.max_candidates, filters, expand_citations=True),
+        )
+        return SearchPage(
+            offset=offset,
+            total=len(ranked),
+            version=version,
+            fingerprint=fingerprint,
+            limit=limit,
+            ranked=ranked,
+            backend=snapshot.backend,
+        )
+
+    # -----------------------------
+    # BATCH SEARCH WITH SCORES
+    # -----------------------------
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        self._ensure_loaded()
+        if isinstance(self.embeddings, CachedEmbeddings):
+            return self.embeddings.embed_queries(queries)
+        return self.embeddings.embed_documents(queries)
+
+    def search_legal_docs_batch_with_scores(
+        self,
+        queries: list[str],
+        k: int = 10,
+        filters: SearchFilters | None = None,
+        expand_citations: bool = False,
+    ):
+        """
+        Batched variant of search_legal_docs_with_scores: all queries are
+        embedded in one forward pass and searched in a single backend call;
+        plain citations are not embedded unless ``expand_citations`` is set.
+        Returns one list of (Document, distance) pairs per input query.
+        """
+        self._ensure_loaded()
+        snapshot = self.snapshot
+        if not snapshot or not queries:
+            return [[] for _ in queries]
+
+        rows = self._filter_rows(snapshot, filters)
+        if rows is not None and len(rows) == 0:
+            return [[] for _ in queries]
+
+        version = self.current_version(snapshot)
+        keys = [self._cache_key("scores", query, k, filters, expand_citations) for query in queries]
+        results: list[list | None] = []
+        cited: dict[int, tuple] = {}
+        for i, (query, key) in enumerate(zip(queries, keys)):
+            cached = self.result_cache.get(key, version)
+            if cached is None:
+                cited[i] = self._cited(snapshot, query, k, filters)
+                if (cited[i] and not expand_citations) or len(cited[i]) >= k:
+                    cached = [(doc, 0.0) for doc in cited[i]]
+            results.append(None if cached is None else list(cached))
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            start = time.perf_counter()
+            vectors = self.embed_queries([queries[i] for i in pending])
+            batches = snapshot.backend.search_rows(vectors, k, rows=rows)
+            per_query = (time.perf_counter() - start) / len(pending)
+            for i, (found, distances) in zip(pending, batches):
+                ranked = self._with_cited(snapshot, cited[i], found, distances, k)
+                pairs = list(ranked.iter_pairs(snapshot.backend, 0, k))
+                self.result_cache.set(keys[i], version, pairs, per_query)
+                results[i] = list(pairs)
+        return results
 
     # -----------------------------
     # HYBRID SEARCH FOR CHATBOT 🔥
     # -----------------------------
-    def search_for_chatbot(self, query: str, k: int = 10, threshold: float = 0.6):
+    def search_for_chatbot(
+        self,
+        query: str,
+        k: int = 10,
+        threshold: float = 0.6,
+        filters: SearchFilters | None = None,
+    ):
         """
         Hybrid retrieval:
-        - semantic similarity (vector)
-        - keyword matching
-        - score filtering
+        - plain citations ("section 420") answered from the citation index
+        - semantic similarity (vector), filtered by distance threshold
+        - BM25 over the precomputed inverted index
+        - reciprocal-rank fusion of both rankings
+        - optional metadata filters applied to both before scoring
         """
 
-        if not self.db:
+        self._ensure_loaded()
+        snapshot = self.snapshot
+        if not snapshot:
             return []
 
         try:
-            results = self.db.similarity_search_with_score(query, k=k)
+            # Failures raise out of the cache, so they are never cached.
+            docs = self.result_cache.get_or_compute(
+                self._cache_key("chatbot", query, k, filters, threshold),
+                self.current_version(snapshot),
+                lambda: self._search_for_chatbot(snapshot, query, k, threshold, filters),
+            )
         except Exception as e:
-            print(f"Hybrid search failed, fallback: {e}")
-            docs = self.db.similarity_search(query, k=k)
-            return docs[:5]
-
-        # Sort by best score (lower = better)
-        results = sorted(results, key=lambda x: x[1])
-
-        final_docs = []
-        query_lower = query.lower()
-
-        for doc, score in results:
-            content = doc.page_content.lower()
+            print(f"Hybrid search failed: {e}")
+            return []
+        return list(docs)
 
-            keyword_match = query_lower in content
+    def _search_for_chatbot(
+        self,
+        snapshot: IndexSnapshot,
+        query: str,
+        k: int,
+        threshold: float,
+        filters: SearchFilters | None,
+    ):
+        cited = self.lookup_citation(query, filters, snapshot)
+        if cited is not None:
+            print(f"\n[Hybrid Search Debug]")
+            print(f"Query: {query}")
+            print(f"Citation match: {len(cited)} chunks")
+            return cited[:5]
 
-            # Hybrid condition
-            if score < threshold or keyword_match:
-                final_docs.append(doc)
+        results = self._search_with_scores(snapshot, query, k, filters)
 
-        # Remove duplicates (important)
-        seen = set()
-        unique_docs = []
+        # Sort by best score (lower = better)
+        results = sorted(results, key=lambda x: x[1])
+        vector_docs = [doc for doc, score in results if score < threshold]
+        lexical_docs = []
+        if snapshot.bm25 is not None:
+            bm25_rows = snapshot.bm25_facets.rows(filters)
+            allowed = None if bm25_rows is None else set(bm25_rows.tolist())
+            lexical_docs = [
+                snapshot.bm25.document(row)
+                for row, _ in snapshot.bm25.search(query, k=k, rows=allowed)
+            ]
 
-        for doc in final_docs:
-            if doc.page_content not in seen:
-                unique_docs.append(doc)
-                seen.add(doc.page_content)
+        # Fuse on page_content, which also removes duplicates (important)
+        by_content = {}
+        for doc in vector_docs + lexical_docs:
+            by_content.setdefault(doc.page_content, doc)
+        fused = reciprocal_rank_fusion(
+            [
+                [doc.page_content for doc in vector_docs],
+                [doc.page_content for doc in lexical_docs],
+            ]
+        )
+        unique_docs = [by_content[content] for content in fused]
 
-       
         print(f"\n[Hybrid Search Debug]")
         print(f"Query: {query}")
-        print(f"Total retrieved: {len(results)}")
+        print(f"Total retrieved: {len(results)} vector, {len(lexical_docs)} BM25")
         print(f"Filtered: {len(unique_docs)}")
 
         return unique_docs[:5]
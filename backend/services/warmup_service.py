@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+
+from database import db_client
+
+COMPONENTS = ("mongo", "embeddings", "index", "llm")
+
+# The ML services are imported inside the warmup steps, so a worker that
+# skips them (WARMUP_COMPONENTS=mongo) never loads the model stack.
+
+
+def _warm_mongo() -> bool:
+    # Also seeds the system templates; a lazy get_db() does the same.
+    if not db_client.warmup():
+        raise RuntimeError(db_client.error or "MongoDB is not available.")
+    return True
+
+
+def _warm_embeddings() -> bool:
+    from services.vector_service import vector_service
+
+    return vector_service.load_embeddings()
+
+
+def _warm_index() -> bool:
+    from services.vector_service import vector_service
+
+    return vector_service.load_index()
+
+
+def _warm_llm() -> bool:
+    from services.llm_service import llm_service
+
+    return llm_service.warmup()
+
+
+def _component_list(name: str, default: tuple[str, ...]) -> list[str]:
+    value = os.getenv(name, ",".join(default))
+    return [part.strip() for part in value.split(",") if part.strip() in COMPONENTS]
+
+
+class WarmupService:
+    """
+    Loads the heavy services in a background thread after startup and tracks
+    per-component readiness for ``/api/ready``.
+
+    Independent chains run in parallel: Mongo, embeddings -> index, and the
+    LLM client. Every step is also safe to trigger lazily from a request; the
+    services guard their own initialization.
+    """
+
+    def __init__(self) -> None:
+        self.components = _component_list("WARMUP_COMPONENTS", COMPONENTS)
+        chains: list[list[tuple[str, Callable[[], bool]]]] = [
+            [("mongo", _warm_mongo)],
+            [("embeddings", _warm_embeddings), ("index", _warm_index)],
+            [("llm", _warm_llm)],
+        ]
+        self.chains = [
+            [(name, step) for name, step in chain if name in self.components] for chain in chains
+        ]
+        self.chains = [chain for chain in self.chains if chain]
+        self.status = {
+            name: {
+                "state": "pending" if name in self.components else "skipped",
+                "seconds": None,
+                "error": None,
+            }
+            for name in COMPONENTS
+        }
+        self.required = _component_list("READY_REQUIRED_COMPONENTS", tuple(self.components))
+        self.started_at: str | None = None
+        self.finished_at: str | None = None
+        self.total_seconds: float | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _run_step(self, name: str, step: Callable[[], bool]) -> bool:
+        self.status[name]["state"] = "running"
+        start = time.perf_counter()
+        try:
+            ok = bool(step())
+            self.status[name]["error"] = None if ok else "unavailable"
+        except Exception as e:
+            print(f"Warmup of {name} failed: {e}")
+            ok = False
+            self.status[name]["error"] = str(e)
+        self.status[name]["seconds"] = round(time.perf_counter() - start, 3)
+        self.status[name]["state"] = "ready" if ok else "failed"
+        return ok
+
+    def _run_chain(self, chain: list[tuple[str, Callable[[], bool]]]) -> None:
+        for name, step in chain:
+            self._run_step(name, step)
+
+    def run(self) -> None:
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(len(self.chains), 1), thread_name_prefix="warmup") as pool:
+            list(pool.map(self._run_chain, self.chains))
+        self.total_seconds = round(time.perf_counter() - start, 3)
+        self.finished_at = datetime.now(timezone.utc).isoformat()
+        print(f"Warmup finished in {self.total_seconds:.2f}s.")
+
+    def start(self) -> None:
+        """Run the warmup once, in a daemon thread, without blocking startup."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def readiness(self) -> dict:
+        components = {name: dict(status) for name, status in self.status.items()}
+        # Components may also have been loaded lazily by a request. Only look
+        # at services that are already imported; checking must not load them.
+        vector_module = sys.modules.get("services.vector_service")
+        llm_module = sys.modules.get("services.llm_service")
+        vector_service = vector_module.vector_service if vector_module else None
+        live = {
+            "mongo": db_client.ready,
+            "embeddings": vector_service is not None and vector_service.embeddings is not None,
+            "index": vector_service is not None and vector_service.backend is not None,
+            "llm": llm_module is not None and llm_module.llm_service.ready,
+        }
+        for name, ok in live.items():
+            if ok and components[name]["state"] != "ready":
+                components[name]["state"] = "ready"
+                components[name]["error"] = None
+        return {
+            "ready": all(components[name]["state"] == "ready" for name in self.required),
+            "required": self.required,
+            "components": components,
+            "warmup_started_at": self.started_at,
+            "warmup_finished_at": self.finished_at,
+            "warmup_seconds": self.total_seconds,
+        }
+
+
+warmup_service = WarmupService()
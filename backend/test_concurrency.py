@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import httpx
+
+from database import get_db
+from dependencies.auth import get_current_user
+from main import app
+from models.auth import AuthenticatedUser
+from models.document import DocumentSummaryRecord
+from routers import summarizer as summarizer_router
+from services import chatbot_service, summarizer_service
+from test_pipeline import FakeDatabase
+
+PARALLEL_CHATS = 8
+LLM_SECONDS = 0.5
+MAX_LOOP_LAG_SECONDS = 0.1
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list[float], interval: float = 0.01) -> None:
+    """Sleeps ``interval`` in a loop and records how late each wake-up was."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def _run(client: httpx.AsyncClient) -> None:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+
+    started = time.perf_counter()
+    chats = [
+        client.post("/api/chatbot/query", json={"query": f"What is IPC Section {300 + i}?"})
+        for i in range(PARALLEL_CHATS)
+    ]
+    upload = client.post(
+        "/api/summarizer/upload/pdf",
+        files={"file": ("demo.pdf", b"%PDF-1.4 fake pdf bytes", "application/pdf")},
+    )
+    pending = asyncio.gather(*chats, upload)
+
+    # Health checks issued while every chat is waiting on the "LLM".
+    await asyncio.sleep(LLM_SECONDS / 5)
+    health_latencies = []
+    for _ in range(5):
+        start = time.perf_counter()
+        response = await client.get("/api/health")
+        health_latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+
+    responses = await pending
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat
+
+    for response in responses:
+        assert response.status_code == 200, response.text
+
+    serial = (PARALLEL_CHATS + 1) * LLM_SECONDS
+    print(f"{PARALLEL_CHATS} chats + 1 upload finished in {elapsed:.2f}s (serial would be {serial:.2f}s)")
+    print(f"/api/health while busy: max {max(health_latencies) * 1000:.1f}ms")
+    print(f"Event loop lag: max {max(lags) * 1000:.1f}ms over {len(lags)} ticks")
+
+    assert elapsed < serial / 2, "chat requests were serialized"
+    assert max(health_latencies) < MAX_LOOP_LAG_SECONDS, "/api/health was blocked"
+    assert max(lags) < MAX_LOOP_LAG_SECONDS, "event loop was blocked"
+
+
+def run_concurrency_test() -> None:
+    print("=== Event loop responsiveness under parallel chat requests ===")
+
+    fake_db = FakeDatabase()
+    fake_user = AuthenticatedUser(
+        _id=str(uuid4()),
+        email="concurrency@example.com",
+        google_id="google-concurrency-user",
+        name="Concurrency User",
+        picture=None,
+        is_active=True,
+        created_at=datetime.now(UTC),
+        last_login_at=datetime.now(UTC),
+    )
+
+    original_search = chatbot_service.vector_service.search_for_chatbot
+    original_llm = chatbot_service.llm_service.get_ai_response
+    original_pdf_extract = summarizer_router.extract_text_from_pdf
+    original_summary = summarizer_service.summarizer_service.process_summarization
+
+    def slow_llm_response(prompt: str) -> str:
+        # A blocking call, like the synchronous Gemini client.
+        time.sleep(LLM_SECONDS)
+        return "Mocked chatbot answer."
+
+    def slow_summarization(db, user_id, text, source_type, filename=None):
+        time.sleep(LLM_SECONDS)
+        return DocumentSummaryRecord(
+            document_id=str(uuid4()),
+            summary="This is a mocked summary.",
+        )
+
+    chatbot_service.vector_service.search_for_chatbot = lambda query, **kwargs: []
+    chatbot_service.llm_service.get_ai_response = slow_llm_response
+    summarizer_router.extract_text_from_pdf = lambda _: "This is a mocked uploaded document."
+    summarizer_service.summarizer_service.process_summarization = slow_summarization
+    app.dependency_overrides[get_db] = lambda: fake_db
+    app.dependency_overrides[get_current_user] = lambda: fake_user
+
+    async def main() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            await _run(client)
+
+    try:
+        asyncio.run(main())
+        print("Event loop stayed responsive.")
+    finally:
+        chatbot_service.vector_service.search_for_chatbot = original_search
+        chatbot_service.llm_service.get_ai_response = original_llm
+        summarizer_router.extract_text_from_pdf = original_pdf_extract
+        summarizer_service.summarizer_service.process_summarization = original_summary
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+if __name__ == "__main__":
+    run_concurrency_test()
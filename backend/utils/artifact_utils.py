@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+ARTIFACT_FORMAT = "legaltech-corpus-embeddings"
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_MANIFEST_FILE = "artifact.json"
+ARCHIVE_SUFFIX = ".tar"
+_HASH_BLOCK = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _files_checksum(files: dict[str, dict]) -> str:
+    """One checksum over every file's name and hash, in name order."""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f"{name}\0{files[name]['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_artifact_manifest(artifact_dir: Path, **fields) -> dict:
+    """
+    Record every file of ``artifact_dir`` with its size and SHA-256, plus
+    ``fields`` (model name, content version, ...), in ``artifact.json``.
+    """
+    artifact_dir = Path(artifact_dir)
+    files = {
+        path.name: {"bytes": path.stat().st_size, "sha256": file_sha256(path)}
+        for path in sorted(artifact_dir.iterdir())
+        if path.is_file() and path.name != ARTIFACT_MANIFEST_FILE
+    }
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        **fields,
+        "files": files,
+        "checksum": _files_checksum(files),
+    }
+    tmp_path = artifact_dir / f"{ARTIFACT_MANIFEST_FILE}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, artifact_dir / ARTIFACT_MANIFEST_FILE)
+    return manifest
+
+
+def read_artifact_manifest(artifact_dir: Path, verify: bool = True) -> dict:
+    """
+    The manifest of an artifact directory. Raises ValueError when it is not an
+    artifact of a supported format, or, with ``verify``, when any file is
+    missing or does not match its recorded size and checksum.
+    """
+    artifact_dir = Path(artifact_dir)
+    try:
+        manifest = json.loads((artifact_dir / ARTIFACT_MANIFEST_FILE).read_text(encoding="utf-8"))
+    except OSError as exc:
+        raise ValueError(f"No {ARTIFACT_MANIFEST_FILE} in {artifact_dir}.") from exc
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"{artifact_dir} is not a {ARTIFACT_FORMAT} artifact.")
+    if manifest.get("format_version", 0) > ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Artifact format version {manifest['format_version']} is newer than "
+            f"the supported version {ARTIFACT_FORMAT_VERSION}."
+        )
+
+    files = manifest.get("files", {})
+    if _files_checksum(files) != manifest.get("checksum"):
+        raise ValueError(f"Checksum of the file list in {artifact_dir} does not match.")
+    for name, entry in files.items():
+        path = artifact_dir / name
+        if not path.is_file() or path.stat().st_size != entry["bytes"]:
+            raise ValueError(f"Artifact file {path} is missing or truncated.")
+        if verify and file_sha256(path) != entry["sha256"]:
+            raise ValueError(f"Artifact file {path} is corrupt (SHA-256 mismatch).")
+    return manifest
+
+
+def pack_artifact(artifact_dir: Path) -> Path:
+    """
+    Bundle an artifact directory into ``<dir>.tar`` for shipping. The tar is
+    uncompressed: embeddings barely compress, and hosts extract it once and
+    memory-map the files in place.
+    """
+    artifact_dir = Path(artifact_dir)
+    archive = artifact_dir.with_name(artifact_dir.name + ARCHIVE_SUFFIX)
+    tmp_path = archive.with_name(archive.name + ".tmp")
+    with tarfile.open(tmp_path, "w") as tar:
+        for path in sorted(artifact_dir.iterdir()):
+            tar.add(path, arcname=f"{artifact_dir.name}/{path.name}")
+    os.replace(tmp_path, archive)
+    return archive
+
+
+def _archived_checksum(archive: Path, name: str) -> str | None:
+    """The ``checksum`` of the manifest inside ``archive``, read without extracting."""
+    with tarfile.open(archive, "r") as tar:
+        try:
+            member = tar.getmember(f"{name}/{ARTIFACT_MANIFEST_FILE}")
+        except KeyError:
+            return None
+        with tar.extractfile(member) as handle:
+            return json.loads(handle.read()).get("checksum")
+
+
+def _extracted_checksum(target: Path) -> str | None:
+    try:
+        manifest = json.loads((target / ARTIFACT_MANIFEST_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest.get("checksum")
+
+
+def unpack_artifact(archive: Path) -> Path:
+    """
+    Extract ``<name>.tar`` next to itself and return the artifact directory.
+    An extracted copy is reused while its manifest checksum matches the one
+    in the archive; a different archive shipped under the same name, or a
+    partial copy without a manifest, is replaced.
+    """
+    archive = Path(archive)
+    target = archive.with_name(archive.name[: -len(ARCHIVE_SUFFIX)])
+    expected = _archived_checksum(archive, target.name)
+    if expected is None:
+        raise ValueError(f"No {ARTIFACT_MANIFEST_FILE} in {archive}.")
+    if target.exists() and _extracted_checksum(target) == expected:
+        return target
+
+    staging = archive.with_name(f".{target.name}.unpack")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    try:
+        with tarfile.open(archive, "r") as tar:
+            for member in tar.getmembers():
+                # Only plain files of the single artifact directory.
+                parts = Path(member.name).parts
+                if not member.isfile() or len(parts) != 2 or parts[0] != target.name:
+                    raise ValueError(f"Unexpected entry {member.name!r} in {archive}.")
+                with tar.extractfile(member) as source, open(staging / parts[1], "wb") as out:
+                    shutil.copyfileobj(source, out, _HASH_BLOCK)
+        if target.exists():
+            # os.replace cannot overwrite a non-empty directory; move the stale
+            # copy aside first. Open memory maps of its files stay valid.
+            stale = archive.with_name(f".{target.name}.stale")
+            if stale.exists():
+                shutil.rmtree(stale)
+            os.replace(target, stale)
+            shutil.rmtree(stale, ignore_errors=True)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+
+def resolve_artifact(path: Path) -> Path:
+    """Artifact directory for ``path``, which may be the directory or its ``.tar``."""
+    path = Path(path)
+    if path.suffix == ARCHIVE_SUFFIX and path.is_file():
+        return unpack_artifact(path)
+    return path
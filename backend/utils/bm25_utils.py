@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import re
+import zlib
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Collection, Hashable, Iterable, Sequence
+
+from langchain_core.documents import Document
+
+from utils.spool_utils import JsonlSpool, write_json_array
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Kept deliberately small: legal terms such as "shall", "any" or "not" carry
+# meaning in statutes and must stay searchable.
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or the this to what when "
+    "where which who why with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks, built once at ingest time.
+
+    Postings are stored per term, so a query only touches the chunks that
+    contain at least one of its terms instead of scanning every chunk.
+    """
+
+    def __init__(
+        self,
+        texts: list[str],
+        metadatas: list[dict],
+        postings: dict[str, list[list[int]]],
+        doc_lengths: list[int],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        self.texts = texts
+        self.metadatas = metadatas
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        n = len(doc_lengths)
+        self.avg_doc_length = (sum(doc_lengths) / n) if n else 0.0
+        self.length_norms = [
+            k1 * (1 - b + b * length / (self.avg_doc_length or 1)) for length in doc_lengths
+        ]
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def build(cls, documents: Iterable[Document]) -> "BM25Index":
+        builder = BM25Builder()
+        for doc in documents:
+            builder.add(doc)
+        return builder.build()
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "k1": self.k1,
+            "b": self.b,
+            "texts": self.texts,
+            "metadatas": self.metadatas,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(
+            payload["texts"],
+            payload["metadatas"],
+            payload["postings"],
+            payload["doc_lengths"],
+            k1=payload.get("k1", 1.5),
+            b=payload.get("b", 0.75),
+        )
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        rows: Collection[int] | None = None,
+    ) -> list[tuple[int, float]]:
+        """Top-k (row, score) pairs, highest score first, optionally only among ``rows``."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf[term]
+            for row, tf in plist:
+                if rows is not None and row not in rows:
+                    continue
+                scores[row] += idf * tf * (self.k1 + 1) / (tf + self.length_norms[row])
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def document(self, row: int) -> Document:
+        return Document(page_content=self.texts[row], metadata=dict(self.metadatas[row]))
+
+
+class BM25Builder:
+    """Accumulates postings one chunk at a time, e.g. from a streaming ingest."""
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+        self.doc_lengths: list[int] = []
+        self.postings: dict[str, list[list[int]]] = defaultdict(list)
+
+    def add(self, doc: Document) -> None:
+        row = len(self.texts)
+        tokens = tokenize(doc.page_content)
+        self.texts.append(doc.page_content)
+        self.metadatas.append(dict(doc.metadata or {}))
+        self.doc_lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            self.postings[term].append([row, tf])
+
+    def build(self) -> BM25Index:
+        return BM25Index(self.texts, self.metadatas, dict(self.postings), self.doc_lengths)
+
+
+class BM25IndexWriter:
+    """
+    Writes the index file of ``BM25Index.save`` without holding the corpus in
+    memory. Chunks and their term counts are spooled next to ``path`` as they
+    are added; ``close`` streams them into the file and inverts the term
+    counts one slice of the vocabulary at a time, so at most about
+    ``max_postings`` postings are in memory at once.
+    """
+
+    def __init__(self, path: Path, k1: float = 1.5, b: float = 0.75, max_postings: int = 2_000_000) -> None:
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.max_postings = max_postings
+        self._chunks = JsonlSpool(self.path.with_name(self.path.name + ".chunks.tmp"))
+        self._terms = JsonlSpool(self.path.with_name(self.path.name + ".terms.tmp"))
+        self.postings = 0
+
+    @property
+    def count(self) -> int:
+        return self._chunks.count
+
+    def add(self, doc: Document) -> None:
+        tokens = tokenize(doc.page_content)
+        counts = Counter(tokens)
+        self._chunks.append([doc.page_content, dict(doc.metadata or {}), len(tokens)])
+        self._terms.append(counts)
+        self.postings += len(counts)
+
+    def close(self) -> Path:
+        slices = max(1, math.ceil(self.postings / self.max_postings))
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write(f'{{"k1": {json.dumps(self.k1)}, "b": {json.dumps(self.b)}')
+            for key, column in (("texts", 0), ("metadatas", 1), ("doc_lengths", 2)):
+                out.write(f', "{key}": ')
+                write_json_array(out, (record[column] for record in self._chunks))
+            out.write(', "postings": {')
+            first = True
+            for part in range(slices):
+                postings: dict[str, list[list[int]]] = defaultdict(list)
+                for row, counts in enumerate(self._terms):
+                    for term, tf in counts.items():
+                        if slices == 1 or zlib.crc32(term.encode("utf-8")) % slices == part:
+                            postings[term].append([row, tf])
+                for term, plist in postings.items():
+                    out.write(("" if first else ", ") + f"{json.dumps(term, ensure_ascii=False)}: {json.dumps(plist)}")
+                    first = False
+            out.write("}}")
+        os.replace(tmp_path, self.path)
+        self.discard()
+        return self.path
+
+    def discard(self) -> None:
+        """Remove the spool files, e.g. when the ingest has nothing to write."""
+        self._chunks.remove()
+        self._terms.remove()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = 60) -> list[Hashable]:
+    """Merge ranked lists by summing 1 / (k + rank) for every list a key appears in."""
+    scores: dict[Hashable, float] = defaultdict(float)
+    for ranking in rankings:
+        seen: set[Hashable] = set()
+        for rank, key in enumerate(ranking, start=1):
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda key: scores[key], reverse=True)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache with an optional per-entry time-to-live.
+
+    Entries are evicted when the cache grows past ``max_size`` (least recently
+    used first) or when they are older than ``ttl_seconds``. ``ttl_seconds`` of
+    ``None`` or ``0`` disables expiry.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = ttl_seconds or None
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            stored_at, value = entry
+            if self.ttl_seconds and self._clock() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class VersionedResultCache:
+    """LRU+TTL cache for search results, tagged with the index version.
+
+    Keys are combined with the version of the index that produced the result,
+    and the whole cache is dropped as soon as a different version is seen, so
+    a newly published index never serves stale results. Each entry remembers
+    how long it took to compute, which lets hits report the latency they saved.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float | None = 600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.cache = LRUTTLCache(max_size=max_size, ttl_seconds=ttl_seconds, clock=clock)
+        self.version: Hashable = None
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: Hashable) -> None:
+        if version == self.version:
+            return
+        with self._lock:
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self.cache.clear()
+                self.version = version
+
+    def get(self, key: Hashable, version: Hashable) -> Any:
+        self._check_version(version)
+        entry = self.cache.get((version, key))
+        if entry is None:
+            return None
+        value, seconds = entry
+        with self._lock:
+            self.saved_seconds += seconds
+        return value
+
+    def set(self, key: Hashable, version: Hashable, value: Any, seconds: float) -> None:
+        self._check_version(version)
+        self.cache.set((version, key), (value, seconds))
+
+    def get_or_compute(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        cached = self.get(key, version)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        value = compute()
+        self.set(key, version, value, time.perf_counter() - start)
+        return value
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        hits = stats["hits"]
+        return {
+            **stats,
+            "index_version": self.version,
+            "invalidations": self.invalidations,
+            "saved_seconds": round(self.saved_seconds, 4),
+            "avg_saved_ms": round(self.saved_seconds * 1000 / hits, 3) if hits else 0.0,
+        }
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import re
+from typing import Protocol
+
+from langchain_core.documents import Document
+
+from utils.facet_utils import normalize_facet
+
+DEFAULT_MAX_CHARS = 1500
+
+# "Section 302 - Punishment for Murder" / "Article 21: Protection of life" in
+# the plain-text corpus.
+_TXT_UNIT = re.compile(
+    r"^(?P<kind>Section|Article)\s+(?P<number>\d+[A-Z]{0,3})\s*(?:[-–—:.]\s*(?P<title>.*))?$",
+    re.IGNORECASE,
+)
+# Acts in the plain-text corpus are introduced by an upper-case heading such
+# as "INDIAN PENAL CODE, 1860"; other upper-case headings ("LANDMARK CASE
+# LAWS") end the current act.
+_ACT_HEADING = re.compile(r"^[A-Z][A-Z0-9 ,.()&'-]+$")
+_ACT_WORDS = re.compile(r"\b(?:ACT|CODE|CONSTITUTION|SANHITA)\b", re.IGNORECASE)
+_YEAR_SUFFIX = re.compile(r",?\s*\d{4}\s*$")
+
+# Bare-act PDFs: "46. Abettor.—A person abets ..." with the marginal heading
+# ending in ".—", possibly wrapped over a couple of lines. Inserted sections
+# carry an amendment marker: "2[21A. Right to education. —".
+_PDF_UNIT = re.compile(
+    r"^[ \t]*(?:\d{0,2}\[)*(?P<number>\d{1,3}[A-Z]{0,3})\.[ \t]+"
+    r"(?P<title>[A-Z][^\n—]{0,160}(?:\n[^\n—]{0,160}){0,2}?)\.\s*—",
+    re.MULTILINE,
+)
+# Amendment footnotes look like headings: "1. Ins. by the Constitution
+# (Forty-fourth Amendment) Act, 1978, s. 2 (w.e.f. 20-6-1979).—"
+_PDF_FOOTNOTE = re.compile(r"^(?:Ins|Subs|Added|Omitted|Rep|Renumbered)\b|w\.e\.f\.|\bibid\b", re.IGNORECASE)
+# Table-of-contents pages list every heading; they are never split.
+_PDF_CONTENTS = re.compile(r"\A(?:[^\n]*\n){0,4}\s*(?:CONTENTS|ARRANGEMENT OF)", re.IGNORECASE)
+# The act a PDF contains, from its title page ("THE CONSTITUTION OF INDIA",
+# "The Bharatiya Nyaya Sanhita, 2023").
+_PDF_ACT_TITLE = re.compile(r"^\s*THE\s+(?P<act>[A-Z][A-Za-z ]+?)(?:,\s*\d{4})?\s*$", re.MULTILINE | re.IGNORECASE)
+
+# Where a long unit may be cut: sub-sections, explanations, illustrations,
+# exceptions and provisos (same boundaries as in pdf_to_csv.extract_articles,
+# one level down).
+_CLAUSE_BOUNDARY = re.compile(
+    r"(?<!\S)(?=\(\d+[A-Za-z]?\)\s|Explanations?\b|Illustrations?\b|Exceptions?\s*\d*\s*[.\-—:]|Provided\s+(?:further\s+)?that\b)"
+)
+_SENTENCE_END = re.compile(r"(?<=[.;:])\s+")
+_MINOR_WORDS = {"of", "the", "and", "to", "for", "in", "on"}
+
+
+class Chunker(Protocol):
+    """Streaming splitter used by the ingestion pipeline."""
+
+    def feed(self, doc: Document) -> list[Document]: ...
+
+    def flush(self) -> list[Document]: ...
+
+
+class RecursiveChunker:
+    """Adapter for a LangChain text splitter (fixed-size, overlapping chunks)."""
+
+    def __init__(self, splitter) -> None:
+        self.splitter = splitter
+
+    def feed(self, doc: Document) -> list[Document]:
+        return self.splitter.split_documents([doc])
+
+    def flush(self) -> list[Document]:
+        return []
+
+
+def _act_name(heading: str) -> str:
+    words = _YEAR_SUFFIX.sub("", heading).strip().split()
+    if words and words[0].casefold() == "the":
+        words = words[1:]
+    return " ".join(
+        word.lower() if i and word.lower() in _MINOR_WORDS else word.capitalize()
+        for i, word in enumerate(words)
+    )
+
+
+def _pack(pieces: list[str], max_chars: int, separator: str = " ") -> list[str]:
+    """Greedily join consecutive pieces into strings of at most ``max_chars``."""
+    packed: list[str] = []
+    current = ""
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            packed.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        packed.append(current)
+    return packed
+
+
+def _hard_split(text: str, max_chars: int) -> list[str]:
+    """Sentence-, then word-boundary split of one over-long clause."""
+    pieces: list[str] = []
+    for sentence in _SENTENCE_END.split(text):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        pieces.extend(_pack(sentence.split(), max_chars))
+    return _pack(pieces, max_chars)
+
+
+def split_unit(text: str, max_chars: int, heading: str = "") -> list[str]:
+    """
+    One legal unit as one chunk, or, if longer than ``max_chars``, cut at
+    clause boundaries (then sentences) with ``heading`` repeated on every
+    continuation so each piece stays attributable to its provision.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    prefix = f"{heading} (continued)\n" if heading else ""
+    budget = max(max_chars - len(prefix), max_chars // 2)
+    clauses: list[str] = []
+    for clause in _CLAUSE_BOUNDARY.split(text):
+        clauses.extend(_hard_split(clause, budget) if len(clause) > budget else [clause])
+    parts = _pack(clauses, budget)
+    return parts[:1] + [prefix + part for part in parts[1:]]
+
+
+class StatuteChunker:
+    """
+    Splits the legal corpus along its own structure instead of fixed windows:
+
+    * CSV rows that carry a section/article are already one legal unit each.
+    * The plain-text corpus is cut into its "Section N - Title" / "Article N"
+      blocks, which also get act and section/article metadata.
+    * PDF pages are re-joined per file and cut at each "N. Title.—" heading,
+      so a section that runs across pages stays together.
+
+    Only units longer than ``max_chars`` are split further, at sub-section,
+    explanation, illustration, exception and proviso boundaries. There is no
+    overlap between chunks.
+    """
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_CHARS) -> None:
+        self.max_chars = max_chars
+        self._reset_pdf(None)
+
+    def _reset_pdf(self, source: str | None) -> None:
+        self._pdf_source = source
+        # (page number, text, is a contents page) not yet emitted.
+        self._pdf_pages: list[tuple[int, str, bool]] = []
+        self._pdf_act: str | None = None
+        self._pdf_last_number = 0
+        # Past the last section/article: schedules restart their numbering
+        # at 1 and their paragraphs are not citable provisions.
+        self._pdf_in_schedules = False
+
+    def feed(self, doc: Document) -> list[Document]:
+        metadata = doc.metadata or {}
+        chunks = self.flush() if metadata.get("source") != self._pdf_source else []
+        if "page" in metadata:
+            chunks.extend(self._feed_pdf_page(doc))
+        elif metadata.get("section") or metadata.get("article"):
+            chunks.extend(self._split_row(doc))
+        else:
+            chunks.extend(self._split_text(doc))
+        return chunks
+
+    def flush(self) -> list[Document]:
+        chunks = self._emit_pdf_units(self._pdf_units()) if self._pdf_pages else []
+        self._reset_pdf(None)
+        return chunks
+
+    def _documents(self, text: str, metadata: dict, heading: str = "") -> list[Document]:
+        return [
+            Document(page_content=part, metadata=dict(metadata))
+            for part in split_unit(text, self.max_chars, heading)
+        ]
+
+    def _split_row(self, doc: Document) -> list[Document]:
+        metadata = doc.metadata
+        unit = str(metadata.get("article") or metadata.get("section"))
+        if not unit.casefold().startswith(("article", "section")):
+            unit = f"Section {unit}"
+        heading = f"{metadata['act']} {unit}" if metadata.get("act") else unit
+        return self._documents(doc.page_content, metadata, heading)
+
+    def _split_text(self, doc: Document) -> list[Document]:
+        base = dict(doc.metadata or {})
+        chunks: list[Document] = []
+        act: str | None = None
+        for block in re.split(r"\n\s*\n", doc.page_content):
+            lines = [line.strip() for line in block.strip().splitlines() if line.strip()]
+            if not lines:
+                continue
+            first = lines[0]
+            if len(lines) == 1 and _ACT_HEADING.match(first):
+                act = _act_name(first) if _ACT_WORDS.search(first) else None
+                continue
+
+            metadata = dict(base)
+            if act:
+                metadata["act"] = act
+            match = _TXT_UNIT.match(first)
+            if match:
+                number = match.group("number").upper()
+                if match.group("kind").casefold() == "article":
+                    metadata["article"] = f"Article {number}"
+                else:
+                    metadata["section"] = number
+                if match.group("title"):
+                    metadata["title"] = match.group("title").strip()
+            chunks.extend(self._documents("\n".join(lines), metadata, first))
+        return chunks
+
+    def _feed_pdf_page(self, doc: Document) -> list[Document]:
+        if self._pdf_source is None:
+            self._reset_pdf(doc.metadata.get("source"))
+        text = doc.page_content
+        if self._pdf_act is None:
+            for match in _PDF_ACT_TITLE.finditer(text):
+                if _ACT_WORDS.search(match.group("act")):
+                    self._pdf_act = _act_name(match.group("act"))
+                    break
+        self._pdf_pages.append((int(doc.metadata.get("page", 0)), text, bool(_PDF_CONTENTS.match(text))))
+
+        # Every unit but the last one is complete; keep that one buffered,
+        # it may continue on the next page.
+        units = self._pdf_units()
+        if len(units) < 2:
+            return []
+        page, text, *_ = units[-1]
+        self._pdf_pages = [(page, text, False)]
+        return self._emit_pdf_units(units[:-1])
+
+    def _pdf_units(self) -> list[tuple]:
+        """
+        (first page, text, number, title, last number, in schedules) of each
+        unit in the buffered pages; the last two are the scan state after it.
+        """
+        joined = ""
+        page_starts: list[tuple[int, int, bool]] = []
+        for page, text, contents in self._pdf_pages:
+            page_starts.append((len(joined), page, contents))
+            joined += text + "\n"
+
+        def page_at(index: int) -> tuple[int, bool]:
+            found = page_starts[0]
+            for start in page_starts:
+                if start[0] > index:
+                    break
+                found = start
+            return found[1], found[2]
+
+        last, in_schedules = self._pdf_last_number, self._pdf_in_schedules
+        starts = [(0, None, None, last, in_schedules)]
+        for match in _PDF_UNIT.finditer(joined):
+            title = " ".join(match.group("title").split()).rstrip(" .")
+            if page_at(match.start())[1] or _PDF_FOOTNOTE.search(title):
+                continue
+            number = int(re.match(r"\d+", match.group("number")).group())
+            if number < last:
+                # Numbers only go up within the body; a restart at 1 is the
+                # first schedule, anything else a stray cross-reference.
+                if in_schedules or number == 1:
+                    in_schedules = True
+                else:
+                    continue
+            last = number
+            starts.append((match.start(), match.group("number"), title, last, in_schedules))
+
+        units = []
+        for i, (start, number, title, last, in_schedules) in enumerate(starts):
+            end = starts[i + 1][0] if i + 1 < len(starts) else len(joined)
+            text = joined[start:end]
+            if text.strip() or i == len(starts) - 1:
+                units.append((page_at(start)[0], text, number, title, last, in_schedules))
+        return units
+
+    def _emit_pdf_units(self, units: list[tuple]) -> list[Document]:
+        chunks: list[Document] = []
+        is_constitution = self._pdf_act is not None and normalize_facet("act", self._pdf_act) == "constitution"
+        kind = "Article" if is_constitution else "Section"
+        for page, text, number, title, last, in_schedules in units:
+            self._pdf_last_number, self._pdf_in_schedules = last, in_schedules
+            # Drop blank lines and the running page numbers.
+            text = "\n".join(
+                line.strip() for line in text.splitlines() if line.strip() and not line.strip().isdigit()
+            )
+            if not text:
+                continue
+            metadata: dict = {"source": self._pdf_source, "page": page}
+            if self._pdf_act:
+                metadata["act"] = self._pdf_act
+            heading = title or ""
+            if number is not None and not in_schedules:
+                if is_constitution:
+                    metadata["article"] = f"Article {number}"
+                else:
+                    metadata["section"] = number
+                heading = f"{self._pdf_act or ''} {kind} {number}".strip()
+            if title:
+                metadata["title"] = title
+            chunks.extend(self._documents(text, metadata, heading))
+        return chunks
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from langchain_core.documents import Document
+
+from utils.facet_utils import ACT_ALIASES, normalize_facet
+from utils.spool_utils import JsonlSpool, write_json_array
+
+CONSTITUTION = "constitution"
+
+_ACT_NAMES = sorted({*ACT_ALIASES, *ACT_ALIASES.values()}, key=len, reverse=True)
+_ACT = "(?P<act>" + "|".join(re.escape(name) for name in _ACT_NAMES) + ")"
+_KIND = r"(?P<kind>section|sec\.?|s\.|u/s|§|article|art\.?)"
+_NUMBER = r"(?P<number>\d+(?:-?[a-z]{1,2})?)"
+_OF = r"(?:of\s+(?:the\s+)?)?"
+
+# Only queries that are nothing but a citation take the shortcut; "punishment
+# under section 302 for murder" still goes through semantic search.
+_CITATION_PATTERNS = [
+    re.compile(rf"^{_KIND}\s*{_NUMBER}(?:\s+{_OF}{_ACT})?$"),
+    re.compile(rf"^{_ACT}\s+(?:{_KIND}\s*)?{_NUMBER}$"),
+    re.compile(rf"^{_NUMBER}\s+{_OF}{_ACT}$"),
+]
+_LEADING_FILLER = re.compile(
+    r"^(?:what\s+(?:is|does|do)|explain|define|show(?:\s+me)?|tell\s+me\s+about|meaning\s+of)\s+(?:the\s+)?"
+)
+_TRAILING_FILLER = re.compile(r"\s+(?:says?|means?|states?|provides?)$")
+_METADATA_ARTICLE = re.compile(r"^article\s+(\d+(?:-?[a-z]{1,2})?)$")
+_METADATA_SECTION = re.compile(r"^(?:section\s+)?(\d+(?:-?[a-z]{1,2})?)$")
+
+
+def _normalize_number(number: str) -> str:
+    return number.replace("-", "").casefold()
+
+
+@dataclass(frozen=True)
+class Citation:
+    number: str
+    kind: str | None = None
+    act: str | None = None
+
+
+def parse_citation(query: str) -> Citation | None:
+    """
+    Parse plain citation queries such as "section 420", "Article 21A",
+    "BNS 103" or "302 IPC". Returns None for anything else.
+    """
+    text = " ".join(query.casefold().split()).rstrip("?.! ")
+    text = _TRAILING_FILLER.sub("", _LEADING_FILLER.sub("", text))
+    for pattern in _CITATION_PATTERNS:
+        match = pattern.match(text)
+        if not match:
+            continue
+        groups = match.groupdict()
+        kind = groups.get("kind")
+        if kind:
+            kind = "article" if kind.startswith("art") else "section"
+        act = normalize_facet("act", groups["act"]) if groups.get("act") else None
+        return Citation(number=_normalize_number(groups["number"]), kind=kind, act=act)
+    return None
+
+
+def metadata_citation(metadata: dict) -> Citation | None:
+    """The (act, section/article) a CSV chunk belongs to, if its metadata names one."""
+    article = str(metadata.get("article") or "").strip().casefold()
+    section = str(metadata.get("section") or "").strip().casefold()
+
+    kind = number = None
+    for value in (article, section):
+        match = _METADATA_ARTICLE.match(value)
+        if match:
+            kind, number = "article", match.group(1)
+            break
+    if number is None:
+        match = _METADATA_SECTION.match(section)
+        if match:
+            kind, number = "section", match.group(1)
+    if number is None:
+        return None
+
+    act = normalize_facet("act", metadata["act"]) if metadata.get("act") else None
+    if act is None and kind == "article":
+        act = CONSTITUTION
+    return Citation(number=_normalize_number(number), kind=kind, act=act or "")
+
+
+def _key(act: str, kind: str, number: str) -> str:
+    return f"{act}|{kind}|{number}"
+
+
+class CitationIndex:
+    """
+    Hash index from (act, section/article) to the chunks of that provision,
+    built at ingest time from the CSV metadata. Answers plain citation
+    queries with a dict lookup instead of embedding the query.
+
+    Only CSV rows carry section metadata. BNS provisions exist only in
+    BNSdata.pdf, so "BNS 103" finds no entry and takes the semantic path.
+    """
+
+    def __init__(
+        self,
+        texts: list[str],
+        metadatas: list[dict],
+        entries: dict[str, list[int]],
+    ) -> None:
+        self.texts = texts
+        self.metadatas = metadatas
+        self.entries = entries
+        # "section|302" -> every act's key for that number, for act-less queries.
+        self.by_number: dict[str, list[str]] = defaultdict(list)
+        for key in entries:
+            _, kind, number = key.split("|")
+            self.by_number[f"{kind}|{number}"].append(key)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, documents: Iterable[Document]) -> "CitationIndex":
+        builder = CitationIndexBuilder()
+        for doc in documents:
+            builder.add(doc)
+        return builder.build()
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"texts": self.texts, "metadatas": self.metadatas, "entries": self.entries}
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "CitationIndex":
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(payload["texts"], payload["metadatas"], payload["entries"])
+
+    def lookup(self, citation: Citation) -> list[Document]:
+        kind = citation.kind
+        if kind is None:
+            kind = "article" if citation.act == CONSTITUTION else "section"
+
+        if citation.act is not None:
+            keys = [_key(citation.act, kind, citation.number)]
+        elif kind == "article":
+            keys = [_key(CONSTITUTION, kind, citation.number)]
+        else:
+            keys = self.by_number.get(f"{kind}|{citation.number}", [])
+
+        documents = []
+        for key in keys:
+            for row in self.entries.get(key, []):
+                documents.append(
+                    Document(page_content=self.texts[row], metadata=dict(self.metadatas[row]))
+                )
+        return documents
+
+    def search(self, query: str) -> list[Document] | None:
+        """Chunks for a plain citation query, or None if it is not one (or unknown)."""
+        citation = parse_citation(query)
+        if citation is None:
+            return None
+        return self.lookup(citation) or None
+
+
+class CitationIndexBuilder:
+    """Collects the chunks that carry a section/article, e.g. from a streaming ingest."""
+
+    def __init__(self) -> None:
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+        self.entries: dict[str, list[int]] = defaultdict(list)
+
+    def add(self, doc: Document) -> None:
+        citation = metadata_citation(doc.metadata or {})
+        if citation is None:
+            return
+        row = len(self.texts)
+        self.texts.append(doc.page_content)
+        self.metadatas.append(dict(doc.metadata or {}))
+        self.entries[_key(citation.act, citation.kind, citation.number)].append(row)
+
+    def build(self) -> CitationIndex:
+        return CitationIndex(self.texts, self.metadatas, dict(self.entries))
+
+
+class CitationIndexWriter:
+    """
+    Writes the index file of ``CitationIndex.save`` during a streaming
+    ingest. Cited chunks are spooled next to ``path``; only the entries
+    (provision key -> row numbers) stay in memory.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._chunks = JsonlSpool(self.path.with_name(self.path.name + ".chunks.tmp"))
+        self.entries: dict[str, list[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, doc: Document) -> None:
+        citation = metadata_citation(doc.metadata or {})
+        if citation is None:
+            return
+        self.entries[_key(citation.act, citation.kind, citation.number)].append(self._chunks.count)
+        self._chunks.append([doc.page_content, dict(doc.metadata or {})])
+
+    def close(self) -> Path:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            out.write('{"texts": ')
+            write_json_array(out, (record[0] for record in self._chunks))
+            out.write(', "metadatas": ')
+            write_json_array(out, (record[1] for record in self._chunks))
+            out.write(f', "entries": {json.dumps(self.entries, ensure_ascii=False)}}}')
+        os.replace(tmp_path, self.path)
+        self.discard()
+        return self.path
+
+    def discard(self) -> None:
+        """Remove the spool file, e.g. when the ingest has nothing to write."""
+        self._chunks.remove()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import re
+
+import mmh3
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+# Smallest prime above 2**32, for the (a * h + b) mod p permutations.
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def shingles(text: str, size: int = 5) -> set[str]:
+    """Lower-cased word ``size``-grams; short texts become a single shingle."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH index of chunk texts for near-duplicate removal at ingest.
+
+    Each text gets a ``num_perm`` MinHash signature over its word shingles.
+    The signature is cut into ``bands``; texts sharing any band bucket are
+    candidates, and a candidate counts as a duplicate when the estimated
+    Jaccard similarity of the shingle sets is at least ``threshold``. With
+    16 bands of 8 rows, pairs at 0.85 similarity are found ~99% of the time
+    while pairs below 0.5 rarely even become candidates.
+
+    Statutes are formulaic (IPC 153A and 153AA share most of their wording),
+    so entries may carry a ``label`` such as their section: only entries with
+    the same label are compared. Unlabelled entries (None) are compared only
+    with each other, so free text never removes a labelled provision or is
+    removed by one.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands.")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a, b < 2**31 and h < 2**32 keep a * h + b inside uint64.
+        self._a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**31, size=num_perm, dtype=np.uint64)
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(bands)]
+        self.keys: list[str] = []
+        self._labels: list[str | None] = []
+        self._signatures: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (mmh3.hash(shingle, signed=False) for shingle in shingles(text, self.shingle_size)),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def _bands(self, signature: np.ndarray) -> list[bytes]:
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def query(self, signature: np.ndarray, label: str | None = None) -> tuple[str, float] | None:
+        """Most similar indexed key at or above the threshold, with its similarity."""
+        candidates: set[int] = set()
+        for bucket, band in zip(self._buckets, self._bands(signature)):
+            candidates.update(bucket.get(band, ()))
+        best: tuple[str, float] | None = None
+        for position in candidates:
+            if self._labels[position] != label:
+                continue
+            similarity = float(np.mean(self._signatures[position] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (self.keys[position], similarity)
+        return best
+
+    def add(self, key: str, signature: np.ndarray, label: str | None = None) -> None:
+        position = len(self.keys)
+        self.keys.append(key)
+        self._labels.append(label)
+        self._signatures.append(signature)
+        for bucket, band in zip(self._buckets, self._bands(signature)):
+            bucket.setdefault(band, []).append(position)
+
+    def find_or_add(self, key: str, text: str, label: str | None = None) -> tuple[str, float] | None:
+        """
+        The (key, similarity) of an earlier near-duplicate of ``text``, or None
+        after indexing ``text`` under ``key``. The first occurrence always wins.
+        """
+        signature = self.signature(text)
+        match = self.query(signature, label)
+        if match is None:
+            self.add(key, signature, label)
+        return match
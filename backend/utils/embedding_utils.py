@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_BACKENDS = ("huggingface", "onnx")
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model.int8.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+ONNX_META_FILE = "export_meta.json"
+
+
+def default_onnx_dir(model_name: str = DEFAULT_MODEL_NAME) -> Path:
+    configured = os.getenv("ONNX_MODEL_DIR")
+    if configured:
+        path = Path(configured)
+        return path if path.is_absolute() else BASE_DIR / path
+    return BASE_DIR / "onnx_models" / model_name
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence embeddings from an exported all-MiniLM-L6-v2 ONNX graph.
+
+    Reproduces the sentence-transformers pipeline (WordPiece tokenization,
+    mean pooling over the attention mask, L2 normalization), so the vectors
+    are interchangeable with HuggingFaceEmbeddings for the same model, without
+    importing torch. Export the model with ``scripts/export_onnx.py``.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        quantized: bool = False,
+        batch_size: int = 32,
+        threads: int | None = None,
+        max_length: int = 256,
+    ) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_dir = Path(model_dir)
+        model_file = ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        meta_path = self.model_dir / ONNX_META_FILE
+        self.meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        self.model_name = self.meta.get("model_name", DEFAULT_MODEL_NAME)
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / ONNX_TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.meta.get("max_seq_length", max_length))
+        self.tokenizer.enable_padding(pad_id=self.meta.get("pad_token_id", 0))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(self.model_dir / model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+
+def build_embeddings(
+    model_name: str = DEFAULT_MODEL_NAME,
+    backend: str | None = None,
+    batch_size: int = 32,
+    threads: int | None = None,
+    device: str | None = None,
+) -> Embeddings:
+    """
+    Embedding model selected by ``EMBEDDING_BACKEND`` (huggingface or onnx).
+
+    Heavy dependencies are imported here, not at module import, so the ONNX
+    path never loads torch.
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "huggingface")).strip().lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'; expected one of {EMBEDDING_BACKENDS}.")
+
+    if backend == "onnx":
+        return OnnxEmbeddings(
+            default_onnx_dir(model_name),
+            quantized=os.getenv("ONNX_QUANTIZED", "false").lower() in ("1", "true", "yes"),
+            batch_size=batch_size,
+            threads=threads or int(os.getenv("ONNX_THREADS", "0")) or None,
+        )
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    if threads:
+        import torch
+
+        torch.set_num_threads(threads)
+    model_kwargs = {"local_files_only": True}
+    if device:
+        model_kwargs["device"] = device
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={"batch_size": batch_size},
+    )
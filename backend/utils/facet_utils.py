@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+FACET_FIELDS = ("act", "type", "part")
+
+# Common short forms people type for the acts in the corpus.
+ACT_ALIASES = {
+    "ipc": "indian penal code",
+    "i.p.c.": "indian penal code",
+    "penal code": "indian penal code",
+    "coi": "constitution",
+    "constitution of india": "constitution",
+    "indian constitution": "constitution",
+    "bns": "bharatiya nyaya sanhita",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize_facet(field: str, value) -> str:
+    text = _WHITESPACE.sub(" ", str(value)).strip().casefold()
+    if field == "act":
+        return ACT_ALIASES.get(text, text)
+    return text
+
+
+def section_number(metadata: dict) -> int | None:
+    """
+    Leading number of a chunk's section or article ("302A" -> 302,
+    "Article 21" -> 21, "140.0" -> 140), or None if it has neither.
+    """
+    for key in ("section", "article"):
+        value = metadata.get(key)
+        if value is None:
+            continue
+        match = _NUMBER.search(str(value))
+        if match:
+            return int(match.group())
+    return None
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Restricts a search to chunks whose metadata match every given field."""
+
+    act: str | None = None
+    type: str | None = None
+    part: str | None = None
+    section_from: int | None = None
+    section_to: int | None = None
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.key())
+
+    def key(self) -> tuple:
+        return (
+            normalize_facet("act", self.act) if self.act else None,
+            normalize_facet("type", self.type) if self.type else None,
+            normalize_facet("part", self.part) if self.part else None,
+            self.section_from,
+            self.section_to,
+        )
+
+
+class FacetIndex:
+    """
+    Sorted row lists per metadata value, built once when an index is loaded.
+
+    ``rows(filters)`` intersects the lists for the requested values, so a
+    filtered search scores only the matching rows instead of post-filtering
+    a full-corpus top-k.
+    """
+
+    def __init__(self, metadatas: Sequence[dict]) -> None:
+        self.size = len(metadatas)
+        postings: dict[str, dict[str, list[int]]] = {field: defaultdict(list) for field in FACET_FIELDS}
+        sections = np.full(self.size, -1, dtype=np.int64)
+
+        for row, metadata in enumerate(metadatas):
+            metadata = metadata or {}
+            for field in FACET_FIELDS:
+                value = metadata.get(field)
+                if value not in (None, ""):
+                    postings[field][normalize_facet(field, value)].append(row)
+            number = section_number(metadata)
+            if number is not None:
+                sections[row] = number
+
+        self.postings = {
+            field: {value: np.asarray(rows, dtype=np.int64) for value, rows in values.items()}
+            for field, values in postings.items()
+        }
+        self.section_numbers = sections
+
+    def __len__(self) -> int:
+        return self.size
+
+    def rows(self, filters: SearchFilters | None) -> np.ndarray | None:
+        """Sorted matching rows, or None when ``filters`` restrict nothing."""
+        if filters is None or filters.is_empty():
+            return None
+
+        act, type_, part, section_from, section_to = filters.key()
+        selected: np.ndarray | None = None
+        for field, value in (("act", act), ("type", type_), ("part", part)):
+            if value is None:
+                continue
+            rows = self.postings[field].get(value)
+            if rows is None:
+                return np.empty(0, dtype=np.int64)
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+
+        if section_from is not None or section_to is not None:
+            candidates = selected if selected is not None else np.arange(self.size, dtype=np.int64)
+            numbers = self.section_numbers[candidates]
+            mask = numbers >= max(section_from or 0, 0)
+            if section_to is not None:
+                mask &= numbers <= section_to
+            selected = candidates[mask]
+        return selected
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        return {
+            field: {value: int(rows.size) for value, rows in sorted(values.items())}
+            for field, values in self.postings.items()
+        }
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+
+class JsonlSpool:
+    """
+    Append-only JSON-lines scratch file. Index writers spool records here
+    during a streaming ingest and read them back, possibly several times,
+    when they write the final file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.count = 0
+
+    def append(self, record: Any) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def __iter__(self) -> Iterator[Any]:
+        self._file.flush()
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def remove(self) -> None:
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+def write_json_array(out: TextIO, items: Iterable[Any]) -> None:
+    """Write ``items`` to ``out`` as a JSON array, one item at a time."""
+    out.write("[")
+    for i, item in enumerate(items):
+        if i:
+            out.write(", ")
+        out.write(json.dumps(item, ensure_ascii=False))
+    out.write("]")
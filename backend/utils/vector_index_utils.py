@@ -0,0 +1,635 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.jsonl"
+META_FILE = "index_meta.json"
+FAISS_FILE = "faiss.index"
+INDEX_VERSION_FILE = "index_version.json"
+SNAPSHOT_POINTER_FILE = "CURRENT"
+SHARD_MANIFEST_FILE = "shards.json"
+# Shard of the chunks without an act (preambles, schedules, untagged rows).
+UNASSIGNED_SHARD = "unassigned"
+FAISS_INDEX_TYPES = ("flat", "ivf", "hnsw")
+PRECISIONS = ("float32", "float16", "int8")
+QUANTIZED_FILES = {
+    "float16": "embeddings.float16.npy",
+    "int8": "embeddings.int8.npy",
+}
+INT8_SCALE_FILE = "embeddings.int8_scale.npy"
+_BLOCK_ROWS = 16384
+# Filtered FAISS searches over at most this many rows are scored exactly
+# against the float32 matrix; IVF/HNSW probing would miss most of a small subset.
+_EXACT_SUBSET_ROWS = 32768
+
+
+def l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_to_distance(similarity: np.ndarray) -> np.ndarray:
+    """
+    Squared L2 distance between unit vectors (2 - 2cos). This is the scale
+    Chroma's default "l2" space reports, so thresholds tuned against Chroma
+    (e.g. search_for_chatbot's 0.6) keep their meaning on every backend.
+    """
+    return np.maximum(2.0 - 2.0 * similarity, 0.0)
+
+
+class NumpyIndexWriter:
+    """
+    Writes an exact-search index directory:
+
+    - embeddings.npy: L2-normalized float32 matrix, one row per chunk
+    - chunks.jsonl: {"id", "text", "metadata"} per row, same order
+    - index_meta.json: model name, dimension, row count, metric
+
+    Rows are appended batch by batch to a raw scratch file and converted to
+    ``.npy`` on ``close()``, so the total row count need not be known upfront.
+    """
+
+    def __init__(self, out_dir: Path, model_name: str) -> None:
+        self.out_dir = Path(out_dir)
+        self.model_name = model_name
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._raw_path = self.out_dir / "embeddings.f32.tmp"
+        self._raw = open(self._raw_path, "wb")
+        self._chunks = open(self.out_dir / f"{CHUNKS_FILE}.tmp", "w", encoding="utf-8")
+        self.count = 0
+        self.dim: int | None = None
+
+    def add(
+        self,
+        ids: Iterable[str],
+        texts: Iterable[str],
+        metadatas: Iterable[dict | None],
+        embeddings,
+    ) -> None:
+        matrix = l2_normalize(embeddings)
+        if self.dim is None:
+            self.dim = int(matrix.shape[1])
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension changed from {self.dim} to {matrix.shape[1]}.")
+
+        rows = 0
+        for chunk_id, text, metadata in zip(ids, texts, metadatas):
+            record = {"id": chunk_id, "text": text, "metadata": metadata or {}}
+            self._chunks.write(json.dumps(record, ensure_ascii=False) + "\n")
+            rows += 1
+        if rows != matrix.shape[0]:
+            raise ValueError("ids, texts, metadatas and embeddings must have equal length.")
+
+        self._raw.write(matrix.tobytes())
+        self.count += rows
+
+    def close(self) -> Path:
+        self._raw.close()
+        self._chunks.close()
+        dim = self.dim or 0
+
+        raw = (
+            np.memmap(self._raw_path, dtype=np.float32, mode="r", shape=(self.count, dim))
+            if self.count
+            else np.zeros((0, dim), dtype=np.float32)
+        )
+        out = np.lib.format.open_memmap(
+            self.out_dir / EMBEDDINGS_FILE, mode="w+", dtype=np.float32, shape=(self.count, dim)
+        )
+        step = 8192
+        for start in range(0, self.count, step):
+            out[start:start + step] = raw[start:start + step]
+        out.flush()
+        del out, raw
+        self._raw_path.unlink()
+
+        os.replace(self.out_dir / f"{CHUNKS_FILE}.tmp", self.out_dir / CHUNKS_FILE)
+        meta = {
+            "model_name": self.model_name,
+            "dim": dim,
+            "count": self.count,
+            "metric": "l2",
+        }
+        (self.out_dir / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return self.out_dir
+
+
+def quantize_embeddings(index_dir: Path, precision: str) -> Path:
+    """
+    Write a compact copy of ``embeddings.npy`` next to it.
+
+    - float16: half precision, 2 bytes per dimension
+    - int8: symmetric scalar quantization with one scale per dimension
+      (max |x_d| / 127), 1 byte per dimension plus a float32 scale vector
+
+    The float32 matrix stays on disk for full-precision re-scoring.
+    """
+    if precision not in QUANTIZED_FILES:
+        raise ValueError(f"Unknown precision '{precision}'; expected one of {tuple(QUANTIZED_FILES)}.")
+
+    index_dir = Path(index_dir)
+    full = np.load(index_dir / EMBEDDINGS_FILE, mmap_mode="r")
+    n, dim = full.shape
+    out_path = index_dir / QUANTIZED_FILES[precision]
+    out = np.lib.format.open_memmap(
+        out_path, mode="w+", dtype=np.float16 if precision == "float16" else np.int8, shape=(n, dim)
+    )
+
+    if precision == "int8":
+        max_abs = np.zeros(dim, dtype=np.float32)
+        for start in range(0, n, _BLOCK_ROWS):
+            np.maximum(max_abs, np.abs(full[start:start + _BLOCK_ROWS]).max(axis=0), out=max_abs)
+        scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        np.save(index_dir / INT8_SCALE_FILE, scale)
+        for start in range(0, n, _BLOCK_ROWS):
+            block = np.rint(full[start:start + _BLOCK_ROWS] / scale)
+            out[start:start + _BLOCK_ROWS] = np.clip(block, -127, 127).astype(np.int8)
+    else:
+        for start in range(0, n, _BLOCK_ROWS):
+            out[start:start + _BLOCK_ROWS] = full[start:start + _BLOCK_ROWS].astype(np.float16)
+
+    out.flush()
+    del out
+    return out_path
+
+
+def _top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Row-wise top-k of a (n_queries, n) similarity matrix, best first."""
+    n = scores.shape[1]
+    if k < n:
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(n), scores.shape).copy()
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _exact_subset(
+    queries: np.ndarray,
+    full: np.ndarray,
+    rows: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Exact top-k restricted to ``rows`` (sorted), which are the only rows read."""
+    sims = queries @ np.asarray(full[rows], dtype=np.float32).T
+    local, top_sims = _top_k(sims, k)
+    return rows[local], top_sims
+
+
+def _rescore(
+    queries: np.ndarray,
+    candidates: np.ndarray,
+    full: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact float32 similarities for each query's candidate rows. Only those
+    rows of the (memory-mapped) full-precision matrix are read.
+    """
+    rows_out = np.full((queries.shape[0], k), -1, dtype=np.int64)
+    sims_out = np.full((queries.shape[0], k), -1.0, dtype=np.float32)
+    for i, (query, cand) in enumerate(zip(queries, candidates)):
+        cand = np.sort(cand[cand >= 0])
+        if cand.size == 0:
+            continue
+        sims = full[cand] @ query
+        order = np.argsort(-sims)[:k]
+        rows_out[i, : order.size] = cand[order]
+        sims_out[i, : order.size] = sims[order]
+    return rows_out, sims_out
+
+
+class ChunkIndex:
+    """Chunk texts and metadata of an index directory, addressed by row."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.meta = json.loads((self.path / META_FILE).read_text(encoding="utf-8"))
+        self.model_name = self.meta.get("model_name")
+
+        self.ids: list[str] = []
+        self.texts: list[str] = []
+        self.metadatas: list[dict] = []
+        with open(self.path / CHUNKS_FILE, encoding="utf-8") as handle:
+            for line in handle:
+                record = json.loads(line)
+                self.ids.append(record["id"])
+                self.texts.append(record["text"])
+                self.metadatas.append(record.get("metadata") or {})
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def document(self, row: int) -> Document:
+        return Document(page_content=self.texts[row], metadata=dict(self.metadatas[row]))
+
+    def _check_rows(self, rows: int) -> None:
+        if len(self.texts) != rows:
+            raise ValueError(
+                f"Index at {self.path} is inconsistent: {len(self.texts)} chunks "
+                f"but {rows} vectors."
+            )
+
+
+class NumpyIndex(ChunkIndex):
+    """
+    Brute-force cosine search over a normalized embedding matrix.
+
+    Tens of thousands of MiniLM chunks fit comfortably in memory (or in the
+    page cache when memory-mapped), and a single matrix product plus
+    ``argpartition`` beats a round-trip through SQLite and HNSW at that size.
+
+    With ``precision`` float16 or int8 the quantized matrix is held in memory
+    and scanned instead; the best ``k * rescore_factor`` candidates are then
+    re-scored against the float32 matrix, which stays memory-mapped on disk.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mmap: bool = True,
+        precision: str = "float32",
+        rescore_factor: int = 4,
+    ) -> None:
+        super().__init__(path)
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}'; expected one of {PRECISIONS}.")
+        self.precision = precision
+        self.rescore_factor = max(1, rescore_factor)
+        self.scale = None
+
+        if precision == "float32":
+            self.embeddings = np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r" if mmap else None)
+            self.stored = self.embeddings
+        else:
+            self.embeddings = np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r")
+            self.stored = np.load(self.path / QUANTIZED_FILES[precision])
+            if precision == "int8":
+                self.scale = np.load(self.path / INT8_SCALE_FILE)
+        self._check_rows(self.stored.shape[0])
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of the matrix that is scanned on every query."""
+        extra = self.scale.nbytes if self.scale is not None else 0
+        return int(self.stored.nbytes) + extra
+
+    def _scores(self, queries: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        if self.precision == "float32":
+            matrix = self.embeddings if rows is None else self.embeddings[rows]
+            return queries @ matrix.T
+        if self.scale is not None:
+            # q . (s * x) == (q * s) . x, so the scale folds into the query.
+            queries = queries * self.scale
+        stored = self.stored if rows is None else self.stored[rows]
+        n = stored.shape[0]
+        scores = np.empty((queries.shape[0], n), dtype=np.float32)
+        for start in range(0, n, _BLOCK_ROWS):
+            block = stored[start:start + _BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + _BLOCK_ROWS] = queries @ block.T
+        return scores
+
+    def search(self, vectors, k: int, rows: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k rows for each query vector. Returns (rows, distances), both of
+        shape (n_queries, k'), sorted by ascending distance.
+
+        ``rows`` (sorted row numbers, e.g. from a FacetIndex) restricts the
+        search to those rows; only they are scanned.
+        """
+        queries = l2_normalize(vectors)
+        n = len(self) if rows is None else len(rows)
+        k = min(k, n)
+        if k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        scores = self._scores(queries, rows)
+        if self.precision == "float32":
+            found, sims = _top_k(scores, k)
+            if rows is not None:
+                found = rows[found]
+        else:
+            candidates, _ = _top_k(scores, min(n, k * self.rescore_factor))
+            if rows is not None:
+                candidates = rows[candidates]
+            found, sims = _rescore(queries, candidates, self.embeddings, k)
+        return found, cosine_to_distance(sims)
+
+
+def build_faiss_index(
+    index_dir: Path,
+    index_type: str = "flat",
+    nlist: int = 256,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+    precision: str = "float32",
+) -> Path:
+    """
+    Build ``faiss.index`` next to the exported embeddings of ``index_dir``.
+
+    All variants use inner product on the normalized vectors, i.e. cosine:
+    - flat: exact search, the recall baseline
+    - ivf:  inverted lists over ``nlist`` k-means cells, tuned with nprobe
+    - hnsw: graph search with ``hnsw_m`` links per node, tuned with efSearch
+
+    ``precision`` float16 or int8 stores the vectors with FAISS's scalar
+    quantizer (QT_fp16 / QT_8bit, trained per dimension).
+    """
+    import faiss
+
+    index_type = index_type.lower()
+    if index_type not in FAISS_INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type '{index_type}'; expected one of {FAISS_INDEX_TYPES}.")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'; expected one of {PRECISIONS}.")
+    qtype = {
+        "float16": faiss.ScalarQuantizer.QT_fp16,
+        "int8": faiss.ScalarQuantizer.QT_8bit,
+    }.get(precision)
+
+    index_dir = Path(index_dir)
+    vectors = np.ascontiguousarray(np.load(index_dir / EMBEDDINGS_FILE), dtype=np.float32)
+    n, dim = vectors.shape
+
+    metric = faiss.METRIC_INNER_PRODUCT
+    if index_type == "ivf":
+        # FAISS wants roughly 39 training points per centroid.
+        nlist = max(1, min(nlist, n // 39))
+        quantizer = faiss.IndexFlatIP(dim)
+        if qtype is None:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+        else:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, qtype, metric)
+    elif index_type == "hnsw":
+        if qtype is None:
+            index = faiss.IndexHNSWFlat(dim, hnsw_m, metric)
+        else:
+            index = faiss.IndexHNSWSQ(dim, qtype, hnsw_m, metric)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        index = faiss.IndexFlatIP(dim) if qtype is None else faiss.IndexScalarQuantizer(dim, qtype, metric)
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    faiss.write_index(index, str(index_dir / FAISS_FILE))
+
+    meta_path = index_dir / META_FILE
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta["faiss"] = {
+        "type": index_type,
+        "precision": precision,
+        "nlist": nlist,
+        "hnsw_m": hnsw_m,
+        "ef_construction": ef_construction,
+    }
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return index_dir / FAISS_FILE
+
+
+class FaissIndex(ChunkIndex):
+    """
+    FAISS-backed search over the same chunk store as NumpyIndex.
+
+    ``nprobe`` (IVF) and ``ef_search`` (HNSW) trade recall for latency at query
+    time; they are ignored by the flat index. Scalar-quantized indexes fetch
+    ``k * rescore_factor`` candidates and re-score them in float32.
+
+    Filtered searches pass ``rows``: small subsets are scored exactly against
+    the memory-mapped float32 matrix, larger ones go through FAISS with an
+    ``IDSelectorBatch`` so only the selected rows are considered.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        nprobe: int = 16,
+        ef_search: int = 64,
+        rescore_factor: int = 4,
+    ) -> None:
+        import faiss
+
+        super().__init__(path)
+        self.index = faiss.read_index(str(self.path / FAISS_FILE))
+        faiss_meta = self.meta.get("faiss", {})
+        self.index_type = faiss_meta.get("type", "flat")
+        self.precision = faiss_meta.get("precision", "float32")
+        self.rescore_factor = max(1, rescore_factor)
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.full_vectors = np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r")
+        self.embeddings = self.full_vectors if self.precision != "float32" else None
+        self._check_rows(self.index.ntotal)
+
+        if hasattr(self.index, "nprobe"):
+            self.index.nprobe = nprobe
+        if hasattr(self.index, "hnsw"):
+            self.index.hnsw.efSearch = ef_search
+
+    def _search_params(self, rows: np.ndarray):
+        import faiss
+
+        selector = faiss.IDSelectorBatch(rows)
+        if self.index_type == "ivf":
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        return faiss.SearchParameters(sel=selector)
+
+    def search(self, vectors, k: int, rows: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        queries = np.ascontiguousarray(l2_normalize(vectors))
+        k = min(k, len(self) if rows is None else len(rows))
+        if k <= 0:
+            empty = np.empty((queries.shape[0], 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        if rows is not None and len(rows) <= _EXACT_SUBSET_ROWS:
+            found, sims = _exact_subset(queries, self.full_vectors, rows, k)
+            return found, cosine_to_distance(sims)
+
+        params = None if rows is None else self._search_params(rows)
+        if self.embeddings is None:
+            sims, found = self.index.search(queries, k, params=params)
+        else:
+            fetch = min(len(self), k * self.rescore_factor)
+            _, candidates = self.index.search(queries, fetch, params=params)
+            found, sims = _rescore(queries, candidates, self.embeddings, k)
+        return found, cosine_to_distance(sims)
+
+    @property
+    def memory_bytes(self) -> int:
+        return (self.path / FAISS_FILE).stat().st_size
+
+
+def replace_directory(staging_dir: Path, target_dir: Path) -> None:
+    """Swap a freshly written index directory into place."""
+    backup = target_dir.with_name(target_dir.name + ".old")
+    if backup.exists():
+        shutil.rmtree(backup)
+    if target_dir.exists():
+        os.replace(target_dir, backup)
+    os.replace(staging_dir, target_dir)
+    if backup.exists():
+        shutil.rmtree(backup)
+
+
+def publish_index_version(path: Path, version: str) -> None:
+    """Atomically record ``version`` as the current index version at ``path``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": version,
+        "published_at": datetime.now(timezone.utc).isoformat(),
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def shard_dir_name(act: str | None) -> str:
+    """Directory of an act's shard: "indian penal code" -> "indian-penal-code"."""
+    if not act:
+        return UNASSIGNED_SHARD
+    slug = re.sub(r"[^a-z0-9]+", "-", act.casefold()).strip("-")
+    return slug if slug and slug != UNASSIGNED_SHARD else f"act-{slug}"
+
+
+def read_shard_manifest(root: Path) -> dict[str | None, dict]:
+    """
+    Shards listed in ``root/shards.json``, keyed by normalized act (None for
+    the unassigned shard). Each entry has the shard ``dir`` and its ``count``.
+    """
+    try:
+        payload = json.loads((Path(root) / SHARD_MANIFEST_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {entry.get("act"): entry for entry in payload.get("shards", [])}
+
+
+def write_shard_manifest(root: Path, shards: dict[str | None, dict], model_name: str) -> None:
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "model_name": model_name,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "shards": [
+            {"act": act, "dir": entry["dir"], "count": entry["count"]}
+            for act, entry in sorted(shards.items(), key=lambda item: item[0] or "")
+        ],
+    }
+    tmp_path = root / f"{SHARD_MANIFEST_FILE}.tmp"
+    tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp_path, root / SHARD_MANIFEST_FILE)
+
+
+def read_index_version(path: Path) -> str | None:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8")).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+class IndexVersionWatcher:
+    """
+    Current published index version, re-read when the version file changes.
+
+    The file is stat'ed at most once per ``check_interval`` seconds, so the
+    check is cheap enough to run on every search.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 5.0) -> None:
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.version: str | None = None
+        self._mtime_ns: int | None = None
+        self._checked_at = float("-inf")
+        self.refresh()
+
+    def refresh(self) -> str | None:
+        self._checked_at = time.monotonic()
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns != self._mtime_ns:
+            self._mtime_ns = mtime_ns
+            self.version = read_index_version(self.path) if mtime_ns is not None else None
+        return self.version
+
+    def current(self) -> str | None:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            return self.refresh()
+        return self.version
+
+
+def create_snapshot(root: Path, sources: dict[str, Path], content_version: str) -> str:
+    """
+    Copy finished index directories into a new read-only snapshot
+    ``root/<UTC timestamp>-<content version>/<name>`` and return its name.
+
+    The copy is staged under a dot-name and renamed into place, so a
+    snapshot directory is either complete or absent.
+    """
+    root = Path(root)
+    name = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{content_version}"
+    staging = root / f".{name}.staging"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    try:
+        for target, source in sources.items():
+            shutil.copytree(source, staging / target, ignore=shutil.ignore_patterns("*.tmp", "*.staging"))
+        os.replace(staging, root / name)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return name
+
+
+def publish_snapshot(root: Path, name: str) -> None:
+    """Point ``root/CURRENT`` at snapshot ``name``; running services swap to it."""
+    if not (Path(root) / name).is_dir():
+        raise FileNotFoundError(f"Snapshot {name} not found in {root}.")
+    publish_index_version(Path(root) / SNAPSHOT_POINTER_FILE, name)
+
+
+def list_snapshots(root: Path) -> list[str]:
+    """Snapshot names, oldest first (names start with their build time)."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted(path.name for path in root.iterdir() if path.is_dir() and not path.name.startswith("."))
+
+
+def prune_snapshots(root: Path, keep: int = 3) -> list[str]:
+    """
+    Delete all but the ``keep`` newest snapshots, never the current one.
+    Services still finishing queries on a just-replaced snapshot keep their
+    open files, so ``keep`` should leave at least the previous snapshot.
+    """
+    current = read_index_version(Path(root) / SNAPSHOT_POINTER_FILE)
+    names = list_snapshots(root)
+    removed = []
+    for name in names[: max(len(names) - keep, 0)]:
+        if name == current:
+            continue
+        shutil.rmtree(Path(root) / name, ignore_errors=True)
+        removed.append(name)
+    return removed